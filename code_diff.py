@@ -3,14 +3,23 @@ import os
 import sys
 import json
 import re
+import ast
 import argparse
 import tempfile
+import gzip
+import bisect
+import difflib
+import hashlib
+import sqlite3
 import subprocess
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 
-def clone_github_repo(repo_url, target_dir=None, branch=None, commit=None):
+import language_registry
+
+def clone_github_repo(repo_url, target_dir=None, branch=None, commit=None, bare=False):
     """
-    Clone a GitHub repository at a specific branch or commit
+    Clone a GitHub repository at a specific branch or commit.
+    With bare=True only the object database is cloned and nothing is checked out.
     """
     if target_dir is None:
         target_dir = tempfile.mkdtemp()
@@ -19,6 +28,8 @@ def clone_github_repo(repo_url, target_dir=None, branch=None, commit=None):
     
     # Basic clone command
     clone_cmd = ["git", "clone", repo_url, target_dir]
+    if bare:
+        clone_cmd.insert(2, "--bare")
     if branch:
         clone_cmd.extend(["--branch", branch, "--single-branch"])
     
@@ -26,7 +37,7 @@ def clone_github_repo(repo_url, target_dir=None, branch=None, commit=None):
         subprocess.run(clone_cmd, check=True, capture_output=True)
         
         # If a specific commit is requested, checkout that commit
-        if commit:
+        if commit and not bare:
             subprocess.run(["git", "checkout", commit], cwd=target_dir, check=True, capture_output=True)
             
         # Get the current commit hash
@@ -41,6 +52,223 @@ def clone_github_repo(repo_url, target_dir=None, branch=None, commit=None):
         print(f"Error: {e.stderr.decode('utf-8')}")
         raise
 
+def git_output(repo_path, args):
+    """
+    Run a git command in repo_path and return its stdout as bytes
+    """
+    result = subprocess.run(["git", "-C", repo_path] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+def resolve_revision(repo_path, revision):
+    """
+    Return the full commit hash of a branch, tag or commit
+    """
+    return git_output(repo_path, ["rev-parse", "--verify", f"{revision}^{{commit}}"]).decode().strip()
+
+def list_revision_files(repo_path, commit):
+    """
+    List the source files of a commit without checking it out.
+    Returns {relative path: blob SHA} from git ls-tree.
+    """
+    files = {}
+    for entry in git_output(repo_path, ["ls-tree", "-r", "-z", "--full-tree", commit]).split(b"\0"):
+        if not entry:
+            continue
+        header, _, path = entry.partition(b"\t")
+        mode, object_type, sha = header.split()
+        # Skip submodules and symlinks
+        if object_type != b"blob" or mode == b"120000":
+            continue
+        path = path.decode("utf-8", "replace")
+        if is_source_path(path):
+            files[path] = sha.decode()
+    return files
+
+def list_worktree_files(repo_path):
+    """
+    List the tracked and untracked (not ignored) source files of a working tree.
+    Returns {relative path: None}; their content is read from disk.
+    """
+    output = git_output(repo_path, ["ls-files", "-z", "--cached", "--others", "--exclude-standard"])
+    return {path: None for path in dict.fromkeys(output.decode("utf-8", "replace").split("\0"))
+            if path and is_source_path(path) and os.path.isfile(os.path.join(repo_path, path))}
+
+def list_changed_files(repo_path, old_commit, new_commit=None):
+    """
+    Ask git which source files differ between two commits, or between a
+    commit and the working tree (new_commit None, untracked files included).
+    Returns a list of {"status" (A, D, M or R), "old_path", "new_path",
+    "old_sha", "new_sha", "similarity"}; paths and SHAs are None where they do
+    not apply, and a None new_sha with a new_path means read from disk.
+    """
+    args = ["diff", "--raw", "-z", "-M", "--no-abbrev", old_commit] + ([new_commit] if new_commit else [])
+    fields = git_output(repo_path, args).split(b"\0")
+    changes = []
+    i = 0
+    while i < len(fields):
+        if not fields[i].startswith(b":"):
+            i += 1
+            continue
+        _, _, old_sha, new_sha, status = fields[i][1:].decode().split()
+        letter = status[0]
+        if letter in "RC":
+            old_path, new_path = fields[i + 1].decode("utf-8", "replace"), fields[i + 2].decode("utf-8", "replace")
+            i += 3
+        else:
+            old_path = new_path = fields[i + 1].decode("utf-8", "replace")
+            i += 2
+        if letter == "C":
+            # The copy source is unchanged
+            letter, old_path = "A", None
+        elif letter == "A":
+            old_path = None
+        elif letter == "D":
+            new_path = None
+        elif letter != "R":
+            letter = "M"
+        if not any(path and is_source_path(path) for path in (old_path, new_path)):
+            continue
+        changes.append({
+            "status": letter,
+            "old_path": old_path,
+            "new_path": new_path,
+            "old_sha": old_sha if old_path else None,
+            "new_sha": new_sha if new_path and new_sha.strip("0") else None,
+            "similarity": int(status[1:]) if letter == "R" else None
+        })
+    if new_commit is None:
+        untracked = git_output(repo_path, ["ls-files", "-z", "--others", "--exclude-standard"]).decode("utf-8", "replace")
+        for path in untracked.split("\0"):
+            if path and is_source_path(path):
+                changes.append({"status": "A", "old_path": None, "new_path": path, "old_sha": None, "new_sha": None,
+                                "similarity": None})
+    return changes
+
+def analyze_changed_structures(reader, changed_files, cache=None, verbose=True):
+    """
+    Extract the structure of the changed files only, on both sides.
+    A renamed file is compared under its new path; exact renames are not read
+    at all. With a cache (see create_extraction_cache), blobs that were
+    extracted before are not read again.
+    Returns (old structure, new structure, renamed files).
+    """
+    old_structure = {}
+    new_structure = {}
+    renamed = []
+    for change in changed_files:
+        if change["status"] == "R":
+            renamed.append({"old": change["old_path"], "new": change["new_path"], "similarity": change["similarity"]})
+            if change["similarity"] == 100:
+                continue
+        key = change["new_path"] or change["old_path"]
+        for structure, path, sha in ((old_structure, change["old_path"], change["old_sha"]),
+                                     (new_structure, change["new_path"], change["new_sha"])):
+            if path and is_source_path(path):
+                language = detect_language(path, check_shebang=False)
+                _store_structure(structure, key, language, extract_blob_structure(reader, cache, path, sha, language), (path, sha))
+    if verbose:
+        print(f"Analyzed {len(changed_files)} changed source files")
+    return old_structure, new_structure, renamed
+
+# Bump whenever extract_functions_and_classes output changes, so cached results are dropped
+EXTRACTION_CACHE_VERSION = '3'
+
+def create_extraction_cache(cache_file=None, max_entries=4096):
+    """
+    Create a cache of extract_functions_and_classes results keyed by (blob
+    SHA, language): an in-memory LRU of max_entries files, backed by an
+    optional SQLite file that keeps every result across runs
+    """
+    connection = None
+    if cache_file:
+        connection = sqlite3.connect(cache_file)
+        connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS extractions (sha TEXT, language TEXT, structure TEXT, '
+                           'PRIMARY KEY (sha, language))')
+        row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if not row or row[0] != EXTRACTION_CACHE_VERSION:
+            connection.execute('DELETE FROM extractions')
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (EXTRACTION_CACHE_VERSION,))
+    return {"entries": OrderedDict(), "max_entries": max_entries, "connection": connection,
+            "hits": 0, "disk_hits": 0, "parsed": 0}
+
+def close_extraction_cache(cache):
+    if cache["connection"] is not None:
+        cache["connection"].commit()
+        cache["connection"].close()
+
+def extract_blob_structure(reader, cache, path, sha, language):
+    """
+    Return the extracted structure of a blob (or of a working tree file when
+    sha is None), parsing each distinct (blob, language) at most once per cache
+    """
+    if cache is None or sha is None:
+        return extract_digested_structure(read_source(reader, path, sha), language)
+    key = (sha, language)
+    entries = cache["entries"]
+    if key in entries:
+        entries.move_to_end(key)
+        cache["hits"] += 1
+        return entries[key]
+    
+    extracted = None
+    connection = cache["connection"]
+    if connection is not None:
+        row = connection.execute('SELECT structure FROM extractions WHERE sha = ? AND language = ?', key).fetchone()
+        if row:
+            extracted = json.loads(row[0])
+            cache["disk_hits"] += 1
+    if extracted is None:
+        extracted = extract_digested_structure(read_source(reader, path, sha), language)
+        cache["parsed"] += 1
+        if connection is not None:
+            connection.execute('INSERT OR REPLACE INTO extractions (sha, language, structure) VALUES (?, ?, ?)',
+                               key + (json.dumps(extracted, separators=(',', ':')),))
+    
+    entries[key] = extracted
+    if len(entries) > cache["max_entries"]:
+        entries.popitem(last=False)
+    return extracted
+
+def open_blob_reader(repo_path):
+    """
+    Start one persistent `git cat-file --batch` process for reading blobs
+    """
+    process = subprocess.Popen(["git", "-C", repo_path, "cat-file", "--batch"],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    return {"repo_path": repo_path, "process": process}
+
+def read_blob(reader, sha):
+    """
+    Return the bytes of a blob through the cat-file process, or None if it is missing
+    """
+    process = reader["process"]
+    process.stdin.write(sha.encode() + b"\n")
+    process.stdin.flush()
+    header = process.stdout.readline().split()
+    if len(header) != 3:
+        return None
+    size = int(header[2])
+    content = process.stdout.read(size)
+    process.stdout.read(1)  # trailing newline
+    return content
+
+def close_blob_reader(reader):
+    process = reader["process"]
+    process.stdin.close()
+    process.wait()
+
+def read_source(reader, path, sha):
+    """
+    Read a file of a revision (by blob SHA) or of the working tree (sha None) as text
+    """
+    if sha is None:
+        return get_file_content(os.path.join(reader["repo_path"], path))
+    content = read_blob(reader, sha)
+    return content.decode("utf-8", errors="replace") if content is not None else None
+
 def get_file_content(file_path):
     """
     Safely read and return file content
@@ -52,6 +280,169 @@ def get_file_content(file_path):
         print(f"Error reading {file_path}: {e}")
         return None
 
+def _line_starts(content):
+    """Offsets at which the lines of content start"""
+    return [0] + [match.end() for match in re.finditer('\n', content)]
+
+def _line_span(content, line_starts, start, end):
+    """
+    Return {"start_line", "end_line"} (1-based, inclusive) of content[start:end], ignoring leading and trailing whitespace
+    """
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    return {"start_line": bisect.bisect_right(line_starts, start),
+            "end_line": bisect.bisect_right(line_starts, max(end - 1, start))}
+
+def extract_python_structure(content):
+    """
+    Extract Python functions, methods and classes with their full definitions
+    """
+    extracted = {"functions": {}, "classes": {}, "methods": {}}
+    line_starts = _line_starts(content)
+    
+    # Extract Python functions with their full definitions
+    function_pattern = re.compile(r'^(\s*)def\s+([a-zA-Z0-9_]+)\s*\(([^)]*)\)(?:\s*->\s*([^:]+))?\s*:(.*?)(?=^\1\S|\Z)', re.MULTILINE | re.DOTALL)
+    for match in function_pattern.finditer(content):
+        indentation = match.group(1)
+        name = match.group(2)
+        params = match.group(3)
+        return_type = match.group(4)
+        body = match.group(5)
+        
+        # If indentation is non-empty, it's a method, otherwise a function
+        extracted["methods" if indentation else "functions"][name] = {
+            "params": params.strip(),
+            "return_type": return_type.strip() if return_type else None,
+            "body": body.strip(),
+            **_line_span(content, line_starts, match.start(2), match.end())
+        }
+    
+    # Extract Python classes with their full definitions
+    class_pattern = re.compile(r'^class\s+([a-zA-Z0-9_]+)(?:\(([^)]*)\))?\s*:(.*?)(?=^class|\Z)', re.MULTILINE | re.DOTALL)
+    for match in class_pattern.finditer(content):
+        name = match.group(1)
+        inheritance = match.group(2)
+        body = match.group(3)
+        
+        extracted["classes"][name] = {
+            "inheritance": inheritance.strip() if inheritance else None,
+            "body": body.strip(),
+            **_line_span(content, line_starts, match.start(), match.end())
+        }
+    
+    return extracted
+
+def extract_javascript_structure(content):
+    """
+    Extract JavaScript/TypeScript functions, arrow functions, classes and methods
+    """
+    extracted = {"functions": {}, "classes": {}, "methods": {}}
+    line_starts = _line_starts(content)
+    
+    # Extract JavaScript/TypeScript functions
+    function_pattern = re.compile(r'function\s+([a-zA-Z0-9_$]+)\s*\(([^)]*)\)\s*{(.*?)(?=^function|\Z)', re.MULTILINE | re.DOTALL)
+    for match in function_pattern.finditer(content):
+        name = match.group(1)
+        params = match.group(2)
+        body = match.group(3)
+        
+        extracted["functions"][name] = {
+            "params": params.strip(),
+            "body": body.strip(),
+            **_line_span(content, line_starts, match.start(), match.end())
+        }
+    
+    # Extract arrow functions assigned to variables
+    arrow_pattern = re.compile(r'(?:const|let|var)\s+([a-zA-Z0-9_$]+)\s*=\s*(?:async\s*)?\(([^)]*)\)\s*=>\s*{(.*?)}', re.MULTILINE | re.DOTALL)
+    for match in arrow_pattern.finditer(content):
+        name = match.group(1)
+        params = match.group(2)
+        body = match.group(3)
+        
+        extracted["functions"][name] = {
+            "params": params.strip(),
+            "body": body.strip(),
+            "type": "arrow",
+            **_line_span(content, line_starts, match.start(), match.end())
+        }
+    
+    # Extract classes and their methods
+    class_pattern = re.compile(r'class\s+([a-zA-Z0-9_$]+)(?:\s+extends\s+([a-zA-Z0-9_$]+))?\s*{(.*?)}', re.MULTILINE | re.DOTALL)
+    for match in class_pattern.finditer(content):
+        name = match.group(1)
+        inheritance = match.group(2)
+        body = match.group(3)
+        
+        extracted["classes"][name] = {
+            "inheritance": inheritance,
+            "body": body.strip(),
+            **_line_span(content, line_starts, match.start(), match.end())
+        }
+        
+        # Extract methods from class body
+        method_pattern = re.compile(r'(?:async\s+)?([a-zA-Z0-9_$]+)\s*\(([^)]*)\)\s*{(.*?)}', re.MULTILINE | re.DOTALL)
+        for method_match in method_pattern.finditer(body):
+            method_name = method_match.group(1)
+            method_params = method_match.group(2)
+            method_body = method_match.group(3)
+            
+            # Skip constructor if looking at JavaScript
+            if method_name != "constructor":
+                extracted["methods"][f"{name}.{method_name}"] = {
+                    "params": method_params.strip(),
+                    "body": method_body.strip(),
+                    **_line_span(content, line_starts, match.start(3) + method_match.start(), match.start(3) + method_match.end())
+                }
+    
+    return extracted
+
+def extract_cpp_structure(content):
+    """
+    Extract C/C++ functions and classes with their full definitions (simplified)
+    """
+    extracted = {"functions": {}, "classes": {}, "methods": {}}
+    line_starts = _line_starts(content)
+    
+    # Extract C/C++ functions (simplified)
+    function_pattern = re.compile(r'([a-zA-Z0-9_:]+(?:\s*<[^>]*>)?)\s+([a-zA-Z0-9_]+)\s*\(([^)]*)\)\s*(?:const)?\s*{(.*?)(?=^[a-zA-Z0-9_:]+(?:\s*<[^>]*>)?\s+[a-zA-Z0-9_]+\s*\(|\Z)', re.MULTILINE | re.DOTALL)
+    for match in function_pattern.finditer(content):
+        return_type = match.group(1)
+        name = match.group(2)
+        params = match.group(3)
+        body = match.group(4)
+        
+        extracted["functions"][name] = {
+            "return_type": return_type.strip(),
+            "params": params.strip(),
+            "body": body.strip(),
+            **_line_span(content, line_starts, match.start(), match.end())
+        }
+    
+    # Extract C++ classes
+    class_pattern = re.compile(r'class\s+([a-zA-Z0-9_]+)(?:\s*:\s*(?:public|private|protected)\s+([a-zA-Z0-9_]+))?\s*{(.*?)};', re.MULTILINE | re.DOTALL)
+    for match in class_pattern.finditer(content):
+        name = match.group(1)
+        inheritance = match.group(2)
+        body = match.group(3)
+        
+        extracted["classes"][name] = {
+            "inheritance": inheritance.strip() if inheritance else None,
+            "body": body.strip(),
+            **_line_span(content, line_starts, match.start(), match.end())
+        }
+    
+    return extracted
+
+# Built-in structure extractors; other languages can be added with
+# language_registry.register_handler(<language>, "structure", <callable or "module:function">)
+language_registry.register_handler("python", "structure", extract_python_structure)
+for _language in ("javascript", "typescript"):
+    language_registry.register_handler(_language, "structure", extract_javascript_structure)
+for _language in ("c", "cpp"):
+    language_registry.register_handler(_language, "structure", extract_cpp_structure)
+
 def extract_functions_and_classes(content, language):
     """
     Extract functions and classes from code content based on language
@@ -66,144 +457,57 @@ def extract_functions_and_classes(content, language):
     if not content:
         return extracted
     
-    if language == "python":
-        # Extract Python functions with their full definitions
-        function_pattern = re.compile(r'^(\s*)def\s+([a-zA-Z0-9_]+)\s*\(([^)]*)\)(?:\s*->\s*([^:]+))?\s*:(.*?)(?=^\1\S|\Z)', re.MULTILINE | re.DOTALL)
-        for match in function_pattern.finditer(content):
-            indentation = match.group(1)
-            name = match.group(2)
-            params = match.group(3)
-            return_type = match.group(4)
-            body = match.group(5)
-            
-            # If indentation is non-empty, it's a method, otherwise a function
-            if indentation:
-                extracted["methods"][name] = {
-                    "params": params.strip(),
-                    "return_type": return_type.strip() if return_type else None,
-                    "body": body.strip()
-                }
-            else:
-                extracted["functions"][name] = {
-                    "params": params.strip(),
-                    "return_type": return_type.strip() if return_type else None,
-                    "body": body.strip()
-                }
-        
-        # Extract Python classes with their full definitions
-        class_pattern = re.compile(r'^class\s+([a-zA-Z0-9_]+)(?:\(([^)]*)\))?\s*:(.*?)(?=^class|\Z)', re.MULTILINE | re.DOTALL)
-        for match in class_pattern.finditer(content):
-            name = match.group(1)
-            inheritance = match.group(2)
-            body = match.group(3)
-            
-            extracted["classes"][name] = {
-                "inheritance": inheritance.strip() if inheritance else None,
-                "body": body.strip()
-            }
-            
-    elif language in ["javascript", "typescript"]:
-        # Extract JavaScript/TypeScript functions
-        function_pattern = re.compile(r'function\s+([a-zA-Z0-9_$]+)\s*\(([^)]*)\)\s*{(.*?)(?=^function|\Z)', re.MULTILINE | re.DOTALL)
-        for match in function_pattern.finditer(content):
-            name = match.group(1)
-            params = match.group(2)
-            body = match.group(3)
-            
-            extracted["functions"][name] = {
-                "params": params.strip(),
-                "body": body.strip()
-            }
-        
-        # Extract arrow functions assigned to variables
-        arrow_pattern = re.compile(r'(?:const|let|var)\s+([a-zA-Z0-9_$]+)\s*=\s*(?:async\s*)?\(([^)]*)\)\s*=>\s*{(.*?)}', re.MULTILINE | re.DOTALL)
-        for match in arrow_pattern.finditer(content):
-            name = match.group(1)
-            params = match.group(2)
-            body = match.group(3)
-            
-            extracted["functions"][name] = {
-                "params": params.strip(),
-                "body": body.strip(),
-                "type": "arrow"
-            }
-        
-        # Extract classes and their methods
-        class_pattern = re.compile(r'class\s+([a-zA-Z0-9_$]+)(?:\s+extends\s+([a-zA-Z0-9_$]+))?\s*{(.*?)}', re.MULTILINE | re.DOTALL)
-        for match in class_pattern.finditer(content):
-            name = match.group(1)
-            inheritance = match.group(2)
-            body = match.group(3)
-            
-            extracted["classes"][name] = {
-                "inheritance": inheritance,
-                "body": body.strip()
-            }
-            
-            # Extract methods from class body
-            method_pattern = re.compile(r'(?:async\s+)?([a-zA-Z0-9_$]+)\s*\(([^)]*)\)\s*{(.*?)}', re.MULTILINE | re.DOTALL)
-            for method_match in method_pattern.finditer(body):
-                method_name = method_match.group(1)
-                method_params = method_match.group(2)
-                method_body = method_match.group(3)
-                
-                # Skip constructor if looking at JavaScript
-                if method_name != "constructor":
-                    extracted["methods"][f"{name}.{method_name}"] = {
-                        "params": method_params.strip(),
-                        "body": method_body.strip()
-                    }
-    
-    elif language in ["cpp", "c"]:
-        # Extract C/C++ functions (simplified)
-        function_pattern = re.compile(r'([a-zA-Z0-9_:]+(?:\s*<[^>]*>)?)\s+([a-zA-Z0-9_]+)\s*\(([^)]*)\)\s*(?:const)?\s*{(.*?)(?=^[a-zA-Z0-9_:]+(?:\s*<[^>]*>)?\s+[a-zA-Z0-9_]+\s*\(|\Z)', re.MULTILINE | re.DOTALL)
-        for match in function_pattern.finditer(content):
-            return_type = match.group(1)
-            name = match.group(2)
-            params = match.group(3)
-            body = match.group(4)
-            
-            extracted["functions"][name] = {
-                "return_type": return_type.strip(),
-                "params": params.strip(),
-                "body": body.strip()
-            }
-        
-        # Extract C++ classes
-        class_pattern = re.compile(r'class\s+([a-zA-Z0-9_]+)(?:\s*:\s*(?:public|private|protected)\s+([a-zA-Z0-9_]+))?\s*{(.*?)};', re.MULTILINE | re.DOTALL)
-        for match in class_pattern.finditer(content):
-            name = match.group(1)
-            inheritance = match.group(2)
-            body = match.group(3)
-            
-            extracted["classes"][name] = {
-                "inheritance": inheritance.strip() if inheritance else None,
-                "body": body.strip()
-            }
+    extractor = language_registry.get_handler(language, "structure")
+    if extractor is not None:
+        extracted = extractor(content)
     
     return extracted
 
-def detect_language(file_path):
+def detect_language(file_path, check_shebang=True):
     """
-    Detect the programming language from file extension
+    Detect the programming language using the shared language registry
     """
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-    
-    if ext == '.py':
-        return "python"
-    elif ext in ['.js', '.jsx']:
-        return "javascript"
-    elif ext in ['.ts', '.tsx']:
-        return "typescript"
-    elif ext in ['.c', '.h']:
-        return "c"
-    elif ext in ['.cpp', '.cc', '.hpp']:
-        return "cpp"
-    elif ext in ['.java']:
-        return "java"
-    # Add more languages as needed
-    return "unknown"
+    return language_registry.detect_language(file_path, check_shebang)
+
+# Directories never analyzed, besides hidden ones
+SKIPPED_DIRECTORIES = {'node_modules', 'venv', '__pycache__'}
+
+def is_source_path(rel_path):
+    """
+    Check whether a repository-relative path is a source file with a structure extractor
+    """
+    parts = rel_path.replace(os.sep, '/').split('/')
+    if any(part.startswith('.') or part in SKIPPED_DIRECTORIES for part in parts[:-1]):
+        return False
+    file = parts[-1]
+    # Skip hidden files and non-source files
+    if file.startswith('.') or file.endswith(('.md', '.txt', '.json', '.xml', '.csv')):
+        return False
+    # Paths may name blobs rather than files on disk, so shebangs are not read
+    return language_registry.get_handler(detect_language(file, check_shebang=False), "structure") is not None
+
+def _add_file_structure(code_structure, rel_path, content, language_path=None):
+    """
+    Extract the structure of one file into code_structure under rel_path
+    (language detected from language_path, default rel_path); returns True if it has any definitions
+    """
+    language = detect_language(language_path or rel_path, check_shebang=False)
+    return _store_structure(code_structure, rel_path, language, extract_digested_structure(content, language),
+                            (language_path or rel_path, None))
+
+def _store_structure(code_structure, rel_path, language, extracted, source=None):
+    # Only add files that have functions, classes, or methods
+    if not (extracted["functions"] or extracted["classes"] or extracted["methods"]):
+        return False
+    digest_structure(extracted)
+    code_structure[rel_path] = {
+        "language": language,
+        "source": source,
+        "functions": extracted["functions"],
+        "classes": extracted["classes"],
+        "methods": extracted["methods"]
+    }
+    return True
 
 def analyze_codebase_structure(repo_path):
     """
@@ -216,37 +520,106 @@ def analyze_codebase_structure(repo_path):
     
     for root, dirs, files in os.walk(repo_path):
         # Skip hidden directories and common non-source directories
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'venv', '__pycache__']]
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIPPED_DIRECTORIES]
         
         for file in files:
-            # Skip hidden files and non-source files
-            if file.startswith('.') or file.endswith(('.md', '.txt', '.json', '.xml', '.csv')):
-                continue
-                
             file_path = os.path.join(root, file)
             rel_path = os.path.relpath(file_path, repo_path)
-            
-            language = detect_language(file_path)
-            if language == "unknown":
+            if not is_source_path(rel_path):
                 continue
                 
             content = get_file_content(file_path)
-            if content:
-                extracted = extract_functions_and_classes(content, language)
-                
-                # Only add files that have functions, classes, or methods
-                if (extracted["functions"] or extracted["classes"] or extracted["methods"]):
-                    code_structure[rel_path] = {
-                        "language": language,
-                        "functions": extracted["functions"],
-                        "classes": extracted["classes"],
-                        "methods": extracted["methods"]
-                    }
-                    file_count += 1
+            if content and _add_file_structure(code_structure, rel_path, content):
+                file_count += 1
     
     print(f"Analyzed {file_count} source files")
     return code_structure
 
+def _body_hash(item):
+    return item.get("body_hash") or hashlib.sha1(item.get("body", "").encode("utf-8", "replace")).hexdigest()
+
+def _definition_changed(old_item, new_item, signature_key):
+    """Compare two definitions by body digest and signature"""
+    return _body_hash(old_item) != _body_hash(new_item) or old_item.get(signature_key) != new_item.get(signature_key)
+
+def _same_fingerprint(old_item, new_item):
+    return old_item.get("fingerprint") is not None and old_item.get("fingerprint") == new_item.get("fingerprint")
+
+# Normalized token streams: string literals, comments, words and single symbols
+_STRING_TOKENS = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`'
+_TOKEN_PATTERNS = {
+    "hash": re.compile(_STRING_TOKENS + r'|#[^\n]*|\w+|\S'),
+    "c": re.compile(_STRING_TOKENS + r'|//[^\n]*|/\*.*?\*/|\w+|\S', re.DOTALL)
+}
+# Tokens formatters add or drop without changing meaning, per language
+_OPTIONAL_TOKENS = {"javascript": {";"}, "typescript": {";"}}
+
+def _token_fingerprint(text, language):
+    """
+    SHA-1 of the token stream of text without whitespace, comments, quote
+    style, trailing commas before closing brackets and optional semicolons
+    """
+    python = language == "python"
+    optional = _OPTIONAL_TOKENS.get(language, ())
+    tokens = []
+    for token in _TOKEN_PATTERNS["hash" if python else "c"].findall(text):
+        if (python and token[0] == "#") or (not python and token.startswith(("//", "/*"))) or token in optional:
+            continue
+        if token[0] in "\"'`" and len(token) > 1:
+            token = '"' + token[1:-1]
+        if token in ")]}" and tokens and tokens[-1] == ",":
+            tokens.pop()
+        tokens.append(token)
+    return hashlib.sha1("\0".join(tokens).encode("utf-8", "replace")).hexdigest()
+
+def _python_fingerprints(content):
+    """
+    Return {line: fingerprint} for every function and class of Python
+    source, hashing its AST dump with docstrings removed; None if it does not parse
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    definitions = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    nodes = [node for node in ast.walk(tree) if isinstance(node, definitions)]
+    for node in nodes:
+        first = node.body[0]
+        if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+            node.body = node.body[1:] or [ast.Pass()]
+    return {node.lineno: hashlib.sha1(ast.dump(node).encode("utf-8")).hexdigest() for node in nodes}
+
+def digest_structure(extracted, content=None, language=None):
+    """
+    Replace the body of every extracted definition by its SHA-1 (body_hash),
+    so structures stay small; bodies are read back from their file by
+    start_line/end_line when a diff is needed. Given the content, also add a
+    fingerprint that ignores formatting and comments: the AST dump for
+    Python, a normalized token stream otherwise.
+    """
+    lines = None
+    python_fingerprints = None
+    for items in extracted.values():
+        for item in items.values():
+            if content is not None and "start_line" in item and "fingerprint" not in item:
+                if lines is None:
+                    lines = content.splitlines(keepends=True)
+                    if language == "python":
+                        python_fingerprints = _python_fingerprints(content)
+                fingerprint = (python_fingerprints or {}).get(item["start_line"])
+                item["fingerprint"] = fingerprint or _token_fingerprint(
+                    ''.join(lines[item["start_line"] - 1:item["end_line"]]), language)
+            if "body" in item:
+                item["body_hash"] = _body_hash(item)
+                del item["body"]
+    return extracted
+
+def extract_digested_structure(content, language):
+    """
+    Extract definitions with body hashes and fingerprints instead of bodies (see digest_structure)
+    """
+    return digest_structure(extract_functions_and_classes(content, language), content, language)
+
 def compare_structures(old_structure, new_structure):
     """
     Compare two code structures and identify semantic changes
@@ -258,17 +631,20 @@ def compare_structures(old_structure, new_structure):
         "function_changes": {
             "added": [],
             "removed": [],
-            "modified": []
+            "modified": [],
+            "reformatted": []
         },
         "class_changes": {
             "added": [],
             "removed": [],
-            "modified": []
+            "modified": [],
+            "reformatted": []
         },
         "method_changes": {
             "added": [],
             "removed": [],
-            "modified": []
+            "modified": [],
+            "reformatted": []
         }
     }
     
@@ -287,9 +663,9 @@ def compare_structures(old_structure, new_structure):
         new_file = new_structure[file]
         
         file_changes = {
-            "functions": {"added": [], "removed": [], "modified": []},
-            "classes": {"added": [], "removed": [], "modified": []},
-            "methods": {"added": [], "removed": [], "modified": []}
+            "functions": {"added": [], "removed": [], "modified": [], "reformatted": []},
+            "classes": {"added": [], "removed": [], "modified": [], "reformatted": []},
+            "methods": {"added": [], "removed": [], "modified": [], "reformatted": []}
         }
         
         # Compare functions
@@ -323,7 +699,12 @@ def compare_structures(old_structure, new_structure):
             
             # Simple approach: check if the body has changed
             # In a real implementation, you'd want more sophisticated comparison
-            if old_func["body"] != new_func["body"] or old_func.get("params") != new_func.get("params"):
+            if _definition_changed(old_func, new_func, "params"):
+                if _same_fingerprint(old_func, new_func):
+                    # Only formatting or comments changed
+                    file_changes["functions"]["reformatted"].append({"name": func, "fingerprint": new_func["fingerprint"]})
+                    changes["function_changes"]["reformatted"].append({"file": file, "name": func})
+                    continue
                 file_changes["functions"]["modified"].append({
                     "name": func,
                     "old": old_func,
@@ -364,7 +745,12 @@ def compare_structures(old_structure, new_structure):
             new_cls = new_file["classes"][cls]
             
             # Check for changes in class body or inheritance
-            if old_cls["body"] != new_cls["body"] or old_cls.get("inheritance") != new_cls.get("inheritance"):
+            if _definition_changed(old_cls, new_cls, "inheritance"):
+                if _same_fingerprint(old_cls, new_cls):
+                    # Only formatting or comments changed
+                    file_changes["classes"]["reformatted"].append({"name": cls, "fingerprint": new_cls["fingerprint"]})
+                    changes["class_changes"]["reformatted"].append({"file": file, "name": cls})
+                    continue
                 file_changes["classes"]["modified"].append({
                     "name": cls,
                     "old": old_cls,
@@ -403,7 +789,12 @@ def compare_structures(old_structure, new_structure):
             old_method = old_file["methods"][method]
             new_method = new_file["methods"][method]
             
-            if old_method["body"] != new_method["body"] or old_method.get("params") != new_method.get("params"):
+            if _definition_changed(old_method, new_method, "params"):
+                if _same_fingerprint(old_method, new_method):
+                    # Only formatting or comments changed
+                    file_changes["methods"]["reformatted"].append({"name": method, "fingerprint": new_method["fingerprint"]})
+                    changes["method_changes"]["reformatted"].append({"file": file, "name": method})
+                    continue
                 file_changes["methods"]["modified"].append({
                     "name": method,
                     "old": old_method,
@@ -415,9 +806,7 @@ def compare_structures(old_structure, new_structure):
                 })
         
         # If any changes were detected in this file, add it to modified files
-        if (file_changes["functions"]["added"] or file_changes["functions"]["removed"] or file_changes["functions"]["modified"] or
-            file_changes["classes"]["added"] or file_changes["classes"]["removed"] or file_changes["classes"]["modified"] or
-            file_changes["methods"]["added"] or file_changes["methods"]["removed"] or file_changes["methods"]["modified"]):
+        if any(items for kind in file_changes.values() for items in kind.values()):
             changes["modified_files"].append({
                 "file": file,
                 "changes": file_changes
@@ -425,6 +814,54 @@ def compare_structures(old_structure, new_structure):
     
     return changes
 
+def _source_lines(reader, source):
+    content = read_source(reader, *source) if source else None
+    return content.splitlines(keepends=True) if content else []
+
+_HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@')
+
+def _shift_hunk_header(line, old_offset, new_offset):
+    """
+    Move the ranges of a hunk header from definition-relative to file line numbers
+    """
+    match = _HUNK_HEADER_PATTERN.match(line)
+    if not match:
+        return line
+    old_start, old_count, new_start, new_count = match.groups()
+    return (f"@@ -{int(old_start) + old_offset}{old_count or ''} +{int(new_start) + new_offset}{new_count or ''} @@"
+            + line[match.end():])
+
+def _body_diff(path, old_lines, old_item, new_lines, new_item, limit):
+    """
+    Unified diff of one definition's lines in two file versions, with hunk
+    headers in file line numbers, cut at limit characters
+    """
+    old_offset, new_offset = old_item["start_line"] - 1, new_item["start_line"] - 1
+    old_body = old_lines[old_offset:old_item["end_line"]]
+    new_body = new_lines[new_offset:new_item["end_line"]]
+    diff = ''.join(_shift_hunk_header(line if line.endswith('\n') else line + '\n', old_offset, new_offset)
+                   for line in difflib.unified_diff(old_body, new_body, f"a/{path}", f"b/{path}", n=2))
+    if len(diff) > limit:
+        diff = diff[:limit] + f"\n... diff truncated ({len(diff)} characters)\n"
+    return diff
+
+def attach_body_diffs(changes, old_structure, new_structure, reader, limit=4000):
+    """
+    Add a size-capped unified diff to every modified definition. Bodies are
+    not kept in the structures; both file versions are read back (through
+    the blob reader) only for files with modified definitions, one file at a time.
+    """
+    for file_entry in changes["modified_files"]:
+        path = file_entry["file"]
+        modified = [item for kind in ("functions", "classes", "methods") for item in file_entry["changes"][kind]["modified"]
+                    if "start_line" in item["old"] and "start_line" in item["new"]]
+        if not modified:
+            continue
+        old_lines = _source_lines(reader, old_structure[path].get("source"))
+        new_lines = _source_lines(reader, new_structure[path].get("source"))
+        for item in modified:
+            item["diff"] = _body_diff(path, old_lines, item["old"], new_lines, item["new"], limit)
+
 def categorize_semantic_changes(changes):
     """
     Group changes by semantic meaning rather than just by file
@@ -461,9 +898,89 @@ def categorize_semantic_changes(changes):
     
     return semantic_groups
 
-def generate_change_report(changes, semantic_groups, old_commit, new_commit, output_format="json"):
+def summarize_changes(changes):
     """
-    Generate a structured report of the changes
+    Count the changes found by compare_structures
+    """
+    return {
+        "added_files": len(changes["added_files"]),
+        "removed_files": len(changes["removed_files"]),
+        "modified_files": len(changes["modified_files"]),
+        "renamed_files": len(changes.get("renamed_files", [])),
+        "unchanged_files": changes.get("unchanged_files", 0),
+        "added_functions": len(changes["function_changes"]["added"]),
+        "removed_functions": len(changes["function_changes"]["removed"]),
+        "modified_functions": len(changes["function_changes"]["modified"]),
+        "added_classes": len(changes["class_changes"]["added"]),
+        "removed_classes": len(changes["class_changes"]["removed"]),
+        "modified_classes": len(changes["class_changes"]["modified"]),
+        "added_methods": len(changes["method_changes"]["added"]),
+        "removed_methods": len(changes["method_changes"]["removed"]),
+        "modified_methods": len(changes["method_changes"]["modified"]),
+        "reformatted_functions": len(changes["function_changes"]["reformatted"]),
+        "reformatted_classes": len(changes["class_changes"]["reformatted"]),
+        "reformatted_methods": len(changes["method_changes"]["reformatted"])
+    }
+
+# Tree of an empty commit, diffed against for root commits
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+def list_range_commits(repo_path, commit_range):
+    """
+    Return the commits of a range (e.g. v1.0..v1.1), oldest first, as
+    {"commit", "parent", "merge", "date", "subject"} dicts; "parent" is the
+    first parent, which merges are compared with
+    """
+    output = git_output(repo_path, ["log", "--reverse", "--topo-order",
+                                    "--format=%H%x1f%P%x1f%aI%x1f%s", commit_range])
+    commits = []
+    for line in output.decode("utf-8", "replace").splitlines():
+        commit, parents, date, subject = line.split("\x1f", 3)
+        parents = parents.split()
+        commits.append({"commit": commit, "parent": parents[0] if parents else None,
+                        "merge": len(parents) > 1, "date": date, "subject": subject})
+    return commits
+
+def analyze_commit_range(repo_path, commit_range, output_file, cache, compress=False):
+    """
+    Walk the commits of a range oldest first and write one JSON line per
+    commit with its file, function, class and method changes against its
+    (first) parent. A merge therefore repeats the changes of the commits it
+    brought in, as one record marked "merge". Only changed files are extracted, and results are cached by blob
+    SHA, so a blob shared by neighbouring commits is parsed once.
+    """
+    commits = list_range_commits(repo_path, commit_range)
+    print(f"Walking {len(commits)} commits in {commit_range}...")
+    reader = open_blob_reader(repo_path)
+    try:
+        with open_report(output_file, compress) as f:
+            for index, commit in enumerate(commits, 1):
+                changed_files = list_changed_files(repo_path, commit["parent"] or EMPTY_TREE, commit["commit"])
+                old_structure, new_structure, renamed_files = analyze_changed_structures(reader, changed_files, cache, verbose=False)
+                changes = compare_structures(old_structure, new_structure)
+                changes["renamed_files"] = renamed_files
+                record = dict(commit)
+                record.update({
+                    "summary": summarize_changes(changes),
+                    "added_files": sorted(changes["added_files"]),
+                    "removed_files": sorted(changes["removed_files"]),
+                    "renamed_files": renamed_files,
+                    "functions": changes["function_changes"],
+                    "classes": changes["class_changes"],
+                    "methods": changes["method_changes"]
+                })
+                f.write(json.dumps(record) + "\n")
+                definitions = sum(len(items) for kind in ("function_changes", "class_changes", "method_changes")
+                                  for items in changes[kind].values())
+                print(f"  [{index}/{len(commits)}] {commit['commit'][:7]} {commit['subject'][:60]}: "
+                      f"{len(changed_files)} files, {definitions} definition changes")
+    finally:
+        close_blob_reader(reader)
+    print(f"Extraction cache: {cache['parsed']} blobs parsed, {cache['hits']} memory hits, {cache['disk_hits']} disk hits")
+
+def generate_change_report(changes, semantic_groups, old_commit, new_commit, output_format="json", compact=False):
+    """
+    Generate a structured report of the changes; compact=True drops the indentation
     """
     report = {
         "metadata": {
@@ -471,63 +988,109 @@ def generate_change_report(changes, semantic_groups, old_commit, new_commit, out
             "new_commit": new_commit,
             "comparison_date": datetime.datetime.now().isoformat()
         },
-        "summary": {
-            "added_files": len(changes["added_files"]),
-            "removed_files": len(changes["removed_files"]),
-            "modified_files": len(changes["modified_files"]),
-            "added_functions": len(changes["function_changes"]["added"]),
-            "removed_functions": len(changes["function_changes"]["removed"]),
-            "modified_functions": len(changes["function_changes"]["modified"]),
-            "added_classes": len(changes["class_changes"]["added"]),
-            "removed_classes": len(changes["class_changes"]["removed"]),
-            "modified_classes": len(changes["class_changes"]["modified"]),
-            "added_methods": len(changes["method_changes"]["added"]),
-            "removed_methods": len(changes["method_changes"]["removed"]),
-            "modified_methods": len(changes["method_changes"]["modified"])
-        },
+        "summary": summarize_changes(changes),
         "semantic_grouping": semantic_groups,
         "detailed_changes": changes
     }
     
+    indent = None if compact else 2
     if output_format == "json":
-        return json.dumps(report, indent=2)
+        return json.dumps(report, indent=indent)
     else:
         # Could implement other formats like HTML, Markdown, etc.
-        return json.dumps(report, indent=2)
+        return json.dumps(report, indent=indent)
+
+def open_report(output_file, compress=False):
+    """
+    Open a report file for writing text, gzip-compressed if requested
+    """
+    if compress:
+        return gzip.open(output_file, 'wt', encoding='utf-8')
+    return open(output_file, 'w')
 
 def main():
     parser = argparse.ArgumentParser(description='Analyze semantic code changes between two versions of a repository')
-    parser.add_argument('repo_url', help='GitHub repository URL')
-    parser.add_argument('--old', required=True, help='Old version (branch, tag, or commit hash)')
-    parser.add_argument('--new', required=True, help='New version (branch, tag, or commit hash)')
+    parser.add_argument('repo', help='Local repository path or repository URL (cloned once, without a working tree)')
+    parser.add_argument('--old', help='Old version (branch, tag, or commit hash)')
+    parser.add_argument('--new', help='New version (branch, tag, or commit hash); omit to compare against the working tree of a local repository')
+    parser.add_argument('--range', help='Commit range (e.g. v1.0..v1.1): write a per-commit change stream instead; '
+                        'merges are compared with their first parent')
+    parser.add_argument('--cache-file', help='With --range, keep extraction results by blob SHA in this SQLite file across runs')
+    parser.add_argument('--cache-size', type=int, default=4096, help='With --range, number of extracted files kept in memory')
     parser.add_argument('--output-dir', default='outputs', help='Output directory for results')
+    parser.add_argument('--diff-limit', type=int, default=4000, help='Maximum characters of the body diff kept per modified definition')
+    parser.add_argument('--compact', action='store_true', help='Write the report without indentation')
+    parser.add_argument('--gzip', action='store_true', help='Write a gzip-compressed (and compact) report')
     parser.add_argument('--semantic-grouping', action='store_true', help='Group changes by semantic meaning')
     parser.add_argument('--format', choices=['json', 'html', 'md'], default='json', help='Output format')
     
     args = parser.parse_args()
+    if not args.old and not args.range:
+        parser.error('one of --old or --range is required')
     
     # Create output directory if it doesn't exist
     if not os.path.exists(args.output_dir):
         os.makedirs(args.output_dir)
     
-    # Clone the old version
-    old_dir = tempfile.mkdtemp()
-    old_dir, old_commit = clone_github_repo(args.repo_url, old_dir, commit=args.old)
+    clone_dir = None
+    if os.path.isdir(args.repo):
+        repo_path = args.repo
+    else:
+        if args.new is None and not args.range:
+            parser.error('--new is required when the repository is a URL')
+        clone_dir, _ = clone_github_repo(args.repo, tempfile.mkdtemp(), bare=True)
+        repo_path = clone_dir
     
-    # Clone the new version
-    new_dir = tempfile.mkdtemp()
-    new_dir, new_commit = clone_github_repo(args.repo_url, new_dir, commit=args.new)
+    repo_name = os.path.basename(os.path.abspath(args.repo) if os.path.isdir(args.repo) else args.repo.rstrip('/')).replace('.git', '')
     
-    # Analyze both codebases
-    print("\nAnalyzing old codebase...")
-    old_structure = analyze_codebase_structure(old_dir)
+    if args.range:
+        cache = create_extraction_cache(args.cache_file, args.cache_size)
+        range_name = re.sub(r'[^\w.-]+', '_', args.range)
+        output_file = os.path.join(args.output_dir, f"{repo_name}_history_{range_name}.ndjson" + (".gz" if args.gzip else ""))
+        try:
+            analyze_commit_range(repo_path, args.range, output_file, cache, args.gzip)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            # The cleanup below runs before exiting
+            sys.exit(1)
+        finally:
+            close_extraction_cache(cache)
+            if clone_dir:
+                import shutil
+                shutil.rmtree(clone_dir)
+        print(f"\nChange stream saved to {output_file}")
+        return
     
-    print("\nAnalyzing new codebase...")
-    new_structure = analyze_codebase_structure(new_dir)
+    try:
+        old_commit = resolve_revision(repo_path, args.old)
+        new_commit = resolve_revision(repo_path, args.new) if args.new else "worktree"
+        changed_files = list_changed_files(repo_path, old_commit, new_commit if args.new else None)
+        new_files = list_revision_files(repo_path, new_commit) if args.new else list_worktree_files(repo_path)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        if clone_dir:
+            import shutil
+            shutil.rmtree(clone_dir)
+        sys.exit(1)
+    new_label = new_commit[:7] if args.new else new_commit
+    changed_paths = {change["new_path"] for change in changed_files}
+    unchanged_files = sum(1 for path in new_files if path not in changed_paths)
+    print(f"\n{len(changed_files)} source files changed between {old_commit[:7]} and {new_label}, "
+          f"{unchanged_files} unchanged")
     
-    # Compare the structures
-    print("\nComparing codebases...")
-    changes = compare_structures(old_structure, new_structure)
+    # Only changed files are read, through one cat-file process
+    reader = open_blob_reader(repo_path)
+    try:
+        old_structure, new_structure, renamed_files = analyze_changed_structures(reader, changed_files)
+        
+        # Compare the structures
+        print("\nComparing codebases...")
+        changes = compare_structures(old_structure, new_structure)
+        changes["renamed_files"] = renamed_files
+        changes["unchanged_files"] = unchanged_files
+        attach_body_diffs(changes, old_structure, new_structure, reader, args.diff_limit)
+    finally:
+        close_blob_reader(reader)
     
     # Generate semantic grouping if requested
     semantic_groups = {}
@@ -537,13 +1100,12 @@ def main():
     
     # Generate the report
     print("Generating change report...")
-    report = generate_change_report(changes, semantic_groups, old_commit, new_commit, args.format)
+    report = generate_change_report(changes, semantic_groups, old_commit, new_commit, args.format, args.compact or args.gzip)
     
     # Save the report
-    repo_name = args.repo_url.split('/')[-1].replace('.git', '')
-    output_file = os.path.join(args.output_dir, f"{repo_name}_changes_{old_commit[:7]}_{new_commit[:7]}.json")
+    output_file = os.path.join(args.output_dir, f"{repo_name}_changes_{old_commit[:7]}_{new_label}.json" + (".gz" if args.gzip else ""))
     
-    with open(output_file, 'w') as f:
+    with open_report(output_file, args.gzip) as f:
         f.write(report)
     
     print(f"\nChange analysis complete! Report saved to {output_file}")
@@ -553,17 +1115,21 @@ def main():
     print(f"  Added files: {len(changes['added_files'])}")
     print(f"  Removed files: {len(changes['removed_files'])}")
     print(f"  Modified files: {len(changes['modified_files'])}")
+    print(f"  Renamed files: {len(renamed_files)}")
+    print(f"  Unchanged files (not read): {unchanged_files}")
     print(f"  Added functions: {len(changes['function_changes']['added'])}")
     print(f"  Removed functions: {len(changes['function_changes']['removed'])}")
     print(f"  Modified functions: {len(changes['function_changes']['modified'])}")
     print(f"  Added classes: {len(changes['class_changes']['added'])}")
     print(f"  Removed classes: {len(changes['class_changes']['removed'])}")
     print(f"  Modified classes: {len(changes['class_changes']['modified'])}")
+    reformatted = sum(len(changes[kind]['reformatted']) for kind in ('function_changes', 'class_changes', 'method_changes'))
+    print(f"  Reformatted only (formatting/comments): {reformatted}")
     
-    # Cleanup temporary directories
-    import shutil
-    shutil.rmtree(old_dir)
-    shutil.rmtree(new_dir)
+    # Cleanup the temporary clone
+    if clone_dir:
+        import shutil
+        shutil.rmtree(clone_dir)
 
 if __name__ == "__main__":
     import datetime  # Import here for the timestamp in the report
@@ -3,27 +3,31 @@ import os
 import sys
 import json
 import re
-from collections import defaultdict
+import ast
+import builtins
+import time
+import hashlib
+import bisect
+import concurrent.futures
+import fnmatch
+import subprocess
+from collections import defaultdict, deque
+
+import graph_core
+import graph_export
+import graph_store
+import language_registry
+import node_resolver
 
 def detect_language(file_path):
-    """Determine file language based on extension"""
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == '.py':
-        return 'python'
-    elif ext in ['.js', '.jsx', '.ts', '.tsx']:
-        return 'javascript'
-    elif ext in ['.cpp', '.cc', '.hpp', '.h']:
-        return 'cpp'
-    return 'unknown'
+    """Determine file language using the shared language registry"""
+    return language_registry.detect_language(file_path)
 
 def parse_dependencies(file_path, content, language):
     """Parse dependencies based on language"""
-    if language == 'python':
-        return parse_python_imports(content)
-    elif language == 'javascript':
-        return parse_javascript_imports(content, file_path)
-    elif language == 'cpp':
-        return parse_cpp_includes(content, file_path)
+    parser = language_registry.get_handler(language, 'dependencies')
+    if parser is not None:
+        return parser(content, file_path)
     return []
 
 def parse_javascript_imports(content, file_path):
@@ -33,17 +37,27 @@ def parse_javascript_imports(content, file_path):
     # ES6 import patterns
     es6_patterns = [
         r'import\s+(\w+)\s+from\s+[\'"]([^\'"]*)[\'"](;)?',  # import module from 'path'
-        r'import\s+\{\s*([^}]*)\s*\}\s+from\s+[\'"]([^\'"]*)[\'"](;)?',  # import { items } from 'path'
+        r'import\s+(?:type\s+)?\{\s*([^}]*)\s*\}\s*from\s+[\'"]([^\'"]*)[\'"](;)?',  # import { items } from 'path'
         r'import\s+\*\s+as\s+(\w+)\s+from\s+[\'"]([^\'"]*)[\'"](;)?'  # import * as module from 'path'
     ]
     
+    # import x, { y } from 'module' / import x, * as ns from 'module'
+    mixed_pattern = r'import\s+(\w+)\s*,\s*(?:\{\s*([^}]*)\s*\}|\*\s+as\s+(\w+))\s*from\s+[\'"]([^\'"]*)[\'"]'
+    
+    # Re-exports, side-effect imports and dynamic import()
+    export_from_pattern = r'export\s+(?:type\s+)?\{\s*([^}]*)\s*\}\s*from\s+[\'"]([^\'"]*)[\'"]'
+    export_all_pattern = r'export\s+\*\s*(?:as\s+(\w+)\s+)?from\s+[\'"]([^\'"]*)[\'"]'
+    side_effect_pattern = r'^\s*import\s+[\'"]([^\'"]*)[\'"]'
+    dynamic_import_pattern = r'\bimport\s*\(\s*[\'"]([^\'"]*)[\'"]\s*\)'
+    bare_require_pattern = r'\brequire\s*\(\s*[\'"]([^\'"]*)[\'"]\s*\)'
+    
     # CommonJS require
     require_pattern = r'(?:const|let|var)\s+(\w+|\{[^}]*\})\s*=\s*require\([\'"]([^\'"]*)[\'"]\)(;)?'
     
     # Process ES6 imports
     for pattern in es6_patterns:
         for match in re.finditer(pattern, content, re.MULTILINE):
-            if pattern.startswith(r'import\s+\{\s*'):
+            if pattern.startswith(r'import\s+(?:type\s+)?\{'):
                 # import { x, y } from 'module'
                 items = [item.strip() for item in match.group(1).split(',')]
                 module_path = match.group(2)
@@ -71,8 +85,56 @@ def parse_javascript_imports(content, file_path):
                     "name": module_name
                 })
     
+    for match in re.finditer(mixed_pattern, content, re.MULTILINE):
+        module_path = match.group(4)
+        imports.append({
+            "type": "import_default",
+            "module": module_path,
+            "name": match.group(1)
+        })
+        if match.group(3):
+            imports.append({
+                "type": "import_namespace",
+                "module": module_path,
+                "alias": match.group(3)
+            })
+        else:
+            imports.append({
+                "type": "import_destructure",
+                "module": module_path,
+                "items": [item.strip() for item in match.group(2).split(',')]
+            })
+    
+    for match in re.finditer(export_from_pattern, content, re.MULTILINE):
+        imports.append({
+            "type": "export_from",
+            "module": match.group(2),
+            "items": [item.strip() for item in match.group(1).split(',')]
+        })
+    
+    for match in re.finditer(export_all_pattern, content, re.MULTILINE):
+        imports.append({
+            "type": "export_all",
+            "module": match.group(2),
+            "alias": match.group(1)
+        })
+    
+    for match in re.finditer(side_effect_pattern, content, re.MULTILINE):
+        imports.append({
+            "type": "import_side_effect",
+            "module": match.group(1)
+        })
+    
+    for match in re.finditer(dynamic_import_pattern, content, re.MULTILINE):
+        imports.append({
+            "type": "dynamic_import",
+            "module": match.group(1)
+        })
+    
     # Process CommonJS requires
+    required = set()
     for match in re.finditer(require_pattern, content, re.MULTILINE):
+        required.add(match.start(2))
         variable = match.group(1)
         module_path = match.group(2)
         
@@ -92,6 +154,14 @@ def parse_javascript_imports(content, file_path):
                 "name": variable
             })
     
+    # require() calls that are not assigned to a name
+    for match in re.finditer(bare_require_pattern, content, re.MULTILINE):
+        if match.start(1) not in required:
+            imports.append({
+                "type": "require_side_effect",
+                "module": match.group(1)
+            })
+    
     return imports
 
 def parse_cpp_includes(content, file_path):
@@ -129,9 +199,18 @@ def parse_cpp_includes(content, file_path):
     
     return includes
 
-def parse_python_imports(content):
+def parse_python_imports(content, file_path=None):
+    """
+    Parse import statements from Python files (ast, with a regex fallback)
+    """
+    result = _analyze_python_ast(content)
+    if result is not None:
+        return result["imports"]
+    return _parse_python_imports_regex(content)
+
+def _parse_python_imports_regex(content):
     """
-    Parse import statements from Python files
+    Parse import statements from Python files that do not parse
     """
     # Dictionary to store imports
     imports = []
@@ -190,12 +269,9 @@ def parse_python_imports(content):
 
 def find_function_calls_by_language(content, language):
     """Find function calls based on language"""
-    if language == 'python':
-        return find_python_function_calls(content)
-    elif language == 'javascript':
-        return find_javascript_function_calls(content)
-    elif language == 'cpp':
-        return find_cpp_function_calls(content)
+    finder = language_registry.get_handler(language, 'calls')
+    if finder is not None:
+        return finder(content)
     return []
 
 def find_javascript_function_calls(content):
@@ -217,6 +293,177 @@ def find_javascript_function_calls(content):
     
     return list(dict.fromkeys(calls))
 
+def _blank_javascript_literals(content):
+    """
+    Return content with comments, strings and template literals replaced by
+    spaces (newlines are kept), so offsets and line numbers stay valid and
+    braces or parentheses inside literals are never mistaken for code
+    """
+    chars = list(content)
+    length = len(content)
+    i = 0
+    while i < length:
+        c = content[i]
+        if c == '/' and content.startswith('//', i):
+            end = content.find('\n', i)
+            start, resume = i, (length if end == -1 else end)
+            end = resume
+        elif c == '/' and content.startswith('/*', i):
+            end = content.find('*/', i + 2)
+            resume = length if end == -1 else end + 2
+            start, end = i, resume
+        elif c in '\'"`':
+            end = i + 1
+            while end < length and content[end] != c:
+                if content[end] == '\\':
+                    end += 1
+                elif content[end] == '\n' and c != '`':
+                    break
+                end += 1
+            # Keep the quotes so string arguments still look like expressions
+            start, end, resume = i + 1, min(end, length), end + 1
+        else:
+            i += 1
+            continue
+        for j in range(start, end):
+            if chars[j] != '\n':
+                chars[j] = ' '
+        i = resume
+    return ''.join(chars)
+
+JAVASCRIPT_KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'function', 'return', 'typeof', 'new', 'super',
+                       'await', 'yield', 'delete', 'void', 'in', 'of', 'do', 'else', 'with', 'import', 'constructor'}
+
+_JAVASCRIPT_DEFINITION_PATTERNS = [
+    ("function", re.compile(r'\bfunction\s*\*?\s*([A-Za-z_$][\w$]*)\s*\(')),
+    ("class", re.compile(r'\bclass\s+([A-Za-z_$][\w$]*)')),
+    ("function", re.compile(r'\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?'
+                            r'(?:function\b|\([^()]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>)')),
+]
+_JAVASCRIPT_METHOD_PATTERN = re.compile(r'^[ \t]*(?:(?:static|async|get|set)\s+)*\*?([A-Za-z_$][\w$]*)\s*\([^()]*\)\s*\{', re.MULTILINE)
+_JAVASCRIPT_CALL_PATTERN = re.compile(r'(?<![\w$.])((?:[A-Za-z_$][\w$]*\s*\.\s*)*[A-Za-z_$][\w$]*)\s*\(')
+_JAVASCRIPT_REFERENCE_PATTERN = re.compile(r'(?<![\w$.])([A-Za-z_$][\w$]*(?:\s*\.\s*[A-Za-z_$][\w$]*)*)(?![\w$]|\s*[(.])')
+_JAVASCRIPT_IMPORT_FROM_PATTERN = re.compile(r'^[ \t]*(?:import|export)\b[^;]*?\bfrom\b', re.MULTILINE)
+
+# Identifiers that are never references to a definition
+JAVASCRIPT_NON_REFERENCES = {'this', 'const', 'let', 'var', 'true', 'false', 'null', 'undefined', 'export', 'default',
+                             'from', 'as', 'async', 'class', 'extends', 'static', 'get', 'set', 'try', 'finally',
+                             'break', 'continue', 'case', 'throw', 'instanceof', 'arguments', 'interface', 'type'}
+
+def _javascript_block_end(code, start):
+    """Return the offset after the brace block opening at or after start (code has literals blanked)"""
+    open_brace = code.find('{', start)
+    if open_brace == -1:
+        return len(code)
+    depth = 0
+    for pos in range(open_brace, len(code)):
+        if code[pos] == '{':
+            depth += 1
+        elif code[pos] == '}':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return len(code)
+
+def _merge_spans(spans):
+    """Sort (start, end) spans and merge overlapping ones; returns (starts, ends) for bisect lookups"""
+    starts, ends = [], []
+    for start, end in sorted(spans):
+        if ends and start < ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+def analyze_javascript_content(content, file_path=None):
+    """
+    Analyze JavaScript/TypeScript source: imports, definitions with their
+    extents, and call sites and references attributed to the innermost
+    enclosing definition
+    """
+    code = _blank_javascript_literals(content)
+    line_starts = [0] + [match.end() for match in re.finditer('\n', content)]
+    
+    # Definitions as (start, end, name position, kind, name)
+    spans = []
+    for kind, pattern in _JAVASCRIPT_DEFINITION_PATTERNS:
+        for match in pattern.finditer(code):
+            end = _javascript_block_end(code, match.end())
+            if kind == "function" and not pattern.pattern.startswith(r'\bfunction'):
+                # Arrow functions with an expression body end with their statement
+                brace = code.find('{', match.end())
+                line_end = code.find('\n', match.end())
+                if brace == -1 or (line_end != -1 and code[match.end():brace].strip()):
+                    end = len(code) if line_end == -1 else line_end
+            spans.append((match.start(), end, match.start(1), kind, match.group(1)))
+    class_starts, class_ends = _merge_spans((start, end) for start, end, _, kind, _ in spans if kind == "class")
+    for match in _JAVASCRIPT_METHOD_PATTERN.finditer(code):
+        name = match.group(1)
+        # Inside a class: the last class starting before the method must still be open
+        index = bisect.bisect_left(class_starts, match.start()) - 1
+        if name in JAVASCRIPT_KEYWORDS - {'constructor'} or index < 0 or match.start() >= class_ends[index]:
+            continue
+        spans.append((match.start(1), _javascript_block_end(code, match.end() - 1), match.start(1), "function", name))
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    
+    # Qualify names by nesting
+    definitions = []
+    qualified = []
+    stack = []
+    for start, end, name_pos, kind, name in spans:
+        while stack and stack[-1][1] <= start:
+            stack.pop()
+        qualname = f"{stack[-1][2]}.{name}" if stack else name
+        definitions.append({"name": qualname, "kind": kind, "line": bisect.bisect_right(line_starts, name_pos)})
+        qualified.append((start, end, qualname))
+        stack.append((start, end, qualname))
+    header_positions = {span[2] for span in spans}
+    
+    # Call sites and references (names used as values), in offset order
+    events = []
+    for match in _JAVASCRIPT_CALL_PATTERN.finditer(code):
+        name = re.sub(r'\s+', '', match.group(1))
+        if match.start(1) not in header_positions and name.split('.')[-1] not in JAVASCRIPT_KEYWORDS:
+            events.append((match.start(1), True, name))
+    import_starts, import_ends = _merge_spans(match.span() for match in _JAVASCRIPT_IMPORT_FROM_PATTERN.finditer(code))
+    for match in _JAVASCRIPT_REFERENCE_PATTERN.finditer(code):
+        pos = match.start(1)
+        name = re.sub(r'\s+', '', match.group(1))
+        index = bisect.bisect_right(import_starts, pos) - 1
+        if (pos in header_positions or name in JAVASCRIPT_NON_REFERENCES or name.split('.')[0] in JAVASCRIPT_KEYWORDS
+                or (index >= 0 and pos < import_ends[index])):
+            continue
+        events.append((pos, False, name))
+    events.sort()
+    
+    # The enclosing definitions of offset-ordered events form a stack
+    call_sites = []
+    references = set()
+    stack = []
+    next_span = 0
+    for pos, is_call, name in events:
+        while next_span < len(qualified) and qualified[next_span][0] <= pos:
+            while stack and stack[-1][1] <= qualified[next_span][0]:
+                stack.pop()
+            stack.append(qualified[next_span])
+            next_span += 1
+        while stack and stack[-1][1] <= pos:
+            stack.pop()
+        caller = stack[-1][2] if stack else "<module>"
+        if is_call:
+            call_sites.append({"name": name, "caller": caller, "line": bisect.bisect_right(line_starts, pos)})
+        else:
+            references.add((caller, name))
+    
+    return {
+        "imports": parse_javascript_imports(content, file_path),
+        "function_calls": find_javascript_function_calls(content),
+        "call_sites": call_sites,
+        "definitions": definitions,
+        "references": [{"name": name, "caller": caller} for caller, name in sorted(references)]
+    }
+
 def find_cpp_function_calls(content):
     """Find C++ function calls"""
     # This is simplified - C++ parsing is complex
@@ -238,7 +485,14 @@ def find_cpp_function_calls(content):
     return list(dict.fromkeys(calls))
 
 def find_python_function_calls(content):
-    """Find function calls in Python code"""
+    """Find function calls in Python code (ast, with a regex fallback)"""
+    result = _analyze_python_ast(content)
+    if result is not None:
+        return list(dict.fromkeys(site["name"] for site in result["call_sites"]))
+    return _find_python_function_calls_regex(content)
+
+def _find_python_function_calls_regex(content):
+    """Find function calls in Python code that does not parse"""
     # Basic pattern for function calls: name(args)
     # Also captures method calls: object.method(args)
     function_call_pattern = r'([\w\.]+)\s*\('
@@ -255,29 +509,214 @@ def find_python_function_calls(content):
     # Remove duplicates while preserving order
     return list(dict.fromkeys(calls))
 
-def analyze_file(file_path):
+# Calls that are never interesting as dependencies (matches the regex fallback)
+PYTHON_IGNORED_CALLS = {'print'}
+
+# Names never recorded as references
+PYTHON_BUILTIN_NAMES = set(dir(builtins))
+
+def _python_call_name(func):
+    """Return the dotted name of a call target, e.g. os.path.join, or .method for computed receivers"""
+    parts = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    elif parts:
+        parts.append('')
+    else:
+        return None
+    return '.'.join(reversed(parts))
+
+def _is_type_checking_test(test):
+    """True for `if TYPE_CHECKING:` and `if typing.TYPE_CHECKING:`"""
+    return ((isinstance(test, ast.Name) and test.id == 'TYPE_CHECKING') or
+            (isinstance(test, ast.Attribute) and test.attr == 'TYPE_CHECKING'))
+
+# Statements whose bodies only run under some condition
+PYTHON_CONDITIONAL_NODES = tuple(getattr(ast, name) for name in ('Try', 'TryStar', 'While', 'For', 'AsyncFor', 'Match')
+                                 if hasattr(ast, name))
+
+def _walk_python_ast(node, result, scope, function, conditional, type_checking):
+    """
+    Collect imports and call sites below node.
+    scope is the qualified name prefix, function the enclosing function (or None).
+    """
+    _walk_python_nodes(ast.iter_child_nodes(node), result, scope, function, conditional, type_checking)
+
+def _walk_python_nodes(nodes, result, scope, function, conditional, type_checking):
+    """Collect imports, definitions, call sites and references from a sequence of sibling nodes"""
+    for child in nodes:
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # Decorators and defaults run in the enclosing scope
+            _walk_python_nodes(child.decorator_list, result, scope, function, conditional, type_checking)
+            if not isinstance(child, ast.ClassDef):
+                _walk_python_ast(child.args, result, scope, function, conditional, type_checking)
+            else:
+                _walk_python_nodes(child.bases, result, scope, function, conditional, type_checking)
+            qualname = f"{scope}.{child.name}" if scope else child.name
+            result["definitions"].append({
+                "name": qualname,
+                "kind": "class" if isinstance(child, ast.ClassDef) else "function",
+                "line": child.lineno
+            })
+            if child.decorator_list:
+                # Decorators receive the definition, which may register it
+                result["references"].add((function or scope or "<module>", child.name))
+            inner_function = function if isinstance(child, ast.ClassDef) else qualname
+            _walk_python_nodes(child.body, result, qualname, inner_function, conditional, type_checking)
+        elif isinstance(child, ast.If):
+            _walk_python_nodes([child.test], result, scope, function, conditional, type_checking)
+            in_type_checking = type_checking or _is_type_checking_test(child.test)
+            _walk_python_nodes(child.body, result, scope, function, True, in_type_checking)
+            _walk_python_nodes(child.orelse, result, scope, function, True, type_checking)
+        elif isinstance(child, PYTHON_CONDITIONAL_NODES):
+            _walk_python_ast(child, result, scope, function, True, type_checking)
+        elif isinstance(child, ast.Import):
+            for alias in child.names:
+                result["imports"].append({
+                    "type": "import",
+                    "module": alias.name,
+                    "alias": alias.asname,
+                    "level": 0,
+                    "line": child.lineno,
+                    "function": function,
+                    "conditional": conditional,
+                    "type_checking": type_checking
+                })
+        elif isinstance(child, ast.ImportFrom):
+            result["imports"].append({
+                "type": "from_import",
+                "module": child.module or "",
+                "items": [{"name": alias.name, "alias": alias.asname} for alias in child.names],
+                "level": child.level or 0,
+                "line": child.lineno,
+                "function": function,
+                "conditional": conditional,
+                "type_checking": type_checking
+            })
+        elif isinstance(child, ast.Call):
+            name = _python_call_name(child.func)
+            if name and name.split('.')[-1] not in PYTHON_IGNORED_CALLS:
+                result["call_sites"].append({
+                    "name": name,
+                    "caller": function or scope or "<module>",
+                    "line": child.lineno
+                })
+            if name and name[0] != '.':
+                # The callee is a call site, not a reference
+                _walk_python_nodes(child.args, result, scope, function, conditional, type_checking)
+                _walk_python_nodes(child.keywords, result, scope, function, conditional, type_checking)
+            else:
+                _walk_python_ast(child, result, scope, function, conditional, type_checking)
+        elif isinstance(child, (ast.Name, ast.Attribute)) and isinstance(child.ctx, ast.Load):
+            # Functions and classes used as values (callbacks, registries, decorators)
+            name = _python_call_name(child)
+            if name and name[0] != '.':
+                if name not in SELF_RECEIVERS and name.split('.')[0] not in PYTHON_BUILTIN_NAMES:
+                    result["references"].add((function or scope or "<module>", name))
+            else:
+                _walk_python_ast(child, result, scope, function, conditional, type_checking)
+        else:
+            _walk_python_ast(child, result, scope, function, conditional, type_checking)
+
+def _analyze_python_ast(content):
+    """
+    Collect imports, definitions and call sites from Python source in one ast pass.
+    Returns None if the source does not parse.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    result = {"imports": [], "call_sites": [], "definitions": [], "references": set()}
+    _walk_python_ast(tree, result, "", None, False, False)
+    result["references"] = [{"name": name, "caller": caller} for caller, name in sorted(result["references"])]
+    return result
+
+def analyze_python_content(content, file_path=None):
+    """
+    Analyze Python source with a single ast pass, falling back to regexes on syntax errors
+    """
+    result = _analyze_python_ast(content)
+    if result is None:
+        return {
+            "imports": _parse_python_imports_regex(content),
+            "function_calls": _find_python_function_calls_regex(content),
+            "call_sites": [],
+            "definitions": [],
+            "references": []
+        }
+    result["function_calls"] = list(dict.fromkeys(site["name"] for site in result["call_sites"]))
+    return result
+
+# Built-in dependency parsers and call finders; other languages can be added with
+# language_registry.register_handler(<language>, 'dependencies' | 'calls', <callable or "module:function">).
+# An 'analysis' handler returning imports, function_calls and call_sites in one pass takes precedence.
+for _language in ('javascript', 'typescript'):
+    language_registry.register_handler(_language, 'dependencies', parse_javascript_imports)
+    language_registry.register_handler(_language, 'calls', find_javascript_function_calls)
+    language_registry.register_handler(_language, 'analysis', analyze_javascript_content)
+for _language in ('c', 'cpp'):
+    language_registry.register_handler(_language, 'dependencies', parse_cpp_includes)
+    language_registry.register_handler(_language, 'calls', find_cpp_function_calls)
+language_registry.register_handler('python', 'dependencies', parse_python_imports)
+language_registry.register_handler('python', 'calls', find_python_function_calls)
+language_registry.register_handler('python', 'analysis', analyze_python_content)
+
+# Source patterns of files that run as programs (any file with a #! line does too)
+_C_MAIN_PATTERN = re.compile(r'^(?:int|void)\s+main\s*\(', re.MULTILINE)
+ENTRY_POINT_PATTERNS = {
+    'python': re.compile(r'^if\s+__name__\s*==\s*[\'"]__main__[\'"]', re.MULTILINE),
+    'c': _C_MAIN_PATTERN,
+    'cpp': _C_MAIN_PATTERN
+}
+
+def analyze_file(file_path, language=None, verbose=True):
     """
     Analyze a single file for dependencies
     """
-    print(f"Analyzing: {file_path}")
+    if verbose:
+        print(f"Analyzing: {file_path}")
     try:
         with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
             content = f.read()
         
-        language = detect_language(file_path)
+        if language is None:
+            language = detect_language(file_path)
         
-        file_info = {
-            "path": file_path,
-            "imports": parse_dependencies(file_path, content, language),
-            "function_calls": find_function_calls_by_language(content, language),
-            "language": language
-        }
+        analyzer = language_registry.get_handler(language, 'analysis')
+        if analyzer is not None:
+            analysis = analyzer(content, file_path)
+            file_info = {
+                "path": file_path,
+                "imports": analysis["imports"],
+                "function_calls": analysis["function_calls"],
+                "language": language
+            }
+            for key in ("call_sites", "definitions", "references"):
+                if analysis.get(key):
+                    file_info[key] = analysis[key]
+        else:
+            file_info = {
+                "path": file_path,
+                "imports": parse_dependencies(file_path, content, language),
+                "function_calls": find_function_calls_by_language(content, language),
+                "language": language
+            }
         
-        print(f"  Found {len(file_info['imports'])} imports and {len(file_info['function_calls'])} function calls")
+        entry_pattern = ENTRY_POINT_PATTERNS.get(language)
+        if content.startswith('#!') or (entry_pattern is not None and entry_pattern.search(content)):
+            file_info["entry_point"] = True
+        
+        if verbose:
+            print(f"  Found {len(file_info['imports'])} imports and {len(file_info['function_calls'])} function calls")
         return file_info
     
     except Exception as e:
-        print(f"  Error analyzing {file_path}: {str(e)}")
+        if verbose:
+            print(f"  Error analyzing {file_path}: {str(e)}")
         return {
             "path": file_path,
             "imports": [],
@@ -286,92 +725,1324 @@ def analyze_file(file_path):
             "error": str(e)
         }
 
-def build_dependency_graph(file_analyses):
+# Directory names that act as import roots without being packages themselves
+PYTHON_SOURCE_ROOTS = ('src',)
+
+def _python_module_name(parts):
+    """Convert path components (ending with a .py file) into a dotted module name"""
+    parts = list(parts)
+    stem = os.path.splitext(parts[-1])[0]
+    if stem == '__init__':
+        parts.pop()
+    else:
+        parts[-1] = stem
+    return '.'.join(parts)
+
+def build_module_index(file_paths, root=None):
     """
-    Build a dependency graph based on the file analyses
+    Precompute a map from dotted Python module names to files.
+    
+    Names are derived from package structure first (walking up through
+    directories that contain __init__.py), then relative to src/ layouts and
+    finally relative to the analyzed root (for namespace packages).
+    Returns {"modules": {name: path}, "names": {path: canonical name}}.
     """
-    graph = {
-        "nodes": [],
-        "edges": []
+    python_files = sorted(path for path in file_paths if detect_language(path) == 'python')
+    modules = {}
+    names = {}
+    if not python_files:
+        return {"modules": modules, "names": names}
+    
+    if root is None:
+        root = os.path.commonpath([os.path.dirname(path) or '.' for path in python_files])
+    package_dirs = {os.path.dirname(path) for path in python_files
+                    if os.path.splitext(os.path.basename(path))[0] == '__init__'}
+    
+    # Package-relative names take priority
+    for path in python_files:
+        parts = [os.path.basename(path)]
+        directory = os.path.dirname(path)
+        while directory in package_dirs:
+            parts.insert(0, os.path.basename(directory))
+            directory = os.path.dirname(directory)
+        name = _python_module_name(parts)
+        if name:
+            modules.setdefault(name, path)
+            names[path] = name
+    
+    # Fallbacks for src/ layouts and directories without __init__.py
+    for path in python_files:
+        rel_parts = os.path.relpath(path, root).split(os.sep)
+        candidates = [rel_parts[i + 1:] for i, part in enumerate(rel_parts[:-1]) if part in PYTHON_SOURCE_ROOTS]
+        candidates.append(rel_parts)
+        for parts in candidates:
+            name = _python_module_name(parts)
+            if name and not name.startswith('..'):
+                modules.setdefault(name, path)
+    
+    return {"modules": modules, "names": names}
+
+def _python_import_base(import_info, source_file, module_index):
+    """
+    Return the absolute dotted module an import refers to, resolving relative
+    imports against the package of source_file (None if that is unknown)
+    """
+    module = import_info.get("module") or ""
+    level = import_info.get("level")
+    if level is None:
+        stripped = module.lstrip('.')
+        level = len(module) - len(stripped)
+        module = stripped
+    if not level:
+        return module
+    
+    package = module_index["names"].get(source_file)
+    if package is None:
+        return None
+    if os.path.splitext(os.path.basename(source_file))[0] != '__init__':
+        package = package.rpartition('.')[0]
+    for _ in range(level - 1):
+        package = package.rpartition('.')[0]
+    return '.'.join(part for part in (package, module) if part)
+
+def resolve_python_import(import_info, source_file, module_index):
+    """
+    Resolve one Python import record to the project files it loads.
+    
+    Every candidate is a single dict lookup. `from pkg import name` yields the
+    submodule pkg.name when it exists in the project, as well as pkg itself.
+    Relative imports are resolved against the package of source_file.
+    """
+    modules = module_index["modules"]
+    base = _python_import_base(import_info, source_file, module_index)
+    if base is None:
+        return []
+    
+    targets = []
+    target = modules.get(base) if base else None
+    if target:
+        targets.append(target)
+    if import_info.get("type") == "from_import":
+        for item in import_info.get("items", []):
+            name = item.get("name") if isinstance(item, dict) else item
+            if not name or not name.isidentifier():
+                continue
+            target = modules.get(f"{base}.{name}" if base else name)
+            if target and target not in targets:
+                targets.append(target)
+    return targets
+
+def build_resolvers(file_paths, root=None, include_paths=()):
+    """
+    Precompute the lookup tables needed to resolve dependencies to files.
+    Only file paths are needed; no file is read. include_paths are the C/C++
+    -I search directories.
+    """
+    file_paths = list(file_paths)
+    return {
+        "python": build_module_index(file_paths, root),
+        "javascript": node_resolver.create_resolver(),
+        "cpp": {"include_paths": [os.path.abspath(path) for path in include_paths], "results": {}},
+        "files": {os.path.abspath(path): path for path in file_paths}
     }
+
+def resolve_javascript_import(specifier, source_file, resolvers):
+    """
+    Resolve a JavaScript/TypeScript specifier to a project file with Node's
+    algorithm (see node_resolver), or None
+    """
+    resolved = node_resolver.resolve(resolvers["javascript"], specifier, source_file)
+    if resolved is None:
+        return None
+    return resolvers["files"].get(resolved)
+
+def resolve_cpp_include(import_info, source_file, resolvers):
+    """
+    Resolve an #include to a project file like the preprocessor does:
+    "header" looks next to the including file first, then in the -I
+    directories; <header> only searches the -I directories.
+    Lookups are memoized per (directory, header, form).
+    """
+    directory = os.path.dirname(os.path.abspath(source_file))
+    header = import_info["header"]
+    quoted = import_info["type"] == "local_include"
+    key = (directory if quoted else None, header, quoted)
+    results = resolvers["cpp"]["results"]
+    if key not in results:
+        files = resolvers["files"]
+        search = ([directory] if quoted else []) + resolvers["cpp"]["include_paths"]
+        results[key] = None
+        for include_dir in search:
+            path = files.get(os.path.normpath(os.path.join(include_dir, header)))
+            if path is not None:
+                results[key] = path
+                break
+    return results[key]
+
+def resolve_file_dependencies(file_info, resolvers, dependency_types=None):
+    """
+    Yield (target, type) for every dependency of one analyzed file that
+    resolves to a project file. dependency_types limits the edge types followed.
+    """
+    source_file = file_info["path"]
+    wanted = None if dependency_types is None or 'all' in dependency_types else set(dependency_types)
     
-    # Track node IDs to avoid duplicates
-    node_ids = set()
+    if file_info.get("language") == 'python':
+        for import_info in file_info["imports"]:
+            edge_type = import_info["type"]
+            if edge_type not in ("import", "from_import") or (wanted is not None and edge_type not in wanted):
+                continue
+            for target_file in resolve_python_import(import_info, source_file, resolvers["python"]):
+                if target_file != source_file:
+                    yield target_file, edge_type
+    elif file_info.get("language") in ('javascript', 'typescript'):
+        for import_info in file_info["imports"]:
+            edge_type = import_info["type"]
+            if wanted is not None and edge_type not in wanted:
+                continue
+            target_file = resolve_javascript_import(import_info.get("module", ""), source_file, resolvers)
+            if target_file is not None and target_file != source_file:
+                yield target_file, edge_type
+    elif file_info.get("language") in ('c', 'cpp'):
+        for import_info in file_info["imports"]:
+            edge_type = import_info["type"]
+            if edge_type not in ("local_include", "system_include") or (wanted is not None and edge_type not in wanted):
+                continue
+            target_file = resolve_cpp_include(import_info, source_file, resolvers)
+            if target_file is not None and target_file != source_file:
+                yield target_file, edge_type
+
+def iter_dependency_edges(file_analyses, resolvers, dependency_types=None):
+    """
+    Yield (source, target, type) for every resolved dependency; repeated
+    imports of the same module are yielded again and become the edge weight
+    """
+    for file_info in file_analyses:
+        for target_file, edge_type in resolve_file_dependencies(file_info, resolvers, dependency_types):
+            yield file_info["path"], target_file, edge_type
+
+def build_graph_core(file_analyses, root=None, dependency_types=None, include_paths=()):
+    """
+    Build the integer-indexed graph core (see graph_core) from file analyses
+    """
+    paths = [file_info["path"] for file_info in file_analyses]
+    resolvers = build_resolvers(paths, root, include_paths)
+    node_attributes = {file_info["path"]: {"language": file_info["language"]} for file_info in file_analyses}
+    edges = iter_dependency_edges(file_analyses, resolvers, dependency_types)
+    return graph_core.build_graph(paths, edges, node_attributes)
+
+def build_subgraph_core(root_files, supported_files, root=None, max_depth=None, dependency_types=None, include_paths=()):
+    """
+    Build the graph of files reachable from root_files within max_depth edges
+    of the requested types. Files are analyzed lazily as the breadth-first
+    search reaches them, so files outside the bound are never parsed.
+    supported_files is the list of (path, language) pairs of the project.
+    Returns (core, file_analyses).
+    """
+    languages = dict(supported_files)
+    resolvers = build_resolvers(languages, root, include_paths)
+    depths = {}
+    queue = deque()
+    for path in root_files:
+        if path not in depths:
+            depths[path] = 0
+            queue.append(path)
     
-    # First, add all files as nodes
+    file_analyses = []
+    edges = []
+    while queue:
+        path = queue.popleft()
+        if max_depth is not None and depths[path] >= max_depth:
+            continue
+        file_info = analyze_file(path, languages.get(path))
+        file_analyses.append(file_info)
+        for target_file, edge_type in resolve_file_dependencies(file_info, resolvers, dependency_types):
+            edges.append((path, target_file, edge_type))
+            if target_file not in depths:
+                depths[target_file] = depths[path] + 1
+                queue.append(target_file)
+    
+    node_attributes = {path: {"language": languages.get(path, "unknown"), "depth": depth} for path, depth in depths.items()}
+    return graph_core.build_graph(depths, edges, node_attributes), file_analyses
+
+def _python_import_aliases(file_info, resolvers):
+    """
+    Map the names a Python file binds through imports to ("module", path)
+    or ("symbol", path, name) targets; "*" maps to the star-imported modules
+    """
+    module_index = resolvers["python"]
+    modules = module_index["modules"]
+    source_file = file_info["path"]
+    aliases = {"*": []}
+    for import_info in file_info["imports"]:
+        base = _python_import_base(import_info, source_file, module_index)
+        if base is None:
+            continue
+        if import_info.get("type") == "import":
+            target = modules.get(base)
+            if import_info.get("alias"):
+                if target:
+                    aliases[import_info["alias"]] = ("module", target)
+                continue
+            # `import a.b` binds a, and calls are written a.b.func()
+            parts = base.split('.')
+            for i in range(1, len(parts) + 1):
+                prefix = '.'.join(parts[:i])
+                if prefix in modules:
+                    aliases.setdefault(prefix, ("module", modules[prefix]))
+        elif import_info.get("type") == "from_import":
+            base_file = modules.get(base) if base else None
+            for item in import_info.get("items", []):
+                if not isinstance(item, dict):
+                    continue
+                name = item.get("name")
+                if name == '*':
+                    if base_file:
+                        aliases["*"].append(base_file)
+                    continue
+                if not name or not name.isidentifier():
+                    continue
+                submodule = modules.get(f"{base}.{name}" if base else name)
+                if submodule:
+                    aliases[item.get("alias") or name] = ("module", submodule)
+                elif base_file:
+                    aliases[item.get("alias") or name] = ("symbol", base_file, name)
+    return aliases
+
+def _javascript_import_aliases(file_info, resolvers):
+    """
+    Map the names a JavaScript/TypeScript file binds through imports and
+    requires to ("module", path) or ("symbol", path, name) targets
+    """
+    aliases = {}
+    for import_info in file_info["imports"]:
+        target = resolve_javascript_import(import_info.get("module", ""), file_info["path"], resolvers)
+        if target is None:
+            continue
+        import_type = import_info.get("type")
+        if import_type in ("import_namespace", "require"):
+            aliases[import_info.get("alias") or import_info.get("name")] = ("module", target)
+        elif import_type == "import_default":
+            # Default exports are usually declared under the name they are imported as
+            aliases[import_info["name"]] = ("symbol", target, import_info["name"])
+        elif import_type == "export_all":
+            if import_info.get("alias"):
+                aliases[import_info["alias"]] = ("module", target)
+            else:
+                aliases.setdefault("*", []).append(target)
+        elif import_type in ("import_destructure", "require_destructure", "export_from"):
+            separator = ':' if import_type == "require_destructure" else ' as '
+            for item in import_info.get("items", []):
+                name, _, local = item.partition(separator)
+                name, local = name.strip(), (local.strip() or name.strip())
+                if name.isidentifier() and local.isidentifier():
+                    aliases[local] = ("symbol", target, name)
+    return aliases
+
+# Receivers that refer to the instance (or class) of the enclosing method
+SELF_RECEIVERS = {'self', 'cls', 'this'}
+
+def _resolve_target(target, rest, symbols, aliases, hops=0):
+    """
+    Resolve an import alias target plus trailing attribute names to a
+    (path, qualname) symbol key, following re-exports a few hops deep
+    """
+    if hops > 5:
+        return None
+    if target[0] == "module":
+        path, names = target[1], list(rest)
+    else:
+        path, names = target[1], [target[2]] + list(rest)
+    if not names:
+        return None
+    key = (path, '.'.join(names))
+    if key in symbols:
+        return key
+    reexport = aliases.get(path, {}).get(names[0])
+    if reexport is not None and reexport != target:
+        return _resolve_target(reexport, names[1:], symbols, aliases, hops + 1)
+    return None
+
+def resolve_call(name, caller, path, symbols, aliases):
+    """
+    Resolve a call site name (e.g. helper, self.save, np.zeros, mod.Class.method)
+    made from caller in path to a (path, qualname) symbol key, or None.
+    Every step is a dict lookup.
+    """
+    parts = name.split('.')
+    if not parts[0]:
+        return None
+    scope = [] if caller == "<module>" else caller.split('.')
+    
+    if parts[0] in SELF_RECEIVERS and len(parts) > 1:
+        # Method of the nearest enclosing class
+        for i in range(len(scope), 0, -1):
+            class_name = '.'.join(scope[:i])
+            if symbols.get((path, class_name), {}).get("kind") == "class":
+                key = (path, '.'.join([class_name] + parts[1:]))
+                return key if key in symbols else None
+        return None
+    
+    # Definitions visible from the caller's scope, innermost first; class
+    # bodies are not enclosing scopes for the methods inside them
+    for i in range(len(scope), -1, -1):
+        if 0 < i < len(scope) and symbols.get((path, '.'.join(scope[:i])), {}).get("kind") == "class":
+            continue
+        key = (path, '.'.join(scope[:i] + parts))
+        if key in symbols:
+            return key
+    
+    # Imported names, longest dotted prefix first
+    file_aliases = aliases.get(path, {})
+    for i in range(len(parts), 0, -1):
+        target = file_aliases.get('.'.join(parts[:i]))
+        if target is not None:
+            return _resolve_target(target, parts[i:], symbols, aliases)
+    for module in file_aliases.get("*", ()):
+        key = _resolve_target(("module", module), parts, symbols, aliases)
+        if key is not None:
+            return key
+    return None
+
+# Languages whose analyses carry definitions and call sites, with their import alias builders
+CALL_GRAPH_ALIASES = {
+    'python': _python_import_aliases,
+    'javascript': _javascript_import_aliases,
+    'typescript': _javascript_import_aliases
+}
+
+def build_call_graph(file_analyses, root=None):
+    """
+    Build a function-level call graph.
+    
+    A project-wide symbol table maps (path, qualified name) to each definition;
+    every file's imports become an alias table. Call sites are then resolved
+    with dict lookups only, and repeated calls between the same pair of
+    functions become the edge weight. Functions and classes used as values
+    (callbacks, decorators, registries) get "reference" edges. Module-level
+    code is the "<module>" node of its file. Returns (core, statistics).
+    """
+    resolvers = build_resolvers([file_info["path"] for file_info in file_analyses], root)
+    symbols = {}
+    aliases = {}
     for file_info in file_analyses:
-        file_path = file_info["path"]
-        if file_path not in node_ids:
-            node_ids.add(file_path)
-            graph["nodes"].append({
-                "id": file_path,
-                "type": "file",
-                "label": os.path.basename(file_path)
-            })
+        alias_builder = CALL_GRAPH_ALIASES.get(file_info.get("language"))
+        if alias_builder is None:
+            continue
+        path = file_info["path"]
+        for definition in file_info.get("definitions", []):
+            symbols[(path, definition["name"])] = definition
+        aliases[path] = alias_builder(file_info, resolvers)
     
-    # Then add edges based on imports
+    counts = defaultdict(int)
+    callers = set()
+    unresolved = 0
+    references = 0
     for file_info in file_analyses:
-        source_file = file_info["path"]
+        path = file_info["path"]
+        if path not in aliases:
+            continue
+        for site in file_info.get("call_sites", []):
+            key = resolve_call(site["name"], site["caller"], path, symbols, aliases)
+            if key is None:
+                unresolved += 1
+                continue
+            caller = (path, site["caller"])
+            callers.add(caller)
+            counts[(caller, key, "call")] += 1
+        for reference in file_info.get("references", []):
+            key = resolve_call(reference["name"], reference["caller"], path, symbols, aliases)
+            if key is not None:
+                caller = (path, reference["caller"])
+                callers.add(caller)
+                counts[(caller, key, "reference")] += 1
+                references += 1
+    
+    node_id = lambda key: f"{key[0]}::{key[1]}"
+    node_attributes = {}
+    for key, definition in symbols.items():
+        node_attributes[node_id(key)] = {"type": definition["kind"], "label": key[1], "file": key[0], "line": definition["line"]}
+    for key in callers:
+        if key not in symbols:
+            node_attributes[node_id(key)] = {"type": "module", "label": key[1], "file": key[0]}
+    edges = ((node_id(caller), node_id(callee), edge_type, count) for (caller, callee, edge_type), count in counts.items())
+    core = graph_core.build_graph(sorted(node_attributes), edges, node_attributes)
+    statistics = {"definitions": len(symbols), "resolved_calls": sum(counts.values()) - references,
+                  "unresolved_calls": unresolved, "references": references}
+    return core, statistics
+
+# Extensions of files that are included rather than compiled on their own
+HEADER_EXTENSIONS = ('.h', '.hh', '.hpp', '.hxx', '.ipp', '.inl', '.tcc')
+
+def compute_header_costs(core):
+    """
+    Compute the transitive include closure of every C/C++ translation unit.
+    Closures are int bitsets over the SCC condensation (see
+    graph_core.reachable_bitsets), so shared headers are only walked once.
+    Returns per-unit header counts and bytes, and per-header contributions
+    (size x number of units that pull it in) to the total preprocessing volume.
+    """
+    component_of, reach = graph_core.reachable_bitsets(core, ['local_include', 'system_include'])
+    paths = core["paths"]
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(0)
+    
+    units = []
+    included_by = defaultdict(int)
+    for node, path in enumerate(paths):
+        if core["node_attributes"].get(path, {}).get("language") not in ('c', 'cpp'):
+            continue
+        if os.path.splitext(path)[1].lower() in HEADER_EXTENSIONS:
+            continue
+        header_count = 0
+        header_bytes = 0
+        for header in graph_core.iter_bits(reach[component_of[node]] & ~(1 << node)):
+            header_count += 1
+            header_bytes += sizes[header]
+            included_by[header] += 1
+        units.append({
+            "path": path,
+            "headers": header_count,
+            "header_bytes": header_bytes,
+            "bytes": sizes[node] + header_bytes
+        })
+    units.sort(key=lambda unit: (-unit["bytes"], unit["path"]))
+    
+    headers = [{
+        "path": paths[header],
+        "size": sizes[header],
+        "included_by": count,
+        "total_bytes": sizes[header] * count
+    } for header, count in included_by.items()]
+    headers.sort(key=lambda header: (-header["total_bytes"], header["path"]))
+    
+    return {
+        "translation_units": units,
+        "headers": headers,
+        "total_bytes": sum(unit["bytes"] for unit in units)
+    }
+
+def report_header_costs(core, output_file, top=10):
+    """
+    Print the most expensive translation units and headers and export the full report
+    """
+    costs = compute_header_costs(core)
+    units = costs["translation_units"]
+    print(f"\n{len(units)} translation units preprocess {costs['total_bytes']} bytes in total")
+    if units:
+        print("Largest translation units (headers, bytes after includes):")
+        for unit in units[:top]:
+            print(f"  {unit['path']}: {unit['headers']} headers, {unit['bytes']} bytes")
+    if costs["headers"]:
+        print("Headers contributing most to preprocessing volume:")
+        for header in costs["headers"][:top]:
+            share = 100.0 * header["total_bytes"] / costs["total_bytes"] if costs["total_bytes"] else 0.0
+            print(f"  {header['path']}: included by {header['included_by']} units, {header['total_bytes']} bytes ({share:.1f}%)")
+    
+    with open(output_file, 'w') as f:
+        json.dump(costs, f, indent=2)
+    print(f"Header cost report exported to {output_file}")
+
+# "import time:  self [us] | cumulative | imported package" lines; nesting is two spaces per level
+_IMPORT_TIME_PATTERN = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)\s*$')
+
+def parse_import_time(text):
+    """
+    Parse -X importtime output into a tree of
+    {"module", "self_us", "cumulative_us", "children"} nodes and return the
+    top-level imports. Lines come in post-order (a module after everything
+    it imported), so children are collected per depth until their parent appears.
+    """
+    pending = defaultdict(list)
+    for line in text.splitlines():
+        match = _IMPORT_TIME_PATTERN.match(line)
+        if not match:
+            continue
+        depth = max(len(match.group(3)) - 1, 0) // 2
+        pending[depth].append({
+            "module": match.group(4),
+            "self_us": int(match.group(1)),
+            "cumulative_us": int(match.group(2)),
+            "children": pending.pop(depth + 1, [])
+        })
+    return pending[0]
+
+def run_import_time(module, folder_path, python=None):
+    """
+    Import module in a fresh interpreter with -X importtime, with the project
+    (and its src/ directory) on PYTHONPATH. Returns (import tree, error or None).
+    """
+    search_path = [os.path.abspath(folder_path)]
+    search_path += [os.path.join(search_path[0], name) for name in PYTHON_SOURCE_ROOTS
+                    if os.path.isdir(os.path.join(folder_path, name))]
+    if os.environ.get('PYTHONPATH'):
+        search_path.append(os.environ['PYTHONPATH'])
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(search_path))
+    result = subprocess.run([python or sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=folder_path, env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    error = None
+    if result.returncode != 0:
+        lines = [line for line in result.stderr.splitlines() if line and not line.startswith('import time:')]
+        error = lines[-1] if lines else f"exit status {result.returncode}"
+    return parse_import_time(result.stderr), error
+
+def _imported_at_module_level(file_info, module, source_file, module_index):
+    """
+    True if file_info has a module-level (not function-local, not TYPE_CHECKING)
+    import that loads module
+    """
+    for import_info in file_info.get("imports", []):
+        if import_info.get("function") or import_info.get("type_checking"):
+            continue
+        base = _python_import_base(import_info, source_file, module_index)
+        if not base:
+            continue
+        names = [base] + [f"{base}.{item['name']}" for item in import_info.get("items", []) if isinstance(item, dict)]
+        if any(name == module or name.startswith(module + '.') or module.startswith(name + '.') for name in names):
+            return True
+    return False
+
+def profile_import_time(core, entries, folder_path, file_analyses, python=None, top=10):
+    """
+    Measure the import cost of Python entry modules (dotted names or files)
+    and attach it to the graph: import_self_us / import_cumulative_us on the
+    nodes of project modules and import_cumulative_us on the edge through
+    which each module was first imported (core["edge_attributes"]).
+    Returns a report with per-entry totals, the modules with the highest
+    self time and the import chain that first pulled each one in, and lazy
+    import candidates: expensive modules imported at module level of a
+    project file.
+    """
+    module_index = build_module_index(core["paths"], folder_path)
+    modules = module_index["modules"]
+    analyses = {file_info["path"]: file_info for file_info in file_analyses}
+    attributes = core["node_attributes"]
+    edge_attributes = core.setdefault("edge_attributes", {})
+    report = {"entries": [], "slowest_modules": [], "lazy_import_candidates": []}
+    visits = []
+    
+    for entry in entries:
+        matched, _ = match_project_files([entry], folder_path, [(path, None) for path in core["paths"]])
+        module = module_index["names"].get(matched[0]) if matched else entry
+        if not module:
+            print(f"Warning: cannot determine the module name of '{entry}'")
+            continue
+        roots, error = run_import_time(module, folder_path, python)
+        # Drop interpreter startup (site, encodings, ...): keep the entry and its parent packages
+        roots = [root for root in roots if module == root["module"] or module.startswith(root["module"] + '.')]
+        if error:
+            print(f"Warning: importing {module} failed: {error}")
+        report["entries"].append({"module": module, "cumulative_us": sum(root["cumulative_us"] for root in roots),
+                                  "error": error})
         
-        # Process imports
-        for import_info in file_info["imports"]:
-            if import_info["type"] == "import":
-                module = import_info["module"]
-                
-                # Try to match the module to a file in our analysis
-                for target_file_info in file_analyses:
-                    target_file = target_file_info["path"]
-                    # Simple heuristic: check if the file name matches the module name
-                    if module in target_file or module.replace('.', '/') in target_file:
-                        graph["edges"].append({
-                            "source": source_file,
-                            "target": target_file,
-                            "type": "import"
-                        })
-            elif import_info["type"] == "from_import":
-                module = import_info["module"]
-                
-                # Similar logic as above
-                for target_file_info in file_analyses:
-                    target_file = target_file_info["path"]
-                    if module in target_file or module.replace('.', '/') in target_file:
-                        graph["edges"].append({
-                            "source": source_file,
-                            "target": target_file,
-                            "type": "from_import"
-                        })
+        stack = [(root, []) for root in reversed(roots)]
+        while stack:
+            node, chain = stack.pop()
+            path = modules.get(node["module"])
+            chain = chain + [node]
+            visits.append((node, chain, path))
+            if path is not None:
+                node_attributes = attributes.setdefault(path, {})
+                for key in ("self_us", "cumulative_us"):
+                    node_attributes["import_" + key] = max(node_attributes.get("import_" + key, 0), node[key])
+                importer = modules.get(chain[-2]["module"]) if len(chain) > 1 else None
+                if importer is not None:
+                    edge = edge_attributes.setdefault((importer, path), {})
+                    edge["import_cumulative_us"] = max(edge.get("import_cumulative_us", 0), node["cumulative_us"])
+            stack.extend((child, chain) for child in reversed(node["children"]))
     
-    return graph
+    visits.sort(key=lambda visit: -visit[0]["self_us"])
+    for node, chain, path in visits[:top]:
+        report["slowest_modules"].append({
+            "module": node["module"],
+            "path": path,
+            "self_us": node["self_us"],
+            "cumulative_us": node["cumulative_us"],
+            "chain": [{"module": step["module"], "cumulative_us": step["cumulative_us"]} for step in chain]
+        })
+    
+    candidates = {}
+    for node, chain, path in visits:
+        if len(chain) < 2:
+            continue
+        importer = modules.get(chain[-2]["module"])
+        if chain[-2]["module"].startswith(node["module"] + '.'):
+            # A package is always imported before its submodules
+            continue
+        file_info = analyses.get(importer)
+        if file_info is None or not _imported_at_module_level(file_info, node["module"], importer, module_index):
+            continue
+        key = (importer, node["module"])
+        if node["cumulative_us"] > candidates.get(key, {}).get("cumulative_us", -1):
+            candidates[key] = {"importer": importer, "module": node["module"], "path": path,
+                               "cumulative_us": node["cumulative_us"]}
+    report["lazy_import_candidates"] = sorted(candidates.values(), key=lambda candidate: -candidate["cumulative_us"])[:top]
+    return report
 
-def export_as_dot(graph, output_file):
+def report_import_time(core, entries, folder_path, file_analyses, output_file, python=None):
     """
-    Export the graph in DOT format (for Graphviz)
+    Print and export the import-time profile of the entry modules
     """
+    report = profile_import_time(core, entries, folder_path, file_analyses, python)
+    print()
+    for entry in report["entries"]:
+        print(f"import {entry['module']}: {entry['cumulative_us'] / 1000:.1f} ms")
+    if report["slowest_modules"]:
+        print("Modules with the highest self time (first import chain):")
+        for module in report["slowest_modules"]:
+            chain = ' -> '.join(step["module"] for step in module["chain"])
+            print(f"  {module['self_us'] / 1000:.1f} ms self, {module['cumulative_us'] / 1000:.1f} ms cumulative: {chain}")
+    if report["lazy_import_candidates"]:
+        print("Lazy import candidates (module-level imports by cumulative cost):")
+        for candidate in report["lazy_import_candidates"]:
+            print(f"  {candidate['cumulative_us'] / 1000:.1f} ms  {candidate['module']} imported by {candidate['importer']}")
+    
     with open(output_file, 'w') as f:
-        f.write('digraph DependencyGraph {\n')
-        f.write('  node [shape=box];\n')
+        json.dump(report, f, indent=2)
+    print(f"Import time report exported to {output_file}")
+
+def compute_metrics(core, samples=32):
+    """
+    Attach fan_in, fan_out, pagerank, betweenness (sampled) and scc_size to
+    every node's attributes and return the paths ranked by PageRank
+    """
+    fan_in, fan_out = graph_core.degrees(core)
+    ranks = graph_core.pagerank(core)
+    betweenness = graph_core.approximate_betweenness(core, samples)
+    scc_sizes = graph_core.component_sizes(core)
+    for node, path in enumerate(core["paths"]):
+        core["node_attributes"].setdefault(path, {}).update({
+            "fan_in": fan_in[node],
+            "fan_out": fan_out[node],
+            "pagerank": round(ranks[node], 8),
+            "betweenness": round(betweenness[node], 3),
+            "scc_size": scc_sizes[node]
+        })
+    return sorted(core["paths"], key=lambda path: -core["node_attributes"][path]["pagerank"])
+
+def print_metrics(core, ranked, top=10):
+    """
+    Print the highest-ranked nodes with their metrics
+    """
+    print(f"\nTop {min(top, len(ranked))} modules by PageRank (fan-in, fan-out, betweenness, SCC size):")
+    for path in ranked[:top]:
+        attributes = core["node_attributes"][path]
+        print(f"  {attributes['pagerank']:.5f}  {path}  in={attributes['fan_in']} out={attributes['fan_out']} "
+              f"betweenness={attributes['betweenness']:.1f} scc={attributes['scc_size']}")
+
+def rollup_groups(paths, granularity, root):
+    """
+    Return the rollup group label (relative to root) of every path.
+    
+    granularity is "directory", "prefix:<n>" (the first n directories) or
+    "package": the outermost directory of a Python package chain (folders
+    with __init__.py), the nearest folder with a package.json for
+    JavaScript/TypeScript, and the directory otherwise.
+    """
+    root = os.path.abspath(root)
+    def relative(directory):
+        rel = os.path.relpath(directory, root)
+        return '.' if rel == '.' else rel.replace(os.sep, '/')
+    
+    if granularity == 'directory':
+        return [relative(os.path.dirname(os.path.abspath(path))) for path in paths]
+    if granularity.startswith('prefix:'):
+        depth = int(granularity[7:])
+        groups = []
+        for path in paths:
+            parts = relative(os.path.dirname(os.path.abspath(path))).split('/')
+            groups.append('/'.join(parts[:depth]) if parts != ['.'] else '.')
+        return groups
+    if granularity != 'package':
+        raise ValueError(f"unknown rollup granularity '{granularity}'")
+    
+    package_dirs = {os.path.dirname(os.path.abspath(path)) for path in paths if os.path.basename(path) == '__init__.py'}
+    manifest_dirs = {}
+    def manifest_dir(directory):
+        # Nearest directory with a package.json, memoized along the way
+        visited = []
+        while directory not in manifest_dirs:
+            visited.append(directory)
+            if os.path.isfile(os.path.join(directory, 'package.json')):
+                manifest_dirs[directory] = directory
+                break
+            parent = os.path.dirname(directory)
+            if directory == root or parent == directory:
+                manifest_dirs[directory] = None
+                break
+            directory = parent
+        found = manifest_dirs[directory]
+        for path in visited:
+            manifest_dirs[path] = found
+        return found
+    
+    groups = []
+    for path in paths:
+        directory = os.path.dirname(os.path.abspath(path))
+        language = detect_language(path)
+        if language == 'python' and directory in package_dirs:
+            while os.path.dirname(directory) in package_dirs:
+                directory = os.path.dirname(directory)
+        elif language in ('javascript', 'typescript'):
+            directory = manifest_dir(directory) or directory
+        groups.append(relative(directory))
+    return groups
+
+def build_rollup(core, granularity, root, drill_down=None, dependency_types=None):
+    """
+    Roll the file graph up to groups (see rollup_groups). With drill_down set
+    to a group label, that group's files stay separate nodes while everything
+    else is rolled up, so its internal structure and external links are both visible.
+    """
+    groups = rollup_groups(core["paths"], granularity, root)
+    if drill_down is not None:
+        drill_down = drill_down.strip('/') or '.'
+        if drill_down not in groups:
+            print(f"Warning: group '{drill_down}' not found; available groups include {', '.join(sorted(set(groups))[:10])}")
+        groups = [path if group == drill_down else group for path, group in zip(core["paths"], groups)]
+    rolled = graph_core.rollup(core, groups, dependency_types)
+    if drill_down is not None:
+        for path, group in zip(core["paths"], groups):
+            if group == path:
+                label = os.path.relpath(os.path.abspath(path), os.path.join(os.path.abspath(root), drill_down))
+                rolled["node_attributes"][path].update({"type": "file", "label": label, "group": drill_down})
+    return rolled
+
+def find_supported_files(folder_path):
+    """
+    Return (path, language) for every file under folder_path that has a dependency parser
+    """
+    supported_languages = language_registry.languages_with_handler('dependencies')
+    supported_files = []
+    for root, dirs, files in os.walk(folder_path):
+        # Skip hidden directories; sorted so that every run sees the same order
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        
+        for file in sorted(files):
+            if file.startswith('.'):
+                continue
+            full_path = os.path.join(root, file)
+            language = detect_language(full_path)
+            if language in supported_languages:
+                supported_files.append((full_path, language))
+    return supported_files
+
+def match_project_files(entries, folder_path, supported_files):
+    """
+    Map file names (relative to folder_path, the working directory, or absolute)
+    to analyzed paths. Returns (matched paths, entries that matched nothing).
+    """
+    known = {os.path.normpath(path): path for path, _ in supported_files}
+    matched = []
+    missing = []
+    for entry in entries:
+        for candidate in (os.path.join(folder_path, entry), entry):
+            path = known.get(os.path.normpath(candidate))
+            if path is not None:
+                matched.append(path)
+                break
+        else:
+            missing.append(entry)
+    return matched, missing
+
+def resolve_root_files(roots, folder_path, supported_files):
+    """
+    Map --roots entries to analyzed paths, warning about unknown ones
+    """
+    root_files, missing = match_project_files(roots, folder_path, supported_files)
+    for entry in missing:
+        print(f"Warning: root '{entry}' is not a supported file under {folder_path}")
+    return root_files
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+def _analyze_timed(file_path, language, verbose=True):
+    """
+    Analyze one file; returns (file_info, seconds, bytes)
+    """
+    started = time.perf_counter()
+    file_info = analyze_file(file_path, language, verbose)
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        size = 0
+    return file_info, time.perf_counter() - started, size
+
+def _analyze_chunk(chunk):
+    """
+    Worker: analyze a chunk of (path, language) pairs quietly, in input order
+    """
+    return [_analyze_timed(file_path, language, verbose=False) for file_path, language in chunk]
+
+def print_throughput(timings, wall_seconds):
+    """
+    Print files and bytes per second of analysis time for every language
+    """
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    for language, seconds, size in timings:
+        totals[language][0] += 1
+        totals[language][1] += size
+        totals[language][2] += seconds
+    print(f"Analyzed {len(timings)} files in {wall_seconds:.2f}s")
+    for language in sorted(totals):
+        files, size, seconds = totals[language]
+        seconds = max(seconds, 1e-9)
+        print(f"  {language}: {files} files, {size / 1e6:.1f} MB, "
+              f"{files / seconds:.0f} files/s, {size / 1e6 / seconds:.1f} MB/s per worker")
+
+def analyze_files(supported_files, jobs=None):
+    """
+    Analyze every (path, language) pair and return the list of file analyses
+    in input order.
+    
+    With more than one job the files are dispatched to a process pool in
+    chunks (many small tasks keep workers busy when file sizes vary, while
+    each chunk amortizes the pickling round trip). Results are merged in
+    submission order, so the output does not depend on scheduling.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    started = time.perf_counter()
+    timings = []
+    if jobs <= 1 or len(supported_files) < PARALLEL_MIN_FILES:
+        file_analyses = []
+        for file_path, language in supported_files:
+            file_info, seconds, size = _analyze_timed(file_path, language)
+            file_analyses.append(file_info)
+            timings.append((language, seconds, size))
+    else:
+        chunk_size = max(1, min(256, len(supported_files) // (jobs * 8)))
+        chunks = [supported_files[i:i + chunk_size] for i in range(0, len(supported_files), chunk_size)]
+        print(f"Analyzing {len(supported_files)} files with {jobs} workers in {len(chunks)} chunks...")
+        file_analyses = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            for chunk, results in zip(chunks, executor.map(_analyze_chunk, chunks)):
+                for (file_path, language), (file_info, seconds, size) in zip(chunk, results):
+                    # Workers are quiet; report their errors here, in input order
+                    if "error" in file_info:
+                        print(f"  Error analyzing {file_path}: {file_info['error']}")
+                    file_analyses.append(file_info)
+                    timings.append((language, seconds, size))
+                print(f"  {len(file_analyses)}/{len(supported_files)} files analyzed")
+    print_throughput(timings, time.perf_counter() - started)
+    return file_analyses
+
+# Basename patterns of test files; every file under a __tests__ folder is a test too
+TEST_FILE_PATTERNS = (
+    'test_*.py', '*_test.py', 'tests.py',
+    '*.test.js', '*.spec.js', '*.test.jsx', '*.spec.jsx', '*.test.mjs', '*.spec.mjs',
+    '*.test.ts', '*.spec.ts', '*.test.tsx', '*.spec.tsx',
+    '*_test.c', '*_test.cc', '*_test.cpp', '*_unittest.cc', '*_unittest.cpp',
+    '*Test.java', '*Tests.java', '*Test.cs', '*Tests.cs'
+)
+_TEST_FILE_RE = re.compile('|'.join(fnmatch.translate(pattern) for pattern in TEST_FILE_PATTERNS))
+
+def is_test_file(file_path):
+    """
+    Check whether a path looks like a test file
+    """
+    if _TEST_FILE_RE.match(os.path.basename(file_path)):
+        return True
+    return '__tests__' in os.path.normpath(file_path).split(os.sep)
+
+def git_changed_files(folder_path, diff_range):
+    """
+    Return the files changed in a git diff range (e.g. "HEAD", "main...HEAD"),
+    relative to folder_path
+    """
+    result = subprocess.run(['git', '-C', folder_path, 'diff', '--name-only', '--relative', diff_range],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git diff {diff_range} failed: {result.stderr.strip()}")
+    return [line for line in result.stdout.splitlines() if line]
+
+def _file_hash(path):
+    """
+    SHA-1 of a file's bytes, or None if it cannot be read
+    """
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def _reference_stem(name):
+    """Module-ish key of a file or specifier name: util.test.ts -> util"""
+    return name.split('.')[0]
+
+def import_reference_names(file_info):
+    """
+    Return the short names a file's imports can resolve through. When a file
+    with one of these names is added or removed, the importer's edges may
+    change. "*python" and "*bare" stand for imports whose target depends on
+    package structure or package/tsconfig lookup rather than a file name.
+    """
+    names = set()
+    language = file_info.get("language")
+    for import_info in file_info.get("imports", []):
+        if language == 'python':
+            names.add('*python')
+            names.update(part for part in (import_info.get("module") or "").split('.') if part)
+            for item in import_info.get("items", []):
+                if isinstance(item, dict) and item.get("name"):
+                    names.add(item["name"])
+        elif language in ('javascript', 'typescript'):
+            specifier = import_info.get("module") or ""
+            if specifier.startswith(('./', '../', '/')) or specifier in ('.', '..'):
+                target = os.path.normpath(os.path.join(os.path.dirname(file_info["path"]), specifier))
+                names.add(_reference_stem(os.path.basename(target)))
+            elif specifier:
+                names.add('*bare')
+        elif language in ('c', 'cpp') and import_info.get("header"):
+            names.add(_reference_stem(os.path.basename(import_info["header"])))
+    return names
+
+def file_reference_names(path, language):
+    """
+    Return the names under which imports can reach a file (see import_reference_names)
+    """
+    stem = _reference_stem(os.path.basename(path))
+    names = {stem}
+    if stem in ('__init__', 'index'):
+        names.add(os.path.basename(os.path.dirname(path)))
+    if language == 'python' and stem == '__init__':
+        # Adding or removing a package changes the module names below it
+        names.add('*python')
+    if language in ('javascript', 'typescript'):
+        names.add('*bare')
+    return names
+
+# Bump whenever analyze_file output changes, so that stored analyses are redone
+ANALYSIS_VERSION = 2
+
+def update_graph_store(store_file, supported_files, root=None, include_paths=(), jobs=None, rebuild=False):
+    """
+    Bring the on-disk store (see graph_store) up to date with the project.
+    
+    Files whose size and mtime match the store are skipped without reading;
+    files whose content hash still matches only get their mtime updated. Only
+    modified and added files are re-analyzed. Edges are recomputed for those
+    files and for stored files whose imports mention the name of an added or
+    removed file; all other edges are kept as stored.
+    Returns the open store connection.
+    """
+    connection = graph_store.open_store(store_file)
+    try:
+        config = json.dumps({"analysis_version": ANALYSIS_VERSION,
+                             "root": os.path.abspath(root) if root else None,
+                             "include_paths": [os.path.abspath(path) for path in include_paths]})
+        if rebuild or graph_store.get_meta(connection, 'config') != config:
+            graph_store.clear_store(connection)
+            graph_store.set_meta(connection, 'version', graph_store.SCHEMA_VERSION)
+            graph_store.set_meta(connection, 'config', config)
+        
+        stored = graph_store.load_signatures(connection)
+        stored_languages = graph_store.load_languages(connection)
+        current = dict(supported_files)
+        modified = []
+        unchanged = 0
+        for path, language in supported_files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = stored.get(path)
+            if signature and signature[0] == stat.st_size and signature[1] == stat.st_mtime_ns:
+                unchanged += 1
+                continue
+            content_hash = _file_hash(path)
+            if signature and signature[2] == content_hash:
+                graph_store.touch_file(connection, path, stat.st_size, stat.st_mtime_ns)
+                unchanged += 1
+                continue
+            modified.append((path, language, stat.st_size, stat.st_mtime_ns, content_hash))
+        added = [entry[0] for entry in modified if entry[0] not in stored]
+        removed = [path for path in stored if path not in current]
+        print(f"Store: {unchanged} unchanged, {len(modified) - len(added)} modified, {len(added)} added, {len(removed)} removed")
         
-        # Write nodes
-        for node in graph["nodes"]:
-            node_id = node["id"].replace('/', '_').replace('.', '_').replace('-', '_')
-            f.write(f'  {node_id} [label="{node["label"]}"];\n')
+        file_analyses = analyze_files([(path, language) for path, language, _, _, _ in modified], jobs) if modified else []
+        for (path, language, size, mtime_ns, content_hash), file_info in zip(modified, file_analyses):
+            graph_store.save_file(connection, file_info, size, mtime_ns, content_hash, import_reference_names(file_info))
+        for path in removed:
+            graph_store.delete_file(connection, path)
         
-        # Write edges
-        for edge in graph["edges"]:
-            source = edge["source"].replace('/', '_').replace('.', '_').replace('-', '_')
-            target = edge["target"].replace('/', '_').replace('.', '_').replace('-', '_')
-            f.write(f'  {source} -> {target} [label="{edge["type"]}"];\n')
+        # Importers whose targets may appear or disappear with the added/removed files
+        names = set()
+        for path in added:
+            names |= file_reference_names(path, current[path])
+        for path in removed:
+            names |= file_reference_names(path, stored_languages.get(path))
+        reanalyzed = {file_info["path"] for file_info in file_analyses}
+        dependents = sorted(graph_store.referencing_files(connection, names) - reanalyzed) if names else []
         
-        f.write('}\n')
+        resolvers = build_resolvers(current, root, include_paths)
+        for file_info in file_analyses + list(graph_store.load_analyses(connection, dependents)):
+            graph_store.replace_edges(connection, file_info["path"], resolve_file_dependencies(file_info, resolvers))
+        connection.commit()
+    except BaseException:
+        # Leave no half-written transaction behind
+        connection.close()
+        raise
+    if dependents:
+        print(f"Re-resolved imports of {len(dependents)} files affected by added or removed files")
+    return connection
+
+def build_graph_from_store(connection, dependency_types=None):
+    """
+    Build the graph core from the stored files and edges
+    """
+    languages = graph_store.load_languages(connection)
+    wanted = None if dependency_types is None or 'all' in dependency_types else set(dependency_types)
+    edges = (edge for edge in graph_store.iter_edges(connection) if wanted is None or edge[2] in wanted)
+    node_attributes = {path: {"language": language} for path, language in languages.items()}
+    return graph_core.build_graph(sorted(languages), edges, node_attributes)
+
+def find_impacted_tests(core, changed_files, dependency_types=None):
+    """
+    Walk the reverse dependency graph from the changed files.
+    Returns the transitively affected files and, for every affected test file,
+    the import chain from the test down to the changed file that justifies it.
+    """
+    ids = core["ids"]
+    paths = core["paths"]
+    roots = [ids[path] for path in changed_files if path in ids]
+    depths, parents = graph_core.bfs(core, roots, reverse=True, edge_types=dependency_types)
+    
+    tests = []
+    for node in depths:
+        if not is_test_file(paths[node]):
+            continue
+        via = []
+        current = node
+        while current != -1:
+            via.append(paths[current])
+            current = parents[current]
+        tests.append({"path": paths[node], "via": via})
+    tests.sort(key=lambda test: test["path"])
+    
+    return {
+        "changed": [paths[node] for node in roots],
+        "affected": sorted(paths[node] for node in depths),
+        "tests": tests
+    }
+
+def find_entry_points(file_analyses, folder_path, extra_entries=()):
+    """
+    Return {path: reason} for the files execution starts from: scripts (#!
+    line, __main__ guard, C/C++ main), __main__.py files, test files, the
+    modules a package.json exposes, and extra_entries
+    """
+    entry_points = {}
+    files = {}
+    for file_info in file_analyses:
+        path = file_info["path"]
+        files[os.path.abspath(path)] = path
+        if is_test_file(path):
+            entry_points[path] = "test"
+        elif file_info.get("entry_point") or os.path.basename(path) == '__main__.py':
+            entry_points[path] = "script"
+    
+    state = node_resolver.create_resolver()
+    for root, dirs, names in os.walk(folder_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != 'node_modules')
+        if 'package.json' in names:
+            for resolved in node_resolver.package_entry_points(state, os.path.abspath(root)):
+                path = files.get(resolved)
+                if path is not None:
+                    entry_points.setdefault(path, "package")
     
+    matched, missing = match_project_files(extra_entries, folder_path, [(path, None) for path in files.values()])
+    for entry in missing:
+        print(f"Warning: entry point '{entry}' is not an analyzed source file")
+    for path in matched:
+        entry_points[path] = "requested"
+    return entry_points
+
+def find_dead_code(core, calls_core, file_analyses, entry_points):
+    """
+    Find the files and definitions no entry point reaches.
+    
+    Files and definitions share one graph: imports link files, every file
+    runs its module-level code, and module-level code and definitions link
+    to what they call or reference, to the definitions nested in them and to
+    their own file. One frontier propagation (graph_core.reachable) from the
+    entry files, plus the top-level definitions of test files (the test
+    runner calls them) and package entry modules (their users do), marks
+    everything live. Only top-level functions and classes are
+    reported; methods are reached through dynamic dispatch that static
+    resolution cannot follow. Returns (unreachable files, unreachable definitions).
+    """
+    edges = [edge[:3] for edge in graph_core.iter_edges(core)]
+    edges.extend(edge[:3] for edge in graph_core.iter_edges(calls_core))
+    roots = list(entry_points)
+    candidates = []
+    for file_info in file_analyses:
+        path = file_info["path"]
+        definitions = file_info.get("definitions", [])
+        if not definitions:
+            continue
+        edges.append((path, f"{path}::<module>", "runs"))
+        for definition in definitions:
+            node = f"{path}::{definition['name']}"
+            parent, _, name = definition["name"].rpartition('.')
+            edges.append((node, path, "defined_in"))
+            if parent:
+                edges.append((f"{path}::{parent}", node, "contains"))
+            else:
+                candidates.append((path, definition))
+            if entry_points.get(path) in ("test", "package") and not parent:
+                roots.append(node)
+    
+    reach = graph_core.build_graph(core["paths"], edges)
+    ids = reach["ids"]
+    live = graph_core.reachable(reach, [ids[node] for node in roots if node in ids])
+    unreachable_files = [path for path in core["paths"] if not live[ids[path]]]
+    unreachable_definitions = [
+        {"path": path, "name": definition["name"], "kind": definition["kind"], "line": definition["line"]}
+        for path, definition in candidates
+        if live[ids[path]] and not live[ids[f"{path}::{definition['name']}"]]
+    ]
+    return unreachable_files, unreachable_definitions
+
+def report_dead_code(core, calls_core, file_analyses, entry_points, output_file, top=20):
+    """
+    Print and export unreachable files and definitions
+    """
+    started = time.perf_counter()
+    unreachable_files, unreachable_definitions = find_dead_code(core, calls_core, file_analyses, entry_points)
+    print(f"\n{len(entry_points)} entry points leave {len(unreachable_files)} of {graph_core.node_count(core)} files "
+          f"and {len(unreachable_definitions)} top-level definitions in reachable files unreachable "
+          f"({time.perf_counter() - started:.2f}s)")
+    for path in unreachable_files[:top]:
+        print(f"  {path}")
+    for definition in unreachable_definitions[:top]:
+        print(f"  {definition['path']}:{definition['line']} {definition['kind']} {definition['name']}")
+    
+    with open(output_file, 'w') as f:
+        json.dump({
+            "entry_points": dict(sorted(entry_points.items())),
+            "unreachable_files": unreachable_files,
+            "unreachable_definitions": unreachable_definitions
+        }, f, indent=2)
+    print(f"Dead code report exported to {output_file}")
+
+def graph_to_dict(core):
+    """
+    Convert a graph core to the JSON graph format: {"nodes": [...], "edges": [...]}
+    """
+    graph = {
+        "nodes": [],
+        "edges": []
+    }
+    
+    for path in core["paths"]:
+        node = {
+            "id": path,
+            "type": "file",
+            "label": os.path.basename(path)
+        }
+        node.update(core["node_attributes"].get(path, {}))
+        graph["nodes"].append(node)
+    
+    edge_attributes = core.get("edge_attributes", {})
+    for source, target, edge_type, weight in graph_core.iter_edges(core):
+        edge = {
+            "source": source,
+            "target": target,
+            "type": edge_type,
+            "weight": weight
+        }
+        edge.update(edge_attributes.get((source, target), {}))
+        graph["edges"].append(edge)
+    
+    return graph
+
+def build_dependency_graph(file_analyses, root=None):
+    """
+    Build a dependency graph based on the file analyses
+    """
+    return graph_to_dict(build_graph_core(file_analyses, root))
+
+def export_as_dot(core, output_file, cluster=False, collapse=False):
+    """
+    Export the graph core in DOT format (for Graphviz)
+    """
+    graph_export.export_dot(core, output_file, cluster, collapse)
     print(f"DOT file exported to {output_file}")
 
+def export_graph(core, output_dir, base_name, output_formats, cluster=False, collapse=False):
+    """
+    Write a graph core in every requested format (json, dot, graphml, edgelist)
+    to <output_dir>/<base_name>.<suffix>
+    """
+    for fmt in output_formats:
+        fmt = fmt.lower()
+        if fmt == 'json':
+            output_file = os.path.join(output_dir, f"{base_name}.json")
+            with open(output_file, 'w') as f:
+                json.dump(graph_to_dict(core), f, indent=2)
+            print(f"JSON graph exported to {output_file}")
+        elif fmt == 'dot':
+            output_file = os.path.join(output_dir, f"{base_name}.dot")
+            export_as_dot(core, output_file, cluster, collapse)
+            print("To visualize the DOT file, use Graphviz: dot -Tpng -o dependencies.png " + output_file)
+        elif fmt in graph_export.EXPORTERS:
+            suffix, exporter = graph_export.EXPORTERS[fmt]
+            output_file = os.path.join(output_dir, base_name + suffix)
+            exporter(core, output_file, collapse=collapse)
+            print(f"{fmt} graph exported to {output_file}")
+        else:
+            print(f"Warning: unknown output format '{fmt}'")
+
+def report_impacted_tests(core, changed_files, dependency_types, output_file):
+    """
+    Print and export the tests affected by a set of changed files
+    """
+    impact = find_impacted_tests(core, changed_files, dependency_types)
+    print(f"\n{len(impact['changed'])} changed files affect {len(impact['affected'])} files and {len(impact['tests'])} tests")
+    for test in impact["tests"]:
+        print(f"  {test['path']}")
+        if len(test["via"]) > 1:
+            print(f"    via {' -> '.join(test['via'][1:])}")
+    
+    with open(output_file, 'w') as f:
+        json.dump(impact, f, indent=2)
+    print(f"Impacted tests exported to {output_file}")
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python dependency_graph.py <folder_path> [options]")
         print("Options:")
-        print("  --output-format=<formats>  Comma-separated list of output formats (dot,json)")
+        print("  --output-format=<formats>  Comma-separated list of output formats (json,dot,graphml,edgelist)")
+        print("  --metrics                 Add fan-in/out, PageRank, sampled betweenness and SCC size to every node")
+        print("  --samples=<n>             Source nodes sampled for betweenness (default: 32)")
+        print("  --rollup=<granularity>    Also export a rolled-up graph: directory, package or prefix:<n>")
+        print("  --drill-down=<group>      With --rollup, keep the files of one group as separate nodes")
+        print("  --cluster                 Group DOT nodes into one cluster per directory")
+        print("  --collapse-edges          Merge edges of different types between the same files")
         print("  --output-dir=<dir>        Custom output directory (default: 'outputs')")
+        print("  --roots=<files>           Comma-separated entry files; only analyze what they reach")
+        print("  --max-depth=<n>           Maximum number of edges followed from --roots (default: 3)")
+        print("  --dependency-types=<types> Comma-separated edge types to follow (e.g. import,from_import; default: all)")
+        print("  --jobs=<n>                Worker processes for file analysis (default: number of CPUs)")
+        print("  --include-paths=<dirs>    Comma-separated C/C++ include directories (-I), relative to folder_path")
+        print("  --header-cost             Report transitive header counts and bytes per C/C++ translation unit")
+        print("  --import-time=<modules>   Comma-separated Python entry modules or files to profile with -X importtime")
+        print("  --python=<interpreter>    Interpreter used for --import-time (default: the current one)")
+        print("  --call-graph              Also build the function-level call graph (<folder>_call_graph.*)")
+        print("  --dead-code               Report files and definitions no entry point reaches")
+        print("  --entry-points=<files>    Comma-separated extra entry files for --dead-code")
+        print("  --changed=<files>         Comma-separated changed files; report the tests they affect")
+        print("  --diff=<range>            Like --changed, using the files in a git diff range (e.g. HEAD, main...HEAD)")
+        print("  --store=<file>            Incremental analysis store (default: <output_dir>/<folder>_graph_store.sqlite)")
+        print("  --no-store                Analyze every file from scratch without using the store")
+        print("  --rebuild                 Discard the store and rebuild it")
         sys.exit(1)
     
     folder_path = sys.argv[1]
@@ -380,7 +2051,27 @@ def main():
     output_formats = ["json"]
     output_dir = "outputs"
     dependency_types = ['all']  # Default to all
-    max_depth = 3  # Default
+    max_depth = 3  # Default, only used together with --roots
+    roots = []
+    call_graph = False
+    import_time = []
+    python = None
+    dead_code = False
+    entry_points = []
+    include_paths = []
+    header_cost = False
+    jobs = None
+    cluster = False
+    collapse_edges = False
+    rollup = None
+    drill_down = None
+    metrics = False
+    samples = 32
+    changed = []
+    diff_range = None
+    store_file = None
+    use_store = True
+    rebuild = False
     
     # Parse additional options
     for arg in sys.argv[2:]:
@@ -393,6 +2084,46 @@ def main():
             dependency_types = arg[19:].split(',')
         elif arg.startswith('--max-depth='):
             max_depth = int(arg[12:])
+        elif arg.startswith('--roots='):
+            roots = [entry.strip() for entry in arg[8:].split(',') if entry.strip()]
+        elif arg.startswith('--include-paths='):
+            include_paths = [entry.strip() for entry in arg[16:].split(',') if entry.strip()]
+        elif arg.startswith('--jobs='):
+            jobs = int(arg[7:])
+        elif arg == '--metrics':
+            metrics = True
+        elif arg.startswith('--samples='):
+            samples = int(arg[10:])
+        elif arg.startswith('--rollup='):
+            rollup = arg[9:]
+        elif arg.startswith('--drill-down='):
+            drill_down = arg[13:]
+        elif arg == '--cluster':
+            cluster = True
+        elif arg == '--collapse-edges':
+            collapse_edges = True
+        elif arg == '--header-cost':
+            header_cost = True
+        elif arg == '--call-graph':
+            call_graph = True
+        elif arg.startswith('--import-time='):
+            import_time = [entry.strip() for entry in arg[14:].split(',') if entry.strip()]
+        elif arg.startswith('--python='):
+            python = arg[9:]
+        elif arg == '--dead-code':
+            dead_code = True
+        elif arg.startswith('--entry-points='):
+            entry_points = [entry.strip() for entry in arg[15:].split(',') if entry.strip()]
+        elif arg.startswith('--changed='):
+            changed = [entry.strip() for entry in arg[10:].split(',') if entry.strip()]
+        elif arg.startswith('--diff='):
+            diff_range = arg[7:]
+        elif arg.startswith('--store='):
+            store_file = arg[8:]
+        elif arg == '--no-store':
+            use_store = False
+        elif arg == '--rebuild':
+            rebuild = True
     
     if not os.path.exists(folder_path):
         print(f"Error: The path '{folder_path}' does not exist.")
@@ -407,54 +2138,110 @@ def main():
         os.makedirs(output_dir)
         print(f"Created output directory: {output_dir}")
     
-    # Walk through the directory and analyze Python files
-    file_analyses = []
-    supported_files = []
+    include_paths = [os.path.join(folder_path, path) for path in include_paths]
     
     print("Finding files to analyze...")
-    for root, dirs, files in os.walk(folder_path):
-        # Skip hidden directories
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if (ext == '.py' or 
-                ext in ['.js', '.jsx', '.ts', '.tsx'] or 
-                ext in ['.cpp', '.cc', '.hpp', '.h']) and not file.startswith('.'):
-                full_path = os.path.join(root, file)
-                supported_files.append(full_path)
-    
+    supported_files = find_supported_files(folder_path)
     print(f"Found {len(supported_files)} files to analyze")
     
-    # Analyze each file
-    print("\nAnalyzing files for dependencies...")
-    for file_path in supported_files:
-        language = detect_language(file_path)
-        file_info = analyze_file(file_path, language)
-        file_analyses.append(file_info)
-
-    # Build the dependency graph
-    print("\nBuilding dependency graph...")
-    graph = build_dependency_graph(file_analyses)
-    print(f"Created graph with {len(graph['nodes'])} nodes and {len(graph['edges'])} edges")
-    
     # Get the folder name for the output file
     folder_name = os.path.basename(os.path.normpath(folder_path))
     
-    # Export in requested formats
-    for fmt in output_formats:
-        if fmt.lower() == 'json':
-            output_file = os.path.join(output_dir, f"{folder_name}_dependencies.json")
-            with open(output_file, 'w') as f:
-                json.dump(graph, f, indent=2)
-            print(f"JSON dependency graph exported to {output_file}")
-        
-        elif fmt.lower() == 'dot':
-            output_file = os.path.join(output_dir, f"{folder_name}_dependencies.dot")
-            export_as_dot(graph, output_file)
-            print("To visualize the DOT file, use Graphviz: dot -Tpng -o dependencies.png " + output_file)
+    if diff_range:
+        try:
+            changed = changed + git_changed_files(folder_path, diff_range)
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
     
-    print("\nDependency analysis complete!")
+    file_analyses = None
+    connection = None
+    try:
+        if roots and not (changed or diff_range):
+            # Only analyze what is reachable from the requested roots
+            root_files = resolve_root_files(roots, folder_path, supported_files)
+            if not root_files:
+                print("Error: none of the requested roots were found")
+                sys.exit(1)
+            print(f"\nAnalyzing files reachable from {len(root_files)} roots within depth {max_depth}...")
+            core, file_analyses = build_subgraph_core(root_files, supported_files, folder_path, max_depth, dependency_types, include_paths)
+            print(f"Analyzed {len(file_analyses)} of {len(supported_files)} files")
+        elif use_store:
+            # Only files that changed since the last run are analyzed
+            print("\nUpdating analysis store...")
+            connection = update_graph_store(store_file or os.path.join(output_dir, f"{folder_name}_graph_store.sqlite"),
+                                            supported_files, folder_path, include_paths, jobs, rebuild)
+            print("\nBuilding dependency graph...")
+            core = build_graph_from_store(connection, None if changed or diff_range else dependency_types)
+        else:
+            # Analyze each file
+            print("\nAnalyzing files for dependencies...")
+            file_analyses = analyze_files(supported_files, jobs)
+        
+            # Build the dependency graph
+            print("\nBuilding dependency graph...")
+            core = build_graph_core(file_analyses, folder_path, None if changed or diff_range else dependency_types,
+                                    include_paths)
+        
+        if changed or diff_range:
+            changed_files, untracked = match_project_files(changed, folder_path, supported_files)
+            for entry in untracked:
+                print(f"Note: '{entry}' is not an analyzed source file and is ignored")
+            report_impacted_tests(core, changed_files, dependency_types,
+                                  os.path.join(output_dir, f"{folder_name}_impacted_tests.json"))
+            return
+        
+        print(f"Created graph with {graph_core.node_count(core)} nodes and {graph_core.edge_count(core)} edges")
+        cycles = [component for component in graph_core.strongly_connected_components(core)[0] if len(component) > 1]
+        if cycles:
+            print(f"Found {len(cycles)} import cycles (largest spans {max(len(component) for component in cycles)} files)")
+        
+        if metrics:
+            started = time.perf_counter()
+            ranked = compute_metrics(core, samples)
+            print(f"Computed metrics in {time.perf_counter() - started:.2f}s")
+            print_metrics(core, ranked)
+        
+        if import_time:
+            if file_analyses is None:
+                file_analyses = list(graph_store.load_analyses(connection))
+            report_import_time(core, import_time, folder_path, file_analyses,
+                               os.path.join(output_dir, f"{folder_name}_import_time.json"), python)
+        
+        # Export in requested formats
+        export_graph(core, output_dir, f"{folder_name}_dependencies", output_formats, cluster, collapse_edges)
+        
+        if rollup:
+            rolled = build_rollup(core, rollup, folder_path, drill_down)
+            print(f"\nRolled up to {graph_core.node_count(rolled)} {rollup} groups with {graph_core.edge_count(rolled)} edges")
+            name = rollup.replace(':', '')
+            if drill_down:
+                name += '_' + re.sub(r'[^\w.-]+', '_', drill_down.strip('/'))
+            export_graph(rolled, output_dir, f"{folder_name}_rollup_{name}", output_formats, cluster, collapse_edges)
+        
+        if header_cost:
+            report_header_costs(core, os.path.join(output_dir, f"{folder_name}_header_cost.json"))
+        
+        if call_graph or dead_code:
+            print("\nBuilding function call graph...")
+            if file_analyses is None:
+                file_analyses = list(graph_store.load_analyses(connection))
+            calls_core, statistics = build_call_graph(file_analyses, folder_path)
+            total_calls = statistics["resolved_calls"] + statistics["unresolved_calls"]
+            print(f"Resolved {statistics['resolved_calls']} of {total_calls} call sites and {statistics['references']} references "
+                  f"against {statistics['definitions']} definitions")
+            print(f"Created call graph with {graph_core.node_count(calls_core)} nodes and {graph_core.edge_count(calls_core)} edges")
+            if call_graph:
+                export_graph(calls_core, output_dir, f"{folder_name}_call_graph", output_formats, cluster, collapse_edges)
+            if dead_code:
+                report_dead_code(core, calls_core, file_analyses, find_entry_points(file_analyses, folder_path, entry_points),
+                                 os.path.join(output_dir, f"{folder_name}_dead_code.json"))
+        
+        print("\nDependency analysis complete!")
+    finally:
+        if connection is not None:
+            # Uncommitted changes are rolled back
+            connection.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Change notification for the extraction tools' watch modes.
+
+watch_for_changes() yields batches of changed paths under a folder. On Linux
+it uses inotify through ctypes; elsewhere (or when inotify is unavailable) it
+falls back to polling, which only relists a directory when its mtime changes.
+"""
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Time to wait for further events after the first one so that a save touching
+# several files (or write + rename) is reported as one batch
+DEBOUNCE_SECONDS = 0.01
+
+def _is_ignored(name, ignore_folders):
+    return name.startswith('.') or name in ignore_folders
+
+def _load_libc():
+    """
+    Return libc with the inotify functions, or None if they are unavailable
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+def _inotify_changes(libc, root, ignore_folders):
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    watches = {}
+
+    def add_watches(directory):
+        for current, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not _is_ignored(d, ignore_folders)]
+            wd = libc.inotify_add_watch(fd, os.fsencode(current), _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue
+            watches[wd] = current
+
+    try:
+        add_watches(root)
+        while True:
+            select.select([fd], [], [])
+            changed = set()
+            while True:
+                try:
+                    data = os.read(fd, 65536)
+                except BlockingIOError:
+                    # Queue drained; give related events a moment to arrive
+                    if select.select([fd], [], [], DEBOUNCE_SECONDS)[0]:
+                        continue
+                    break
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                    name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+                    offset += _EVENT_HEADER.size + length
+                    if mask & IN_Q_OVERFLOW:
+                        # Events were lost; the caller has to rescan everything
+                        changed.add(root)
+                        continue
+                    directory = watches.get(wd)
+                    if directory is None:
+                        continue
+                    if mask & IN_IGNORED:
+                        del watches[wd]
+                        continue
+                    if not name:
+                        if mask & IN_DELETE_SELF:
+                            changed.add(directory)
+                        continue
+                    name = os.fsdecode(name)
+                    if _is_ignored(name, ignore_folders):
+                        continue
+                    path = os.path.join(directory, name)
+                    changed.add(path)
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        add_watches(path)
+            if changed:
+                yield changed
+    finally:
+        os.close(fd)
+
+def _list_directory(directory, ignore_folders, dirs, files, children):
+    """
+    Record the entries of one directory (recursively for new subdirectories).
+    Returns the set of paths that were added.
+    """
+    added = set()
+    try:
+        dirs[directory] = os.stat(directory).st_mtime_ns
+        entries = list(os.scandir(directory))
+    except OSError:
+        return added
+    names = set()
+    for entry in entries:
+        if _is_ignored(entry.name, ignore_folders):
+            continue
+        names.add(entry.name)
+        if entry.path in dirs or entry.path in files:
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                added.add(entry.path)
+                added |= _list_directory(entry.path, ignore_folders, dirs, files, children)
+            else:
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                added.add(entry.path)
+        except OSError:
+            continue
+    children[directory] = names
+    return added
+
+def _forget(path, dirs, files, children):
+    """
+    Drop a path (and everything below it if it is a directory) from the snapshot
+    """
+    removed = {path}
+    files.pop(path, None)
+    if path in dirs:
+        del dirs[path]
+        for name in children.pop(path, ()):
+            removed |= _forget(os.path.join(path, name), dirs, files, children)
+    return removed
+
+def _poll_changes(root, ignore_folders, interval):
+    dirs = {}
+    files = {}
+    children = {}
+    _list_directory(root, ignore_folders, dirs, files, children)
+    while True:
+        time.sleep(interval)
+        changed = set()
+
+        # Entries are only added or removed when a directory's mtime changes
+        for directory, mtime in list(dirs.items()):
+            if directory not in dirs:
+                continue
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                changed |= _forget(directory, dirs, files, children)
+                continue
+            if current == mtime:
+                continue
+            previous = children.get(directory, set())
+            changed |= _list_directory(directory, ignore_folders, dirs, files, children)
+            for name in previous - children.get(directory, set()):
+                changed |= _forget(os.path.join(directory, name), dirs, files, children)
+
+        # In-place edits only show up in the file's own stat
+        for path, signature in list(files.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                changed |= _forget(path, dirs, files, children)
+                continue
+            current = (stat.st_mtime_ns, stat.st_size)
+            if current != signature:
+                files[path] = current
+                changed.add(path)
+
+        if changed:
+            yield changed
+
+def watch_for_changes(root, ignore_folders=None, interval=0.2, use_inotify=True):
+    """
+    Yield sets of paths under root that were created, modified or deleted.
+    Hidden entries and folders named in ignore_folders are not reported.
+    A batch containing root itself means events were lost and everything should be rescanned.
+    """
+    ignore_folders = set(ignore_folders or [])
+    root = os.path.normpath(root)
+    if use_inotify:
+        libc = _load_libc()
+        if libc is not None:
+            try:
+                yield from _inotify_changes(libc, root, ignore_folders)
+                return
+            except OSError as e:
+                print(f"inotify unavailable ({e}); falling back to polling")
+    yield from _poll_changes(root, ignore_folders, interval)
@@ -3,570 +3,809 @@ import os
 import sys
 import json
 import re
+import time
+import bisect
+import hashlib
 
-def extract_functions_and_classes(file_path):
+import language_registry
+
+def _build_line_index(content):
     """
-    Extract function and class names from a file based on its extension
+    Return the character and UTF-8 byte offsets at which each line of content starts
     """
-    print(f"\nAnalyzing file: {file_path}")
+    char_offsets = [0]
+    byte_offsets = [0]
+    pos = 0
+    byte_pos = 0
+    while True:
+        newline = content.find('\n', pos)
+        if newline == -1:
+            break
+        byte_pos += len(content[pos:newline + 1].encode('utf-8', errors='replace'))
+        pos = newline + 1
+        char_offsets.append(pos)
+        byte_offsets.append(byte_pos)
+    return char_offsets, byte_offsets
+
+def _locate(content, line_index, pos):
+    """
+    Convert a character offset into a (1-based line number, byte offset) pair
+    """
+    char_offsets, byte_offsets = line_index
+    line = bisect.bisect_right(char_offsets, pos) - 1
+    column_bytes = len(content[char_offsets[line]:pos].encode('utf-8', errors='replace'))
+    return line + 1, byte_offsets[line] + column_bytes
+
+def _skip_string(content, pos):
+    """
+    Return the offset just past the string literal that starts at pos
+    """
+    quote = content[pos]
+    if quote in '"\'' and content.startswith(quote * 3, pos):
+        end = content.find(quote * 3, pos + 3)
+        return len(content) if end == -1 else end + 3
+    pos += 1
+    while pos < len(content):
+        ch = content[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        if ch == quote:
+            return pos + 1
+        if ch == '\n' and quote != '`':
+            return pos
+        pos += 1
+    return pos
+
+def _python_block_end(content, start):
+    """
+    Return the offset of the end of the indented Python block whose header starts at start
+    """
+    line_start = content.rfind('\n', 0, start) + 1
+    indent = len(content[line_start:start]) - len(content[line_start:start].lstrip())
     
-    # Get file extension to determine language
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-    print(f"  File extension: {ext}")
+    # Skip the header (which may span several lines) up to its ':' at bracket depth 0
+    depth = 0
+    pos = start
+    while pos < len(content):
+        ch = content[pos]
+        if ch in '"\'':
+            pos = _skip_string(content, pos)
+            continue
+        if ch == '#':
+            newline = content.find('\n', pos)
+            pos = len(content) if newline == -1 else newline
+            continue
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        elif ch == ':' and depth <= 0:
+            break
+        pos += 1
     
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
-        print(f"  Successfully read file ({len(content)} bytes)")
-            
-        # Dictionary to store extracted items
-        extracted = {
-            "functions": [],
-            "classes": [],
-            "methods": [],
-            "language": "unknown"
-        }
+    end = content.find('\n', pos)
+    if end == -1:
+        return len(content)
+    trailing = content[pos + 1:end].strip()
+    if trailing and not trailing.startswith('#'):
+        # One-line body, e.g. "def f(): return 1"
+        return end
+    
+    # The body is every following line indented deeper than the header
+    pos = end + 1
+    while pos < len(content):
+        newline = content.find('\n', pos)
+        if newline == -1:
+            newline = len(content)
+        line = content[pos:newline]
+        stripped = line.lstrip()
+        if stripped:
+            if len(line) - len(stripped) <= indent:
+                break
+            end = newline
+        pos = newline + 1
+    return end
+
+def _brace_block_end(content, start):
+    """
+    Return the offset just past the end of the brace-delimited definition starting at start.
+    Declarations without a body end at their ';'.
+    """
+    paren_depth = 0
+    brace_depth = 0
+    expression_arrow = False
+    pos = start
+    while pos < len(content):
+        ch = content[pos]
+        if content.startswith('//', pos):
+            newline = content.find('\n', pos)
+            pos = len(content) if newline == -1 else newline
+            continue
+        if content.startswith('/*', pos):
+            comment_end = content.find('*/', pos + 2)
+            pos = len(content) if comment_end == -1 else comment_end + 2
+            continue
+        if ch in '"\'`':
+            pos = _skip_string(content, pos)
+            continue
+        if ch in '([':
+            paren_depth += 1
+        elif ch in ')]':
+            paren_depth -= 1
+        elif paren_depth <= 0:
+            if ch == '{':
+                brace_depth += 1
+            elif ch == '}':
+                brace_depth -= 1
+                if brace_depth <= 0:
+                    return pos + 1
+            elif ch == ';' and brace_depth == 0:
+                return pos + 1
+            elif ch == '=' and brace_depth == 0 and content.startswith('=>', pos):
+                expression_arrow = not content[pos + 2:].lstrip().startswith('{')
+                pos += 2
+                continue
+            elif ch == '\n' and expression_arrow:
+                # Arrow function with an expression body and no semicolon
+                return pos
+        pos += 1
+    return len(content)
+
+def _normalized_body_hash(text):
+    """
+    Hash a definition body ignoring line endings, trailing whitespace, blank lines and common indentation
+    """
+    lines = [line.rstrip() for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n')]
+    lines = [line for line in lines if line]
+    indent = min((len(line) - len(line.lstrip()) for line in lines), default=0)
+    normalized = '\n'.join(line[indent:] for line in lines)
+    return hashlib.sha1(normalized.encode('utf-8', errors='replace')).hexdigest()
+
+def _definition_record(content, line_index, name, comment, name_pos, block_end):
+    """
+    Build the output record for one definition: name, comment, span and body hash
+    """
+    # The span starts at the first non-blank character of the line declaring the name
+    line_start = content.rfind('\n', 0, name_pos) + 1
+    start = line_start + len(content[line_start:name_pos]) - len(content[line_start:name_pos].lstrip())
+    end = block_end(content, name_pos)
+    start_line, start_byte = _locate(content, line_index, start)
+    end_line = _locate(content, line_index, max(end - 1, start))[0]
+    end_byte = _locate(content, line_index, end)[1]
+    return {
+        "name": name,
+        "comment": comment.strip() if comment else None,
+        "start_line": start_line,
+        "end_line": end_line,
+        "start_byte": start_byte,
+        "end_byte": end_byte,
+        "body_hash": _normalized_body_hash(content[start:end])
+    }
+
+def extract_python_definitions(content):
+    """
+    Extract Python functions and classes with their preceding comments and docstrings
+    """
+    extracted = {"functions": [], "classes": [], "methods": []}
+    line_index = _build_line_index(content)
+    
+    # Extract functions with preceding comments
+    print(f"  Searching for Python functions...")
+    # First, find all functions
+    function_matches = list(re.finditer(r'^\s*def\s+([a-zA-Z0-9_]+)\s*\(', content, re.MULTILINE))
+    functions = []
+    
+    for match in function_matches:
+        func_name = match.group(1)
+        func_start_pos = match.start()
         
-        # Python
-        if ext in ['.py']:
-            print(f"  Detected language: Python")
-            extracted["language"] = "python"
-            
-            # Extract functions with preceding comments
-            print(f"  Searching for Python functions...")
-            # First, find all functions
-            function_matches = list(re.finditer(r'^\s*def\s+([a-zA-Z0-9_]+)\s*\(', content, re.MULTILINE))
-            functions = []
+        # Look for comments before the function
+        # This handles both # comments and docstrings
+        comment = ""
+        
+        # Look for # comments before the function
+        line_start = content.rfind('\n', 0, func_start_pos) + 1
+        if line_start > 0:
+            # Look for consecutive # comment lines before the function
+            comment_lines = []
+            current_pos = line_start - 2  # Start from the line before
             
-            for match in function_matches:
-                func_name = match.group(1)
-                func_start_pos = match.start()
-                
-                # Look for comments before the function
-                # This handles both # comments and docstrings
-                comment = ""
-                
-                # Look for # comments before the function
-                line_start = content.rfind('\n', 0, func_start_pos) + 1
-                if line_start > 0:
-                    # Look for consecutive # comment lines before the function
-                    comment_lines = []
-                    current_pos = line_start - 2  # Start from the line before
-                    
-                    while current_pos > 0:
-                        prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                        prev_line = content[prev_line_start:current_pos+1].strip()
-                        
-                        if prev_line.startswith('#'):
-                            comment_lines.insert(0, prev_line)
-                            current_pos = prev_line_start - 1
-                        else:
-                            break
-                    
-                    if comment_lines:
-                        comment = '\n'.join(comment_lines)
+            while current_pos > 0:
+                prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                prev_line = content[prev_line_start:current_pos+1].strip()
                 
-                # Look for docstring after the function definition
-                func_def_end = content.find(':', func_start_pos) + 1
-                next_line_start = content.find('\n', func_def_end) + 1
+                if prev_line.startswith('#'):
+                    comment_lines.insert(0, prev_line)
+                    current_pos = prev_line_start - 1
+                else:
+                    break
+            
+            if comment_lines:
+                comment = '\n'.join(comment_lines)
+        
+        # Look for docstring after the function definition
+        func_def_end = content.find(':', func_start_pos) + 1
+        next_line_start = content.find('\n', func_def_end) + 1
+        
+        if next_line_start > 0 and next_line_start < len(content):
+            next_line = content[next_line_start:content.find('\n', next_line_start)].strip()
+            if next_line.startswith('"""') or next_line.startswith("'''"):
+                # Found a docstring, extract it
+                docstring_start = next_line_start + content[next_line_start:].find(next_line)
+                docstring_delimiter = next_line[:3]
+                docstring_end = content.find(docstring_delimiter, docstring_start + 3)
                 
-                if next_line_start > 0 and next_line_start < len(content):
-                    next_line = content[next_line_start:content.find('\n', next_line_start)].strip()
-                    if next_line.startswith('"""') or next_line.startswith("'''"):
-                        # Found a docstring, extract it
-                        docstring_start = next_line_start + content[next_line_start:].find(next_line)
-                        docstring_delimiter = next_line[:3]
-                        docstring_end = content.find(docstring_delimiter, docstring_start + 3)
-                        
-                        if docstring_end > docstring_start:
-                            docstring = content[docstring_start:docstring_end + 3]
-                            if comment:
-                                comment += "\n\n" + docstring
-                            else:
-                                comment = docstring
+                if docstring_end > docstring_start:
+                    docstring = content[docstring_start:docstring_end + 3]
+                    if comment:
+                        comment += "\n\n" + docstring
+                    else:
+                        comment = docstring
+        
+        functions.append(_definition_record(content, line_index, func_name, comment, match.start(1), _python_block_end))
+    
+    extracted["functions"] = functions
+    print(f"  Found {len(functions)} functions")
+    
+    # Extract classes with preceding comments
+    print(f"  Searching for Python classes...")
+    class_matches = list(re.finditer(r'^\s*class\s+([a-zA-Z0-9_]+)\s*[\(:]', content, re.MULTILINE))
+    classes = []
+    
+    for match in class_matches:
+        class_name = match.group(1)
+        class_start_pos = match.start()
+        
+        # Look for comments before the class
+        comment = ""
+        
+        # Look for # comments before the class
+        line_start = content.rfind('\n', 0, class_start_pos) + 1
+        if line_start > 0:
+            # Look for consecutive # comment lines before the class
+            comment_lines = []
+            current_pos = line_start - 2  # Start from the line before
+            
+            while current_pos > 0:
+                prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                prev_line = content[prev_line_start:current_pos+1].strip()
                 
-                functions.append({"name": func_name, "comment": comment.strip() if comment else None})
+                if prev_line.startswith('#'):
+                    comment_lines.insert(0, prev_line)
+                    current_pos = prev_line_start - 1
+                else:
+                    break
             
-            extracted["functions"] = functions
-            print(f"  Found {len(functions)} functions")
+            if comment_lines:
+                comment = '\n'.join(comment_lines)
+        
+        # Look for docstring after the class definition
+        class_def_end = content.find(':', class_start_pos) + 1
+        next_line_start = content.find('\n', class_def_end) + 1
+        
+        if next_line_start > 0 and next_line_start < len(content):
+            next_line = content[next_line_start:content.find('\n', next_line_start)].strip()
+            if next_line.startswith('"""') or next_line.startswith("'''"):
+                # Found a docstring, extract it
+                docstring_start = next_line_start + content[next_line_start:].find(next_line)
+                docstring_delimiter = next_line[:3]
+                docstring_end = content.find(docstring_delimiter, docstring_start + 3)
+                
+                if docstring_end > docstring_start:
+                    docstring = content[docstring_start:docstring_end + 3]
+                    if comment:
+                        comment += "\n\n" + docstring
+                    else:
+                        comment = docstring
+        
+        classes.append(_definition_record(content, line_index, class_name, comment, match.start(1), _python_block_end))
+    
+    extracted["classes"] = classes
+    print(f"  Found {len(classes)} classes")
+    
+    return extracted
+
+def extract_javascript_definitions(content, lang_name="JavaScript"):
+    """
+    Extract JavaScript/TypeScript functions, classes and methods with their preceding comments
+    """
+    extracted = {"functions": [], "classes": [], "methods": []}
+    line_index = _build_line_index(content)
+    
+    # Extract functions with preceding comments
+    print(f"  Searching for {lang_name} functions...")
+    
+    # Find all functions (both regular and arrow functions)
+    function_patterns = [
+        r'function\s+([a-zA-Z0-9_$]+)\s*\(',  # function name()
+        r'^\s*(?:const|let|var)\s+([a-zA-Z0-9_$]+)\s*=\s*(?:async\s*)?\(.*\)\s*=>'  # const name = () =>
+    ]
+    
+    functions = []
+    
+    for pattern in function_patterns:
+        function_matches = list(re.finditer(pattern, content, re.MULTILINE))
+        
+        for match in function_matches:
+            func_name = match.group(1)
+            func_start_pos = match.start()
             
-            # Extract classes with preceding comments
-            print(f"  Searching for Python classes...")
-            class_matches = list(re.finditer(r'^\s*class\s+([a-zA-Z0-9_]+)\s*[\(:]', content, re.MULTILINE))
-            classes = []
+            # Look for comments before the function
+            comment = ""
             
-            for match in class_matches:
-                class_name = match.group(1)
-                class_start_pos = match.start()
-                
-                # Look for comments before the class
-                comment = ""
+            # Look for // comments before the function
+            line_start = content.rfind('\n', 0, func_start_pos) + 1
+            if line_start > 0:
+                # Look for consecutive // comment lines before the function
+                comment_lines = []
+                current_pos = line_start - 2  # Start from the line before
                 
-                # Look for # comments before the class
-                line_start = content.rfind('\n', 0, class_start_pos) + 1
-                if line_start > 0:
-                    # Look for consecutive # comment lines before the class
-                    comment_lines = []
-                    current_pos = line_start - 2  # Start from the line before
+                while current_pos > 0:
+                    prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                    prev_line = content[prev_line_start:current_pos+1].strip()
                     
-                    while current_pos > 0:
-                        prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                        prev_line = content[prev_line_start:current_pos+1].strip()
-                        
-                        if prev_line.startswith('#'):
-                            comment_lines.insert(0, prev_line)
-                            current_pos = prev_line_start - 1
-                        else:
-                            break
-                    
-                    if comment_lines:
-                        comment = '\n'.join(comment_lines)
+                    if prev_line.startswith('//'):
+                        comment_lines.insert(0, prev_line)
+                        current_pos = prev_line_start - 1
+                    else:
+                        break
                 
-                # Look for docstring after the class definition
-                class_def_end = content.find(':', class_start_pos) + 1
-                next_line_start = content.find('\n', class_def_end) + 1
+                if comment_lines:
+                    comment = '\n'.join(comment_lines)
+            
+            # Look for /* */ comments before the function
+            if not comment:
+                comment_end = func_start_pos
+                while comment_end > 0 and content[comment_end-1].isspace():
+                    comment_end -= 1
                 
-                if next_line_start > 0 and next_line_start < len(content):
-                    next_line = content[next_line_start:content.find('\n', next_line_start)].strip()
-                    if next_line.startswith('"""') or next_line.startswith("'''"):
-                        # Found a docstring, extract it
-                        docstring_start = next_line_start + content[next_line_start:].find(next_line)
-                        docstring_delimiter = next_line[:3]
-                        docstring_end = content.find(docstring_delimiter, docstring_start + 3)
-                        
-                        if docstring_end > docstring_start:
-                            docstring = content[docstring_start:docstring_end + 3]
-                            if comment:
-                                comment += "\n\n" + docstring
-                            else:
-                                comment = docstring
+                if comment_end > 0:
+                    comment_start = content.rfind('/*', 0, comment_end)
+                    if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                        comment_end = content.find('*/', comment_start) + 2
+                        comment = content[comment_start:comment_end]
+            
+            # Look for JSDoc comments (/** */)
+            if not comment:
+                comment_end = func_start_pos
+                while comment_end > 0 and content[comment_end-1].isspace():
+                    comment_end -= 1
                 
-                classes.append({"name": class_name, "comment": comment.strip() if comment else None})
+                if comment_end > 0:
+                    comment_start = content.rfind('/**', 0, comment_end)
+                    if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                        comment_end = content.find('*/', comment_start) + 2
+                        comment = content[comment_start:comment_end]
             
-            extracted["classes"] = classes
-            print(f"  Found {len(classes)} classes")
+            functions.append(_definition_record(content, line_index, func_name, comment, match.start(1), _brace_block_end))
+    
+    extracted["functions"] = functions
+    print(f"  Found {len(functions)} functions")
+    
+    # Extract classes with preceding comments
+    print(f"  Searching for {lang_name} classes...")
+    class_matches = list(re.finditer(r'class\s+([a-zA-Z0-9_$]+)', content, re.MULTILINE))
+    classes = []
+    
+    for match in class_matches:
+        class_name = match.group(1)
+        class_start_pos = match.start()
         
-        # JavaScript/TypeScript
-        elif ext in ['.js', '.jsx', '.ts', '.tsx']:
-            lang_name = "JavaScript" if ext in ['.js', '.jsx'] else "TypeScript"
-            print(f"  Detected language: {lang_name}")
-            extracted["language"] = "javascript" if ext in ['.js', '.jsx'] else "typescript"
-            
-            # Extract functions with preceding comments
-            print(f"  Searching for {lang_name} functions...")
+        # Look for comments before the class
+        comment = ""
+        
+        # Look for // comments before the class
+        line_start = content.rfind('\n', 0, class_start_pos) + 1
+        if line_start > 0:
+            # Look for consecutive // comment lines before the class
+            comment_lines = []
+            current_pos = line_start - 2  # Start from the line before
             
-            # Find all functions (both regular and arrow functions)
-            function_patterns = [
-                r'function\s+([a-zA-Z0-9_$]+)\s*\(',  # function name()
-                r'^\s*(?:const|let|var)\s+([a-zA-Z0-9_$]+)\s*=\s*(?:async\s*)?\(.*\)\s*=>'  # const name = () =>
-            ]
+            while current_pos > 0:
+                prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                prev_line = content[prev_line_start:current_pos+1].strip()
+                
+                if prev_line.startswith('//'):
+                    comment_lines.insert(0, prev_line)
+                    current_pos = prev_line_start - 1
+                else:
+                    break
             
-            functions = []
+            if comment_lines:
+                comment = '\n'.join(comment_lines)
+        
+        # Look for /* */ comments before the class
+        if not comment:
+            comment_end = class_start_pos
+            while comment_end > 0 and content[comment_end-1].isspace():
+                comment_end -= 1
             
-            for pattern in function_patterns:
-                function_matches = list(re.finditer(pattern, content, re.MULTILINE))
-                
-                for match in function_matches:
-                    func_name = match.group(1)
-                    func_start_pos = match.start()
-                    
-                    # Look for comments before the function
-                    comment = ""
-                    
-                    # Look for // comments before the function
-                    line_start = content.rfind('\n', 0, func_start_pos) + 1
-                    if line_start > 0:
-                        # Look for consecutive // comment lines before the function
-                        comment_lines = []
-                        current_pos = line_start - 2  # Start from the line before
-                        
-                        while current_pos > 0:
-                            prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                            prev_line = content[prev_line_start:current_pos+1].strip()
-                            
-                            if prev_line.startswith('//'):
-                                comment_lines.insert(0, prev_line)
-                                current_pos = prev_line_start - 1
-                            else:
-                                break
-                        
-                        if comment_lines:
-                            comment = '\n'.join(comment_lines)
-                    
-                    # Look for /* */ comments before the function
-                    if not comment:
-                        comment_end = func_start_pos
-                        while comment_end > 0 and content[comment_end-1].isspace():
-                            comment_end -= 1
-                        
-                        if comment_end > 0:
-                            comment_start = content.rfind('/*', 0, comment_end)
-                            if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                                comment_end = content.find('*/', comment_start) + 2
-                                comment = content[comment_start:comment_end]
-                    
-                    # Look for JSDoc comments (/** */)
-                    if not comment:
-                        comment_end = func_start_pos
-                        while comment_end > 0 and content[comment_end-1].isspace():
-                            comment_end -= 1
-                        
-                        if comment_end > 0:
-                            comment_start = content.rfind('/**', 0, comment_end)
-                            if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                                comment_end = content.find('*/', comment_start) + 2
-                                comment = content[comment_start:comment_end]
-                    
-                    functions.append({"name": func_name, "comment": comment.strip() if comment else None})
+            if comment_end > 0:
+                comment_start = content.rfind('/*', 0, comment_end)
+                if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                    comment_end = content.find('*/', comment_start) + 2
+                    comment = content[comment_start:comment_end]
+        
+        # Look for JSDoc comments (/** */)
+        if not comment:
+            comment_end = class_start_pos
+            while comment_end > 0 and content[comment_end-1].isspace():
+                comment_end -= 1
             
-            extracted["functions"] = functions
-            print(f"  Found {len(functions)} functions")
+            if comment_end > 0:
+                comment_start = content.rfind('/**', 0, comment_end)
+                if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                    comment_end = content.find('*/', comment_start) + 2
+                    comment = content[comment_start:comment_end]
+        
+        classes.append(_definition_record(content, line_index, class_name, comment, match.start(1), _brace_block_end))
+    
+    extracted["classes"] = classes
+    print(f"  Found {len(classes)} classes")
+    
+    # Extract methods with preceding comments
+    print(f"  Searching for {lang_name} methods...")
+    method_matches = list(re.finditer(r'(?:async\s+)?([a-zA-Z0-9_$]+)\s*\([^)]*\)\s*{', content, re.MULTILINE))
+    methods = []
+    
+    for match in method_matches:
+        method_name = match.group(1)
+        if method_name not in ['if', 'for', 'while', 'switch', 'catch']:
+            method_start_pos = match.start()
             
-            # Extract classes with preceding comments
-            print(f"  Searching for {lang_name} classes...")
-            class_matches = list(re.finditer(r'class\s+([a-zA-Z0-9_$]+)', content, re.MULTILINE))
-            classes = []
+            # Look for comments before the method
+            comment = ""
             
-            for match in class_matches:
-                class_name = match.group(1)
-                class_start_pos = match.start()
-                
-                # Look for comments before the class
-                comment = ""
+            # Look for // comments before the method
+            line_start = content.rfind('\n', 0, method_start_pos) + 1
+            if line_start > 0:
+                # Look for consecutive // comment lines before the method
+                comment_lines = []
+                current_pos = line_start - 2  # Start from the line before
                 
-                # Look for // comments before the class
-                line_start = content.rfind('\n', 0, class_start_pos) + 1
-                if line_start > 0:
-                    # Look for consecutive // comment lines before the class
-                    comment_lines = []
-                    current_pos = line_start - 2  # Start from the line before
+                while current_pos > 0:
+                    prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                    prev_line = content[prev_line_start:current_pos+1].strip()
                     
-                    while current_pos > 0:
-                        prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                        prev_line = content[prev_line_start:current_pos+1].strip()
-                        
-                        if prev_line.startswith('//'):
-                            comment_lines.insert(0, prev_line)
-                            current_pos = prev_line_start - 1
-                        else:
-                            break
-                    
-                    if comment_lines:
-                        comment = '\n'.join(comment_lines)
+                    if prev_line.startswith('//'):
+                        comment_lines.insert(0, prev_line)
+                        current_pos = prev_line_start - 1
+                    else:
+                        break
                 
-                # Look for /* */ comments before the class
-                if not comment:
-                    comment_end = class_start_pos
-                    while comment_end > 0 and content[comment_end-1].isspace():
-                        comment_end -= 1
-                    
-                    if comment_end > 0:
-                        comment_start = content.rfind('/*', 0, comment_end)
-                        if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                            comment_end = content.find('*/', comment_start) + 2
-                            comment = content[comment_start:comment_end]
+                if comment_lines:
+                    comment = '\n'.join(comment_lines)
+            
+            # Look for /* */ comments before the method
+            if not comment:
+                comment_end = method_start_pos
+                while comment_end > 0 and content[comment_end-1].isspace():
+                    comment_end -= 1
                 
-                # Look for JSDoc comments (/** */)
-                if not comment:
-                    comment_end = class_start_pos
-                    while comment_end > 0 and content[comment_end-1].isspace():
-                        comment_end -= 1
-                    
-                    if comment_end > 0:
-                        comment_start = content.rfind('/**', 0, comment_end)
-                        if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                            comment_end = content.find('*/', comment_start) + 2
-                            comment = content[comment_start:comment_end]
+                if comment_end > 0:
+                    comment_start = content.rfind('/*', 0, comment_end)
+                    if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                        comment_end = content.find('*/', comment_start) + 2
+                        comment = content[comment_start:comment_end]
+            
+            methods.append(_definition_record(content, line_index, method_name, comment, match.start(1), _brace_block_end))
+    
+    extracted["methods"] = methods
+    print(f"  Found {len(methods)} methods")
+    
+    return extracted
+
+def extract_typescript_definitions(content):
+    """
+    Extract TypeScript definitions (same patterns as JavaScript)
+    """
+    return extract_javascript_definitions(content, lang_name="TypeScript")
+
+def extract_java_definitions(content, lang_name="Java"):
+    """
+    Extract Java/C# classes, interfaces and methods with their preceding comments
+    """
+    extracted = {"functions": [], "classes": [], "methods": []}
+    line_index = _build_line_index(content)
+    
+    # Extract classes and interfaces with preceding comments
+    print(f"  Searching for {lang_name} classes and interfaces...")
+    class_matches = list(re.finditer(r'(?:public|private|protected)?\s+(?:abstract|final)?\s*(?:class|interface)\s+([a-zA-Z0-9_$]+)', content, re.MULTILINE))
+    classes = []
+    
+    for match in class_matches:
+        class_name = match.group(1)
+        class_start_pos = match.start()
+        
+        # Look for comments before the class
+        comment = ""
+        
+        # Look for // comments before the class
+        line_start = content.rfind('\n', 0, class_start_pos) + 1
+        if line_start > 0:
+            # Look for consecutive // comment lines before the class
+            comment_lines = []
+            current_pos = line_start - 2  # Start from the line before
+            
+            while current_pos > 0:
+                prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                prev_line = content[prev_line_start:current_pos+1].strip()
                 
-                classes.append({"name": class_name, "comment": comment.strip() if comment else None})
+                if prev_line.startswith('//'):
+                    comment_lines.insert(0, prev_line)
+                    current_pos = prev_line_start - 1
+                else:
+                    break
             
-            extracted["classes"] = classes
-            print(f"  Found {len(classes)} classes")
+            if comment_lines:
+                comment = '\n'.join(comment_lines)
+        
+        # Look for /* */ comments before the class
+        if not comment:
+            comment_end = class_start_pos
+            while comment_end > 0 and content[comment_end-1].isspace():
+                comment_end -= 1
             
-            # Extract methods with preceding comments
-            print(f"  Searching for {lang_name} methods...")
-            method_matches = list(re.finditer(r'(?:async\s+)?([a-zA-Z0-9_$]+)\s*\([^)]*\)\s*{', content, re.MULTILINE))
-            methods = []
+            if comment_end > 0:
+                comment_start = content.rfind('/*', 0, comment_end)
+                if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                    comment_end = content.find('*/', comment_start) + 2
+                    comment = content[comment_start:comment_end]
+        
+        # Look for Javadoc comments (/** */)
+        if not comment:
+            comment_end = class_start_pos
+            while comment_end > 0 and content[comment_end-1].isspace():
+                comment_end -= 1
             
-            for match in method_matches:
-                method_name = match.group(1)
-                if method_name not in ['if', 'for', 'while', 'switch', 'catch']:
-                    method_start_pos = match.start()
-                    
-                    # Look for comments before the method
-                    comment = ""
-                    
-                    # Look for // comments before the method
-                    line_start = content.rfind('\n', 0, method_start_pos) + 1
-                    if line_start > 0:
-                        # Look for consecutive // comment lines before the method
-                        comment_lines = []
-                        current_pos = line_start - 2  # Start from the line before
-                        
-                        while current_pos > 0:
-                            prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                            prev_line = content[prev_line_start:current_pos+1].strip()
-                            
-                            if prev_line.startswith('//'):
-                                comment_lines.insert(0, prev_line)
-                                current_pos = prev_line_start - 1
-                            else:
-                                break
-                        
-                        if comment_lines:
-                            comment = '\n'.join(comment_lines)
-                    
-                    # Look for /* */ comments before the method
-                    if not comment:
-                        comment_end = method_start_pos
-                        while comment_end > 0 and content[comment_end-1].isspace():
-                            comment_end -= 1
-                        
-                        if comment_end > 0:
-                            comment_start = content.rfind('/*', 0, comment_end)
-                            if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                                comment_end = content.find('*/', comment_start) + 2
-                                comment = content[comment_start:comment_end]
-                    
-                    methods.append({"name": method_name, "comment": comment.strip() if comment else None})
+            if comment_end > 0:
+                comment_start = content.rfind('/**', 0, comment_end)
+                if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                    comment_end = content.find('*/', comment_start) + 2
+                    comment = content[comment_start:comment_end]
+        
+        classes.append(_definition_record(content, line_index, class_name, comment, match.start(1), _brace_block_end))
+    
+    extracted["classes"] = classes
+    print(f"  Found {len(classes)} classes/interfaces")
+    
+    # Extract methods with preceding comments
+    print(f"  Searching for {lang_name} methods...")
+    method_matches = list(re.finditer(r'(?:public|private|protected)?\s+(?:static|final|abstract)?\s+[a-zA-Z0-9_$<>]+\s+([a-zA-Z0-9_$]+)\s*\([^)]*\)', content, re.MULTILINE))
+    methods = []
+    
+    for match in method_matches:
+        method_name = match.group(1)
+        method_start_pos = match.start()
+        
+        # Look for comments before the method
+        comment = ""
+        
+        # Look for // comments before the method
+        line_start = content.rfind('\n', 0, method_start_pos) + 1
+        if line_start > 0:
+            # Look for consecutive // comment lines before the method
+            comment_lines = []
+            current_pos = line_start - 2  # Start from the line before
             
-            extracted["methods"] = methods
-            print(f"  Found {len(methods)} methods")
+            while current_pos > 0:
+                prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                prev_line = content[prev_line_start:current_pos+1].strip()
+                
+                if prev_line.startswith('//'):
+                    comment_lines.insert(0, prev_line)
+                    current_pos = prev_line_start - 1
+                else:
+                    break
             
-        # Java/C#
-        elif ext in ['.java', '.cs']:
-            lang_name = "Java" if ext == '.java' else "C#"
-            print(f"  Detected language: {lang_name}")
-            extracted["language"] = "java" if ext == '.java' else "csharp"
+            if comment_lines:
+                comment = '\n'.join(comment_lines)
+        
+        # Look for /* */ comments before the method
+        if not comment:
+            comment_end = method_start_pos
+            while comment_end > 0 and content[comment_end-1].isspace():
+                comment_end -= 1
             
-            # Extract classes and interfaces with preceding comments
-            print(f"  Searching for {lang_name} classes and interfaces...")
-            class_matches = list(re.finditer(r'(?:public|private|protected)?\s+(?:abstract|final)?\s*(?:class|interface)\s+([a-zA-Z0-9_$]+)', content, re.MULTILINE))
-            classes = []
+            if comment_end > 0:
+                comment_start = content.rfind('/*', 0, comment_end)
+                if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                    comment_end = content.find('*/', comment_start) + 2
+                    comment = content[comment_start:comment_end]
+        
+        # Look for Javadoc comments (/** */)
+        if not comment:
+            comment_end = method_start_pos
+            while comment_end > 0 and content[comment_end-1].isspace():
+                comment_end -= 1
             
-            for match in class_matches:
-                class_name = match.group(1)
-                class_start_pos = match.start()
-                
-                # Look for comments before the class
-                comment = ""
-                
-                # Look for // comments before the class
-                line_start = content.rfind('\n', 0, class_start_pos) + 1
-                if line_start > 0:
-                    # Look for consecutive // comment lines before the class
-                    comment_lines = []
-                    current_pos = line_start - 2  # Start from the line before
-                    
-                    while current_pos > 0:
-                        prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                        prev_line = content[prev_line_start:current_pos+1].strip()
-                        
-                        if prev_line.startswith('//'):
-                            comment_lines.insert(0, prev_line)
-                            current_pos = prev_line_start - 1
-                        else:
-                            break
-                    
-                    if comment_lines:
-                        comment = '\n'.join(comment_lines)
+            if comment_end > 0:
+                comment_start = content.rfind('/**', 0, comment_end)
+                if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                    comment_end = content.find('*/', comment_start) + 2
+                    comment = content[comment_start:comment_end]
+        
+        methods.append(_definition_record(content, line_index, method_name, comment, match.start(1), _brace_block_end))
+    
+    extracted["methods"] = methods
+    print(f"  Found {len(methods)} methods")
+    
+    return extracted
+
+def extract_csharp_definitions(content):
+    """
+    Extract C# definitions (same patterns as Java)
+    """
+    return extract_java_definitions(content, lang_name="C#")
+
+def extract_c_definitions(content, lang_name="C"):
+    """
+    Extract C/C++ functions (and C++ classes) with their preceding comments
+    """
+    extracted = {"functions": [], "classes": [], "methods": []}
+    line_index = _build_line_index(content)
+    
+    # Extract functions with preceding comments
+    print(f"  Searching for {lang_name} functions...")
+    function_matches = list(re.finditer(r'(?:[\w:]+\s+)+(\w+)\s*\([^)]*\)\s*(?:const)?\s*(?:{|;)', content, re.MULTILINE))
+    functions = []
+    
+    for match in function_matches:
+        func_name = match.group(1)
+        if func_name not in ['if', 'for', 'while', 'switch', 'catch']:
+            func_start_pos = match.start()
+            
+            # Look for comments before the function
+            comment = ""
+            
+            # Look for // comments before the function
+            line_start = content.rfind('\n', 0, func_start_pos) + 1
+            if line_start > 0:
+                # Look for consecutive // comment lines before the function
+                comment_lines = []
+                current_pos = line_start - 2  # Start from the line before
                 
-                # Look for /* */ comments before the class
-                if not comment:
-                    comment_end = class_start_pos
-                    while comment_end > 0 and content[comment_end-1].isspace():
-                        comment_end -= 1
+                while current_pos > 0:
+                    prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                    prev_line = content[prev_line_start:current_pos+1].strip()
                     
-                    if comment_end > 0:
-                        comment_start = content.rfind('/*', 0, comment_end)
-                        if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                            comment_end = content.find('*/', comment_start) + 2
-                            comment = content[comment_start:comment_end]
+                    if prev_line.startswith('//'):
+                        comment_lines.insert(0, prev_line)
+                        current_pos = prev_line_start - 1
+                    else:
+                        break
                 
-                # Look for Javadoc comments (/** */)
-                if not comment:
-                    comment_end = class_start_pos
-                    while comment_end > 0 and content[comment_end-1].isspace():
-                        comment_end -= 1
-                    
-                    if comment_end > 0:
-                        comment_start = content.rfind('/**', 0, comment_end)
-                        if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                            comment_end = content.find('*/', comment_start) + 2
-                            comment = content[comment_start:comment_end]
+                if comment_lines:
+                    comment = '\n'.join(comment_lines)
+            
+            # Look for /* */ comments before the function
+            if not comment:
+                comment_end = func_start_pos
+                while comment_end > 0 and content[comment_end-1].isspace():
+                    comment_end -= 1
                 
-                classes.append({"name": class_name, "comment": comment.strip() if comment else None})
+                if comment_end > 0:
+                    comment_start = content.rfind('/*', 0, comment_end)
+                    if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                        comment_end = content.find('*/', comment_start) + 2
+                        comment = content[comment_start:comment_end]
             
-            extracted["classes"] = classes
-            print(f"  Found {len(classes)} classes/interfaces")
+            functions.append(_definition_record(content, line_index, func_name, comment, match.start(1), _brace_block_end))
+    
+    extracted["functions"] = functions
+    print(f"  Found {len(functions)} functions")
+
+    # Extract classes (C++ only) with preceding comments
+    if lang_name == "C++":
+        print(f"  Searching for C++ classes...")
+        class_matches = list(re.finditer(r'class\s+([a-zA-Z0-9_]+)', content, re.MULTILINE))
+        classes = []
+        
+        for match in class_matches:
+            class_name = match.group(1)
+            class_start_pos = match.start()
             
-            # Extract methods with preceding comments
-            print(f"  Searching for {lang_name} methods...")
-            method_matches = list(re.finditer(r'(?:public|private|protected)?\s+(?:static|final|abstract)?\s+[a-zA-Z0-9_$<>]+\s+([a-zA-Z0-9_$]+)\s*\([^)]*\)', content, re.MULTILINE))
-            methods = []
+            # Look for comments before the class
+            comment = ""
             
-            for match in method_matches:
-                method_name = match.group(1)
-                method_start_pos = match.start()
+            # Look for // comments before the class
+            line_start = content.rfind('\n', 0, class_start_pos) + 1
+            if line_start > 0:
+                # Look for consecutive // comment lines before the class
+                comment_lines = []
+                current_pos = line_start - 2  # Start from the line before
                 
-                # Look for comments before the method
-                comment = ""
-                
-                # Look for // comments before the method
-                line_start = content.rfind('\n', 0, method_start_pos) + 1
-                if line_start > 0:
-                    # Look for consecutive // comment lines before the method
-                    comment_lines = []
-                    current_pos = line_start - 2  # Start from the line before
-                    
-                    while current_pos > 0:
-                        prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                        prev_line = content[prev_line_start:current_pos+1].strip()
-                        
-                        if prev_line.startswith('//'):
-                            comment_lines.insert(0, prev_line)
-                            current_pos = prev_line_start - 1
-                        else:
-                            break
-                    
-                    if comment_lines:
-                        comment = '\n'.join(comment_lines)
-                
-                # Look for /* */ comments before the method
-                if not comment:
-                    comment_end = method_start_pos
-                    while comment_end > 0 and content[comment_end-1].isspace():
-                        comment_end -= 1
+                while current_pos > 0:
+                    prev_line_start = content.rfind('\n', 0, current_pos) + 1
+                    prev_line = content[prev_line_start:current_pos+1].strip()
                     
-                    if comment_end > 0:
-                        comment_start = content.rfind('/*', 0, comment_end)
-                        if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                            comment_end = content.find('*/', comment_start) + 2
-                            comment = content[comment_start:comment_end]
+                    if prev_line.startswith('//'):
+                        comment_lines.insert(0, prev_line)
+                        current_pos = prev_line_start - 1
+                    else:
+                        break
                 
-                # Look for Javadoc comments (/** */)
-                if not comment:
-                    comment_end = method_start_pos
-                    while comment_end > 0 and content[comment_end-1].isspace():
-                        comment_end -= 1
-                    
-                    if comment_end > 0:
-                        comment_start = content.rfind('/**', 0, comment_end)
-                        if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                            comment_end = content.find('*/', comment_start) + 2
-                            comment = content[comment_start:comment_end]
+                if comment_lines:
+                    comment = '\n'.join(comment_lines)
+            
+            # Look for /* */ comments before the class
+            if not comment:
+                comment_end = class_start_pos
+                while comment_end > 0 and content[comment_end-1].isspace():
+                    comment_end -= 1
                 
-                methods.append({"name": method_name, "comment": comment.strip() if comment else None})
-            
-            extracted["methods"] = methods
-            print(f"  Found {len(methods)} methods")
-        
-        # C/C++
-        elif ext in ['.c', '.cpp', '.cc', '.h', '.hpp']:
-            lang_name = "C" if ext in ['.c', '.h'] else "C++"
-            print(f"  Detected language: {lang_name}")
-            extracted["language"] = "c" if ext in ['.c', '.h'] else "cpp"
-            
-            # Extract functions with preceding comments
-            print(f"  Searching for {lang_name} functions...")
-            function_matches = list(re.finditer(r'(?:[\w:]+\s+)+(\w+)\s*\([^)]*\)\s*(?:const)?\s*(?:{|;)', content, re.MULTILINE))
-            functions = []
-            
-            for match in function_matches:
-                func_name = match.group(1)
-                if func_name not in ['if', 'for', 'while', 'switch', 'catch']:
-                    func_start_pos = match.start()
-                    
-                    # Look for comments before the function
-                    comment = ""
-                    
-                    # Look for // comments before the function
-                    line_start = content.rfind('\n', 0, func_start_pos) + 1
-                    if line_start > 0:
-                        # Look for consecutive // comment lines before the function
-                        comment_lines = []
-                        current_pos = line_start - 2  # Start from the line before
-                        
-                        while current_pos > 0:
-                            prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                            prev_line = content[prev_line_start:current_pos+1].strip()
-                            
-                            if prev_line.startswith('//'):
-                                comment_lines.insert(0, prev_line)
-                                current_pos = prev_line_start - 1
-                            else:
-                                break
-                        
-                        if comment_lines:
-                            comment = '\n'.join(comment_lines)
-                    
-                    # Look for /* */ comments before the function
-                    if not comment:
-                        comment_end = func_start_pos
-                        while comment_end > 0 and content[comment_end-1].isspace():
-                            comment_end -= 1
-                        
-                        if comment_end > 0:
-                            comment_start = content.rfind('/*', 0, comment_end)
-                            if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                                comment_end = content.find('*/', comment_start) + 2
-                                comment = content[comment_start:comment_end]
-                    
-                    functions.append({"name": func_name, "comment": comment.strip() if comment else None})
+                if comment_end > 0:
+                    comment_start = content.rfind('/*', 0, comment_end)
+                    if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
+                        comment_end = content.find('*/', comment_start) + 2
+                        comment = content[comment_start:comment_end]
             
-            extracted["functions"] = functions
-            print(f"  Found {len(functions)} functions")
+            classes.append(_definition_record(content, line_index, class_name, comment, match.start(1), _brace_block_end))
+        
+        extracted["classes"] = classes
+        print(f"  Found {len(classes)} classes")
+    
+    return extracted
+
+def extract_cpp_definitions(content):
+    """
+    Extract C++ functions and classes with their preceding comments
+    """
+    return extract_c_definitions(content, lang_name="C++")
+
+# Human-readable names used in progress output
+LANGUAGE_DISPLAY_NAMES = {
+    "python": "Python",
+    "javascript": "JavaScript",
+    "typescript": "TypeScript",
+    "java": "Java",
+    "csharp": "C#",
+    "c": "C",
+    "cpp": "C++",
+}
+
+# Built-in extractors; other languages can be added with
+# language_registry.register_handler(<language>, "definitions", <callable or "module:function">)
+language_registry.register_handler("python", "definitions", extract_python_definitions)
+language_registry.register_handler("javascript", "definitions", extract_javascript_definitions)
+language_registry.register_handler("typescript", "definitions", extract_typescript_definitions)
+language_registry.register_handler("java", "definitions", extract_java_definitions)
+language_registry.register_handler("csharp", "definitions", extract_csharp_definitions)
+language_registry.register_handler("c", "definitions", extract_c_definitions)
+language_registry.register_handler("cpp", "definitions", extract_cpp_definitions)
+
+def extract_functions_and_classes(file_path):
+    """
+    Extract function and class names from a file based on its language
+    """
+    print(f"\nAnalyzing file: {file_path}")
+    
+    # Get file extension to determine language
+    _, ext = os.path.splitext(file_path)
+    ext = ext.lower()
+    print(f"  File extension: {ext}")
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        print(f"  Successfully read file ({len(content)} bytes)")
             
-            # Extract classes (C++ only) with preceding comments
-            if ext in ['.cpp', '.cc', '.hpp']:
-                print(f"  Searching for C++ classes...")
-                class_matches = list(re.finditer(r'class\s+([a-zA-Z0-9_]+)', content, re.MULTILINE))
-                classes = []
-                
-                for match in class_matches:
-                    class_name = match.group(1)
-                    class_start_pos = match.start()
-                    
-                    # Look for comments before the class
-                    comment = ""
-                    
-                    # Look for // comments before the class
-                    line_start = content.rfind('\n', 0, class_start_pos) + 1
-                    if line_start > 0:
-                        # Look for consecutive // comment lines before the class
-                        comment_lines = []
-                        current_pos = line_start - 2  # Start from the line before
-                        
-                        while current_pos > 0:
-                            prev_line_start = content.rfind('\n', 0, current_pos) + 1
-                            prev_line = content[prev_line_start:current_pos+1].strip()
-                            
-                            if prev_line.startswith('//'):
-                                comment_lines.insert(0, prev_line)
-                                current_pos = prev_line_start - 1
-                            else:
-                                break
-                        
-                        if comment_lines:
-                            comment = '\n'.join(comment_lines)
-                    
-                    # Look for /* */ comments before the class
-                    if not comment:
-                        comment_end = class_start_pos
-                        while comment_end > 0 and content[comment_end-1].isspace():
-                            comment_end -= 1
-                        
-                        if comment_end > 0:
-                            comment_start = content.rfind('/*', 0, comment_end)
-                            if comment_start >= 0 and content.find('*/', comment_start, comment_end) > comment_start:
-                                comment_end = content.find('*/', comment_start) + 2
-                                comment = content[comment_start:comment_end]
-                    
-                    classes.append({"name": class_name, "comment": comment.strip() if comment else None})
-                
-                extracted["classes"] = classes
-                print(f"  Found {len(classes)} classes")
+        # Dictionary to store extracted items
+        extracted = {
+            "functions": [],
+            "classes": [],
+            "methods": [],
+            "language": "unknown"
+        }
+        
+        # Single registry lookup instead of a chain of extension tests
+        language = language_registry.detect_language(file_path)
+        extractor = language_registry.get_handler(language, "definitions")
+        if extractor is not None:
+            print(f"  Detected language: {LANGUAGE_DISPLAY_NAMES.get(language, language)}")
+            extracted.update(extractor(content))
+            extracted["language"] = language
         else:
             print(f"  Unsupported file extension: {ext} - skipping detailed analysis")
         
@@ -683,6 +922,189 @@ def generate_folder_structure(path, ignore_folders=None):
     
     return structure
 
+def iter_source_files(path, ignore_folders=None, rel_path=None):
+    """
+    Yield (relative path, absolute path) for every file in the same order and
+    with the same skipping rules as generate_folder_structure
+    """
+    if ignore_folders is None:
+        ignore_folders = []
+    
+    if not os.path.isdir(path):
+        yield (rel_path or os.path.basename(path)), path
+        return
+    if rel_path is not None and os.path.basename(path) in ignore_folders:
+        return
+    
+    try:
+        items = sorted(os.listdir(path))
+    except Exception as e:
+        print(f"  ERROR: Failed to list {path}: {type(e).__name__}: {str(e)}", file=sys.stderr)
+        return
+    for item in items:
+        if item.startswith('.'):
+            continue
+        item_rel = item if rel_path is None else f"{rel_path}/{item}"
+        yield from iter_source_files(os.path.join(path, item), ignore_folders, item_rel)
+
+def write_definitions_ndjson(folder_path, ignore_folders, output_file, flush_every=100, flush_seconds=1.0):
+    """
+    Stream one JSON record per file (path, language, definitions) to output_file
+    as soon as it is parsed. Output is flushed every flush_every records or
+    flush_seconds, so consumers can follow along and a crash keeps what was written.
+    Returns the number of records written.
+    """
+    count = 0
+    last_flush = time.monotonic()
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for rel_path, file_path in iter_source_files(folder_path, ignore_folders):
+            definitions = extract_functions_and_classes(file_path)
+            language = definitions.pop("language", "unknown")
+            record = {"path": rel_path, "language": language, "definitions": definitions}
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+            if count % flush_every == 0 or time.monotonic() - last_flush >= flush_seconds:
+                f.flush()
+                last_flush = time.monotonic()
+    return count
+
+def _index_structure(node, path, nodes):
+    """
+    Map every path in a folder structure to its node
+    """
+    nodes[path] = node
+    for child in node.get("children", []):
+        _index_structure(child, os.path.normpath(os.path.join(path, child["name"])), nodes)
+
+def _serialize_structure(node, path, depth, cache):
+    """
+    Serialize a folder structure exactly like json.dump(..., indent=2, ensure_ascii=False),
+    reusing the cached text of file nodes that have not changed
+    """
+    if node.get("type") != "directory":
+        text = cache.get(path)
+        if text is None:
+            text = json.dumps(node, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * depth)
+            cache[path] = text
+        return text
+    
+    inner = '  ' * (depth + 1)
+    parts = []
+    for key, value in node.items():
+        if key == "children" and value:
+            child_indent = '  ' * (depth + 2)
+            items = (',\n' + child_indent).join(
+                _serialize_structure(child, os.path.normpath(os.path.join(path, child["name"])), depth + 2, cache)
+                for child in value
+            )
+            text = '[\n' + child_indent + items + '\n' + inner + ']'
+        else:
+            text = json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + inner)
+        parts.append(json.dumps(key, ensure_ascii=False) + ': ' + text)
+    return '{\n' + inner + (',\n' + inner).join(parts) + '\n' + '  ' * depth + '}'
+
+def _write_atomically(output_file, text):
+    """
+    Replace output_file with text so that readers never see a partial file
+    """
+    temp_file = output_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_file, output_file)
+
+def _parent_path(path):
+    """
+    Parent of a normalized path; the parent of a top-level relative path is "."
+    """
+    return os.path.dirname(path) or os.curdir
+
+def apply_changes(root_path, changed_paths, ignore_folders, nodes, cache):
+    """
+    Patch an in-memory folder structure for a batch of changed paths.
+    Only the touched files (or newly created folders) are re-extracted.
+    Returns the number of entries that were updated.
+    """
+    root_path = os.path.normpath(root_path)
+    updated = 0
+    regenerated = set()
+    
+    # Handle parents before children so that a new folder is generated once
+    for path in sorted(changed_paths, key=len):
+        path = os.path.normpath(path)
+        
+        # A path below a folder that is not in the tree yet belongs to that folder
+        while path != root_path and _parent_path(path) not in nodes:
+            if _parent_path(path) == path:
+                break
+            path = _parent_path(path)
+        if path == root_path or path in regenerated or _parent_path(path) not in nodes:
+            continue
+        ancestor = _parent_path(path)
+        while ancestor != root_path and ancestor not in regenerated and _parent_path(ancestor) != ancestor:
+            ancestor = _parent_path(ancestor)
+        if ancestor != root_path:
+            continue
+        
+        parent = nodes[_parent_path(path)]
+        name = os.path.basename(path)
+        if name.startswith('.'):
+            continue
+        
+        # Drop the old entry, its index entries and its cached serialization
+        prefix = path + os.sep
+        for stale in [p for p in nodes if p == path or p.startswith(prefix)]:
+            del nodes[stale]
+            cache.pop(stale, None)
+        children = parent.setdefault("children", [])
+        names = [child["name"] for child in children]
+        position = bisect.bisect_left(names, name)
+        if position < len(children) and children[position]["name"] == name:
+            del children[position]
+        
+        if os.path.exists(path):
+            node = generate_folder_structure(path, ignore_folders)
+            if node is not None:
+                children.insert(position, node)
+                _index_structure(node, path, nodes)
+        regenerated.add(path)
+        updated += 1
+    
+    return updated
+
+def watch_definitions(folder_path, ignore_folders, structure, output_file, interval=0.2):
+    """
+    Keep the definitions tree in memory and rewrite output_file whenever files change
+    """
+    import file_watcher
+    
+    root_path = os.path.normpath(folder_path)
+    nodes = {}
+    cache = {}
+    _index_structure(structure, root_path, nodes)
+    _write_atomically(output_file, _serialize_structure(structure, root_path, 0, cache))
+    
+    print(f"Watching {folder_path} for changes (Ctrl+C to stop)...")
+    try:
+        for changed_paths in file_watcher.watch_for_changes(root_path, ignore_folders, interval):
+            started = time.perf_counter()
+            if root_path in changed_paths:
+                # Change events were lost; rebuild everything
+                structure = generate_folder_structure(folder_path, ignore_folders)
+                nodes.clear()
+                cache.clear()
+                _index_structure(structure, root_path, nodes)
+                updated = len(nodes)
+            else:
+                updated = apply_changes(root_path, changed_paths, ignore_folders, nodes, cache)
+            if not updated:
+                continue
+            _write_atomically(output_file, _serialize_structure(structure, root_path, 0, cache))
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"Updated {updated} entries in {output_file} ({elapsed:.1f} ms)")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
 def main():
     #print("\n===== FUNCTION AND CLASS EXTRACTOR =====")
     #print(f"Command line arguments: {sys.argv}")
@@ -695,11 +1117,21 @@ def main():
     folder_path = sys.argv[1]
     #print(f"\nTarget folder: {folder_path}")
     
-    # Parse ignore folders if provided
+    # Parse ignore folders and options if provided
     ignore_folders = []
-    if len(sys.argv) > 2:
-        ignore_folders = [folder.strip() for folder in sys.argv[2].split(',')]
-        #print(f"Ignoring folders: {', '.join(ignore_folders)}")
+    watch = False
+    interval = 0.2
+    output_format = "json"
+    for arg in sys.argv[2:]:
+        if arg == '--watch':
+            watch = True
+        elif arg.startswith('--format='):
+            output_format = arg[9:].strip().lower()
+        elif arg.startswith('--interval='):
+            interval = float(arg[11:])
+        elif not arg.startswith('--'):
+            ignore_folders = [folder.strip() for folder in arg.split(',')]
+            #print(f"Ignoring folders: {', '.join(ignore_folders)}")
     
     if not os.path.exists(folder_path):
         #print(f"\nERROR: The path '{folder_path}' does not exist.")
@@ -708,6 +1140,14 @@ def main():
     if not os.path.isdir(folder_path):
         #print(f"\nERROR: '{folder_path}' is not a directory.")
         sys.exit(1)
+    
+    if output_format not in ("json", "ndjson"):
+        print(f"ERROR: Unknown output format '{output_format}' (expected json or ndjson)", file=sys.stderr)
+        sys.exit(1)
+    
+    if watch and output_format != "json":
+        print("ERROR: --watch is only supported with --format=json", file=sys.stderr)
+        sys.exit(1)
 
     # Create outputs directory if it doesn't exist
     outputs_dir = "outputs"
@@ -724,29 +1164,46 @@ def main():
         #print(f"Using existing directory: {outputs_dir}")
         pass
 
+    # Get the folder name for the output file
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    
+    if output_format == "ndjson":
+        # Stream one record per file instead of building the whole tree in memory
+        output_file = os.path.join(outputs_dir, f"{folder_name}_definitions.ndjson")
+        try:
+            count = write_definitions_ndjson(folder_path, ignore_folders, output_file)
+        except Exception as e:
+            print(f"ERROR: Failed to write output file {output_file}: {type(e).__name__}: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Wrote {count} records to '{output_file}'")
+        return
+    
     # Generate folder structure
     #print("\n===== GENERATING FOLDER STRUCTURE =====")
     #print("Starting analysis of directory structure and file contents...")
     structure = generate_folder_structure(folder_path, ignore_folders)
     
-    # Get the folder name for the output file
-    folder_name = os.path.basename(os.path.normpath(folder_path))
     output_file = os.path.join(outputs_dir, f"{folder_name}_definitions.json")
     
     # Write to file
     #print(f"\n===== SAVING RESULTS =====")
     #print(f"Writing results to: {output_file}")
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
+        temp_file = output_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
             json.dump(structure, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, output_file)
         file_size = os.path.getsize(output_file)
         #print(f"Successfully saved output file ({file_size} bytes)")
     except Exception as e:
-        #print(f"ERROR: Failed to write output file: {type(e).__name__}: {str(e)}")
-        pass
+        print(f"ERROR: Failed to write output file {output_file}: {type(e).__name__}: {str(e)}", file=sys.stderr)
+        sys.exit(1)
     
     #print(f"\n===== EXTRACTION COMPLETE =====")
     #print(f"Function and class definitions have been saved to '{output_file}'")
+    
+    if watch:
+        watch_definitions(folder_path, ignore_folders, structure, output_file, interval)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Compact integer-indexed graph core used by dependency_graph.
+
+Node paths are interned to integer ids and edges are deduplicated per
+(source, target, type) with a multiplicity weight. Edges are stored sorted by
+source, so the forward CSR rows index straight into the edge arrays; a
+second CSR holds the reverse adjacency. All arrays are array('i') so they
+can be shared with NumPy (numpy.frombuffer) without copying. NumPy is only
+used to speed up construction when it is installed.
+"""
+import array
+import random
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Below this many raw edges the pure-Python construction is just as fast
+NUMPY_MIN_EDGES = 50000
+
+def _int_array(values=()):
+    return array.array('i', values)
+
+def _from_numpy(values):
+    result = _int_array()
+    result.frombytes(values.astype(np.int32).tobytes())
+    return result
+
+def build_graph(node_paths, edges, node_attributes=None):
+    """
+    Build a graph core.
+
+    node_paths: iterable of node paths (ids are assigned in this order)
+    edges: iterable of (source path, target path, edge type) tuples, optionally
+           with a fourth weight element; unknown paths are added as nodes,
+           repeated edges add up their weights
+    node_attributes: optional {path: {attribute: value}} exported with nodes
+    """
+    ids = {}
+    paths = []
+    for path in node_paths:
+        if path not in ids:
+            ids[path] = len(paths)
+            paths.append(path)
+
+    type_ids = {}
+    edge_types = []
+    raw_sources = _int_array()
+    raw_targets = _int_array()
+    raw_types = _int_array()
+    raw_weights = _int_array()
+    for edge in edges:
+        source, target, edge_type = edge[:3]
+        for path in (source, target):
+            if path not in ids:
+                ids[path] = len(paths)
+                paths.append(path)
+        if edge_type not in type_ids:
+            type_ids[edge_type] = len(edge_types)
+            edge_types.append(edge_type)
+        raw_sources.append(ids[source])
+        raw_targets.append(ids[target])
+        raw_types.append(type_ids[edge_type])
+        raw_weights.append(edge[3] if len(edge) > 3 else 1)
+
+    node_count = len(paths)
+    type_count = max(len(edge_types), 1)
+    if np is not None and len(raw_sources) >= NUMPY_MIN_EDGES:
+        # Encode (source, target, type) into one int64 so unique() sorts and counts in one go
+        keys = (np.frombuffer(raw_sources, dtype=np.int32).astype(np.int64) * node_count
+                + np.frombuffer(raw_targets, dtype=np.int32)) * type_count + np.frombuffer(raw_types, dtype=np.int32)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.frombuffer(raw_weights, dtype=np.int32))
+        edge_source = _from_numpy(unique_keys // (node_count * type_count))
+        edge_target = _from_numpy((unique_keys // type_count) % node_count)
+        edge_type = _from_numpy(unique_keys % type_count)
+        edge_weight = _from_numpy(counts)
+    else:
+        weights = {}
+        for source, target, edge_type, weight in zip(raw_sources, raw_targets, raw_types, raw_weights):
+            key = (source, target, edge_type)
+            weights[key] = weights.get(key, 0) + weight
+        edge_source = _int_array()
+        edge_target = _int_array()
+        edge_type = _int_array()
+        edge_weight = _int_array()
+        for key in sorted(weights):
+            edge_source.append(key[0])
+            edge_target.append(key[1])
+            edge_type.append(key[2])
+            edge_weight.append(weights[key])
+
+    # Forward CSR: edges are sorted by source, so offsets index the edge arrays directly
+    forward_offsets = _int_array([0]) * (node_count + 1)
+    for source in edge_source:
+        forward_offsets[source + 1] += 1
+    for node in range(node_count):
+        forward_offsets[node + 1] += forward_offsets[node]
+
+    # Reverse CSR by counting sort over targets; stores edge ids
+    reverse_offsets = _int_array([0]) * (node_count + 1)
+    for target in edge_target:
+        reverse_offsets[target + 1] += 1
+    for node in range(node_count):
+        reverse_offsets[node + 1] += reverse_offsets[node]
+    reverse_edges = _int_array([0]) * len(edge_target)
+    cursor = reverse_offsets[:-1]
+    for edge, target in enumerate(edge_target):
+        reverse_edges[cursor[target]] = edge
+        cursor[target] += 1
+
+    return {
+        "paths": paths,
+        "ids": ids,
+        "edge_types": edge_types,
+        "edge_source": edge_source,
+        "edge_target": edge_target,
+        "edge_type": edge_type,
+        "edge_weight": edge_weight,
+        "forward_offsets": forward_offsets,
+        "reverse_offsets": reverse_offsets,
+        "reverse_edges": reverse_edges,
+        "node_attributes": node_attributes or {}
+    }
+
+def node_count(core):
+    return len(core["paths"])
+
+def edge_count(core):
+    return len(core["edge_source"])
+
+def _type_filter(core, edge_types):
+    """Return the set of type ids to follow, or None for all types"""
+    if edge_types is None or 'all' in edge_types:
+        return None
+    return {type_id for type_id, name in enumerate(core["edge_types"]) if name in edge_types}
+
+def successors(core, node, reverse=False, edge_types=None):
+    """
+    Yield (neighbor, edge id) pairs of a node; reverse=True follows edges backwards
+    """
+    allowed = _type_filter(core, edge_types)
+    edge_type = core["edge_type"]
+    if reverse:
+        offsets, reverse_edges, ends = core["reverse_offsets"], core["reverse_edges"], core["edge_source"]
+        for index in range(offsets[node], offsets[node + 1]):
+            edge = reverse_edges[index]
+            if allowed is None or edge_type[edge] in allowed:
+                yield ends[edge], edge
+    else:
+        offsets, ends = core["forward_offsets"], core["edge_target"]
+        for edge in range(offsets[node], offsets[node + 1]):
+            if allowed is None or edge_type[edge] in allowed:
+                yield ends[edge], edge
+
+def bfs(core, roots, max_depth=None, reverse=False, edge_types=None):
+    """
+    Breadth-first search from root node ids.
+    Returns (depths, parents): dicts in visit order mapping node -> depth and
+    node -> predecessor on a shortest path (-1 for roots).
+    """
+    allowed = _type_filter(core, edge_types)
+    edge_type = core["edge_type"]
+    if reverse:
+        offsets, edge_index, ends = core["reverse_offsets"], core["reverse_edges"], core["edge_source"]
+    else:
+        offsets, edge_index, ends = core["forward_offsets"], None, core["edge_target"]
+
+    depths = {}
+    parents = {}
+    queue = deque()
+    for root in roots:
+        if root not in depths:
+            depths[root] = 0
+            parents[root] = -1
+            queue.append(root)
+    while queue:
+        node = queue.popleft()
+        depth = depths[node]
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for index in range(offsets[node], offsets[node + 1]):
+            edge = edge_index[index] if edge_index is not None else index
+            if allowed is not None and edge_type[edge] not in allowed:
+                continue
+            neighbor = ends[edge]
+            if neighbor not in depths:
+                depths[neighbor] = depth + 1
+                parents[neighbor] = node
+                queue.append(neighbor)
+    return depths, parents
+
+def dfs(core, roots, reverse=False, edge_types=None):
+    """
+    Iterative depth-first search; returns node ids in preorder
+    """
+    visited = set()
+    order = []
+    stack = list(reversed(list(roots)))
+    while stack:
+        node = stack.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        order.append(node)
+        neighbors = [neighbor for neighbor, _ in successors(core, node, reverse, edge_types)]
+        stack.extend(neighbor for neighbor in reversed(neighbors) if neighbor not in visited)
+    return order
+
+def strongly_connected_components(core, edge_types=None):
+    """
+    Iterative Tarjan SCC.
+    Returns (components, component_of): components are lists of node ids in
+    reverse topological order (dependencies before dependents) and
+    component_of maps every node id to its component index.
+    """
+    allowed = _type_filter(core, edge_types)
+    offsets, targets, edge_type = core["forward_offsets"], core["edge_target"], core["edge_type"]
+    count = node_count(core)
+    index_of = _int_array([-1]) * count
+    lowlink = _int_array([0]) * count
+    on_stack = bytearray(count)
+    component_of = _int_array([-1]) * count
+    components = []
+    stack = []
+    next_index = 0
+
+    for start in range(count):
+        if index_of[start] != -1:
+            continue
+        # Each frame is (node, next edge position)
+        work = [(start, offsets[start])]
+        index_of[start] = lowlink[start] = next_index
+        next_index += 1
+        stack.append(start)
+        on_stack[start] = 1
+        while work:
+            node, edge = work[-1]
+            end = offsets[node + 1]
+            while edge < end:
+                if allowed is not None and edge_type[edge] not in allowed:
+                    edge += 1
+                    continue
+                neighbor = targets[edge]
+                if index_of[neighbor] == -1:
+                    break
+                if on_stack[neighbor] and index_of[neighbor] < lowlink[node]:
+                    lowlink[node] = index_of[neighbor]
+                edge += 1
+            if edge < end:
+                # Descend into an unvisited neighbor
+                work[-1] = (node, edge + 1)
+                neighbor = targets[edge]
+                index_of[neighbor] = lowlink[neighbor] = next_index
+                next_index += 1
+                stack.append(neighbor)
+                on_stack[neighbor] = 1
+                work.append((neighbor, offsets[neighbor]))
+                continue
+            work.pop()
+            if work and lowlink[node] < lowlink[work[-1][0]]:
+                lowlink[work[-1][0]] = lowlink[node]
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component_of[member] = len(components)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components, component_of
+
+def _condensation(core, edge_types=None):
+    """
+    Return (components, component_of, component successor sets) of the SCC condensation
+    """
+    components, component_of = strongly_connected_components(core, edge_types)
+    allowed = _type_filter(core, edge_types)
+    component_successors = [set() for _ in components]
+    edge_type = core["edge_type"]
+    for edge, (source, target) in enumerate(zip(core["edge_source"], core["edge_target"])):
+        if allowed is not None and edge_type[edge] not in allowed:
+            continue
+        source_component, target_component = component_of[source], component_of[target]
+        if source_component != target_component:
+            component_successors[source_component].add(target_component)
+    return components, component_of, component_successors
+
+def topological_layers(core, edge_types=None):
+    """
+    Group nodes into layers: layer 0 has no dependencies, layer k depends only
+    on lower layers. Nodes in a cycle share a layer.
+    """
+    components, _, component_successors = _condensation(core, edge_types)
+    # Tarjan emits components with their dependencies first
+    levels = [0] * len(components)
+    for component in range(len(components)):
+        if component_successors[component]:
+            levels[component] = 1 + max(levels[successor] for successor in component_successors[component])
+    layers = [[] for _ in range(max(levels, default=-1) + 1)]
+    for component, members in enumerate(components):
+        layers[levels[component]].extend(members)
+    for layer in layers:
+        layer.sort()
+    return layers
+
+def transitive_reduction(core, edge_types=None):
+    """
+    Return the ids of edges that remain after transitive reduction of the
+    condensation: an edge between components is dropped when its target is
+    also reachable through another successor. Edges inside a cycle are kept.
+    Reachability sets are Python int bitsets over component indices.
+    """
+    components, component_of, component_successors = _condensation(core, edge_types)
+    reach = [0] * len(components)
+    redundant = [0] * len(components)
+    for component in range(len(components)):
+        reachable = 0
+        for successor in component_successors[component]:
+            reachable |= reach[successor]
+        # Successors reachable through another successor are redundant
+        redundant[component] = reachable
+        for successor in component_successors[component]:
+            reachable |= 1 << successor
+        reach[component] = reachable
+
+    allowed = _type_filter(core, edge_types)
+    edge_type = core["edge_type"]
+    kept = []
+    for edge, (source, target) in enumerate(zip(core["edge_source"], core["edge_target"])):
+        if allowed is not None and edge_type[edge] not in allowed:
+            continue
+        source_component, target_component = component_of[source], component_of[target]
+        if source_component == target_component or not (redundant[source_component] >> target_component) & 1:
+            kept.append(edge)
+    return kept
+
+def reachable_bitsets(core, edge_types=None):
+    """
+    Compute the transitive closure over the SCC condensation.
+    Returns (component_of, reach): reach[c] is a Python int bitset over node
+    ids of every node reachable from component c through at least one edge
+    (members of c itself only when c is a cycle).
+    """
+    components, component_of, component_successors = _condensation(core, edge_types)
+    member_bits = [0] * len(components)
+    for component, members in enumerate(components):
+        for member in members:
+            member_bits[component] |= 1 << member
+    reach = [0] * len(components)
+    # Tarjan emits components with their dependencies first
+    for component, members in enumerate(components):
+        reachable = member_bits[component] if len(members) > 1 else 0
+        for successor in component_successors[component]:
+            reachable |= reach[successor] | member_bits[successor]
+        reach[component] = reachable
+    return component_of, reach
+
+def reachable(core, roots, edge_types=None):
+    """
+    Mark every node reachable from the root node ids (roots included) by
+    level-synchronous frontier propagation. Returns a bytearray with 1 for
+    reached nodes. With NumPy each level expands the whole frontier at once
+    by gathering its CSR rows; otherwise the rows are walked as array slices.
+    """
+    count = node_count(core)
+    visited = bytearray(count)
+    frontier = sorted({root for root in roots if 0 <= root < count})
+    for root in frontier:
+        visited[root] = 1
+    allowed = _type_filter(core, edge_types)
+    offsets, targets = core["forward_offsets"], core["edge_target"]
+
+    if np is not None and frontier:
+        row_starts = np.frombuffer(offsets, dtype=np.int32).astype(np.int64)
+        target_array = np.frombuffer(targets, dtype=np.int32)
+        keep = None
+        if allowed is not None:
+            keep = np.isin(np.frombuffer(core["edge_type"], dtype=np.int32), sorted(allowed))
+        seen = np.zeros(count, dtype=bool)
+        nodes = np.array(frontier, dtype=np.int64)
+        seen[nodes] = True
+        while len(nodes):
+            starts = row_starts[nodes]
+            lengths = row_starts[nodes + 1] - starts
+            total = int(lengths.sum())
+            if total == 0:
+                break
+            # Edge ids of all frontier rows: each row's start plus 0..length-1
+            edges = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+            if keep is not None:
+                edges = edges[keep[edges]]
+            nodes = np.unique(target_array[edges])
+            nodes = nodes[~seen[nodes]]
+            seen[nodes] = True
+        return bytearray(seen.astype(np.uint8).tobytes())
+
+    edge_type = core["edge_type"]
+    while frontier:
+        next_frontier = []
+        for node in frontier:
+            start, end = offsets[node], offsets[node + 1]
+            if allowed is None:
+                for target in targets[start:end]:
+                    if not visited[target]:
+                        visited[target] = 1
+                        next_frontier.append(target)
+            else:
+                for edge in range(start, end):
+                    target = targets[edge]
+                    if edge_type[edge] in allowed and not visited[target]:
+                        visited[target] = 1
+                        next_frontier.append(target)
+        frontier = next_frontier
+    return visited
+
+def iter_bits(bitset):
+    """
+    Yield the indices of the set bits of a Python int, lowest first
+    """
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+def rollup(core, groups, edge_types=None):
+    """
+    Collapse nodes into groups in one pass over the edge arrays.
+    groups[node] is the group label of each node id. Edges between groups are
+    merged (type "rollup", weights summed); edges inside a group are counted
+    in the group's "internal_weight" attribute. Returns a new core whose
+    nodes are the group labels.
+    """
+    allowed = _type_filter(core, edge_types)
+    group_ids = {}
+    labels = []
+    group_of = _int_array()
+    for label in groups:
+        if label not in group_ids:
+            group_ids[label] = len(labels)
+            labels.append(label)
+        group_of.append(group_ids[label])
+
+    members = [0] * len(labels)
+    for group in group_of:
+        members[group] += 1
+    internal = [0] * len(labels)
+    weights = {}
+    edge_source, edge_target = core["edge_source"], core["edge_target"]
+    edge_type, edge_weight = core["edge_type"], core["edge_weight"]
+    for edge in range(len(edge_source)):
+        if allowed is not None and edge_type[edge] not in allowed:
+            continue
+        source, target = group_of[edge_source[edge]], group_of[edge_target[edge]]
+        if source == target:
+            internal[source] += edge_weight[edge]
+        else:
+            weights[(source, target)] = weights.get((source, target), 0) + edge_weight[edge]
+
+    node_attributes = {label: {"type": "group", "label": label, "members": members[group], "internal_weight": internal[group]}
+                       for group, label in enumerate(labels)}
+    edges = ((labels[source], labels[target], "rollup", weight) for (source, target), weight in weights.items())
+    return build_graph(labels, edges, node_attributes)
+
+def degrees(core):
+    """
+    Return (fan_in, fan_out) arrays: the number of distinct edges into and out of each node
+    """
+    forward, reverse = core["forward_offsets"], core["reverse_offsets"]
+    fan_out = _int_array(forward[node + 1] - forward[node] for node in range(node_count(core)))
+    fan_in = _int_array(reverse[node + 1] - reverse[node] for node in range(node_count(core)))
+    return fan_in, fan_out
+
+def component_sizes(core, edge_types=None):
+    """
+    Return the size of the strongly connected component of every node
+    """
+    components, component_of = strongly_connected_components(core, edge_types)
+    return _int_array(len(components[component]) for component in component_of)
+
+def pagerank(core, damping=0.85, tolerance=1e-6, max_iterations=100):
+    """
+    PageRank over distinct edges (rank flows from importer to imported) by
+    power iteration. Each step is one sparse matrix-vector product: a
+    bincount over the edge arrays with NumPy, or per-node sums over the
+    reverse CSR slices otherwise. Rank of nodes without out-edges is spread
+    uniformly. Returns a list of floats summing to 1.
+    """
+    count = node_count(core)
+    if count == 0:
+        return []
+    fan_in, fan_out = degrees(core)
+    dangling = [node for node in range(count) if fan_out[node] == 0]
+    teleport = (1.0 - damping) / count
+
+    if np is not None:
+        sources = np.frombuffer(core["edge_source"], dtype=np.int32)
+        targets = np.frombuffer(core["edge_target"], dtype=np.int32)
+        out_degree = np.frombuffer(fan_out, dtype=np.int32).astype(np.float64)
+        inverse_out = np.divide(1.0, out_degree, out=np.zeros(count), where=out_degree > 0)
+        dangling_nodes = np.array(dangling, dtype=np.int64)
+        rank = np.full(count, 1.0 / count)
+        for _ in range(max_iterations):
+            spread = damping * rank[dangling_nodes].sum() / count
+            new_rank = damping * np.bincount(targets, weights=(rank * inverse_out)[sources], minlength=count) + teleport + spread
+            delta = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if delta < tolerance:
+                break
+        return rank.tolist()
+
+    # Sources of the in-edges of every node, grouped by target (reverse CSR order)
+    edge_source = core["edge_source"]
+    in_sources = _int_array(edge_source[edge] for edge in core["reverse_edges"])
+    offsets = core["reverse_offsets"]
+    inverse_out = [1.0 / degree if degree else 0.0 for degree in fan_out]
+    rank = [1.0 / count] * count
+    for _ in range(max_iterations):
+        contribution = [value * inverse for value, inverse in zip(rank, inverse_out)]
+        base = teleport + damping * sum(rank[node] for node in dangling) / count
+        take = contribution.__getitem__
+        new_rank = [base + damping * sum(map(take, in_sources[offsets[node]:offsets[node + 1]]))
+                    for node in range(count)]
+        delta = sum(abs(new - old) for new, old in zip(new_rank, rank))
+        rank = new_rank
+        if delta < tolerance:
+            break
+    return rank
+
+def approximate_betweenness(core, samples=32, seed=0):
+    """
+    Estimate betweenness centrality with Brandes' algorithm run from a
+    random sample of source nodes (unweighted, directed), scaled up by
+    node count / samples. Deterministic for a given seed.
+    """
+    count = node_count(core)
+    betweenness = [0.0] * count
+    if count == 0:
+        return betweenness
+    sources = range(count) if samples >= count else random.Random(seed).sample(range(count), samples)
+    offsets, targets = core["forward_offsets"], core["edge_target"]
+    # Adjacency slices are taken once instead of per visit
+    adjacency = [targets[offsets[node]:offsets[node + 1]] for node in range(count)]
+    for source in sources:
+        distance = [-1] * count
+        paths = [0] * count
+        distance[source] = 0
+        paths[source] = 1
+        order = [source]
+        # BFS; order doubles as the queue
+        for node in order:
+            next_distance = distance[node] + 1
+            node_paths = paths[node]
+            for neighbor in adjacency[node]:
+                if distance[neighbor] < 0:
+                    distance[neighbor] = next_distance
+                    paths[neighbor] = node_paths
+                    order.append(neighbor)
+                elif distance[neighbor] == next_distance:
+                    paths[neighbor] += node_paths
+        # Accumulate dependencies in reverse BFS order
+        dependency = [0.0] * count
+        for node in reversed(order):
+            next_distance = distance[node] + 1
+            total = 0.0
+            for neighbor in adjacency[node]:
+                if distance[neighbor] == next_distance:
+                    total += (1.0 + dependency[neighbor]) / paths[neighbor]
+            dependency[node] = paths[node] * total
+            if node != source:
+                betweenness[node] += dependency[node]
+    scale = count / len(sources)
+    return [value * scale for value in betweenness]
+
+def iter_edges(core, edge_ids=None):
+    """
+    Yield (source path, target path, type, weight) for all edges or the given edge ids
+    """
+    paths = core["paths"]
+    edge_types = core["edge_types"]
+    edge_source, edge_target = core["edge_source"], core["edge_target"]
+    edge_type, edge_weight = core["edge_type"], core["edge_weight"]
+    for edge in (range(edge_count(core)) if edge_ids is None else edge_ids):
+        yield paths[edge_source[edge]], paths[edge_target[edge]], edge_types[edge_type[edge]], edge_weight[edge]
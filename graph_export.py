@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Streaming exporters for graph cores (see graph_core): DOT, GraphML and a
+compact tab-separated edge list.
+
+Nodes are written under their interned integer id (quoted in DOT), with the
+path kept as a label/attribute, so distinct paths can never collide. Edges
+are streamed straight from the core's arrays; with collapse=True the
+parallel edges of different types between the same two nodes are merged
+into one, which works without buffering because edges are sorted by
+(source, target, type). Memory stays proportional to the node count.
+"""
+import os
+from xml.sax.saxutils import escape
+
+# Write in large blocks; the exporters produce many small lines
+BUFFER_SIZE = 1 << 20
+
+def _dot_string(text):
+    return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+def _node_label(core, path):
+    return core["node_attributes"].get(path, {}).get("label") or os.path.basename(path)
+
+def _node_directory(core, path):
+    attributes = core["node_attributes"].get(path, {})
+    return os.path.dirname(attributes.get("file") or path)
+
+def iter_edge_rows(core, collapse=False):
+    """
+    Yield (source id, target id, type, weight); with collapse=True, edges
+    between the same nodes are merged, joining their types and summing weights
+    """
+    edge_types = core["edge_types"]
+    edge_source, edge_target = core["edge_source"], core["edge_target"]
+    edge_type, edge_weight = core["edge_type"], core["edge_weight"]
+    if not collapse:
+        for edge in range(len(edge_source)):
+            yield edge_source[edge], edge_target[edge], edge_types[edge_type[edge]], edge_weight[edge]
+        return
+    current = None
+    for edge in range(len(edge_source)):
+        key = (edge_source[edge], edge_target[edge])
+        if current is not None and current[0] == key:
+            current[1].append(edge_types[edge_type[edge]])
+            current[2] += edge_weight[edge]
+            continue
+        if current is not None:
+            yield current[0][0], current[0][1], ','.join(current[1]), current[2]
+        current = [key, [edge_types[edge_type[edge]]], edge_weight[edge]]
+    if current is not None:
+        yield current[0][0], current[0][1], ','.join(current[1]), current[2]
+
+def export_dot(core, output_file, cluster=False, collapse=False, graph_name='DependencyGraph'):
+    """
+    Stream the graph in DOT format. cluster=True groups nodes into one
+    subgraph cluster per directory.
+    """
+    paths = core["paths"]
+    with open(output_file, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        f.write(f'digraph {_dot_string(graph_name)} {{\n')
+        f.write('  node [shape=box];\n')
+
+        if cluster:
+            directories = {}
+            for node, path in enumerate(paths):
+                directories.setdefault(_node_directory(core, path), []).append(node)
+            for index, directory in enumerate(sorted(directories)):
+                f.write(f'  subgraph "cluster_{index}" {{\n')
+                f.write(f'    label={_dot_string(directory or ".")};\n')
+                for node in directories[directory]:
+                    f.write(f'    "{node}" [label={_dot_string(_node_label(core, paths[node]))}, tooltip={_dot_string(paths[node])}];\n')
+                f.write('  }\n')
+        else:
+            for node, path in enumerate(paths):
+                f.write(f'  "{node}" [label={_dot_string(_node_label(core, path))}, tooltip={_dot_string(path)}];\n')
+
+        for source, target, edge_type, weight in iter_edge_rows(core, collapse):
+            f.write(f'  "{source}" -> "{target}" [label={_dot_string(edge_type)}, weight={weight}];\n')
+
+        f.write('}\n')
+
+def export_graphml(core, output_file, collapse=False):
+    """
+    Stream the graph as GraphML with path, label and language node data and type/weight edge data
+    """
+    paths = core["paths"]
+    with open(output_file, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        f.write('  <key id="path" for="node" attr.name="path" attr.type="string"/>\n')
+        f.write('  <key id="label" for="node" attr.name="label" attr.type="string"/>\n')
+        f.write('  <key id="language" for="node" attr.name="language" attr.type="string"/>\n')
+        f.write('  <key id="type" for="edge" attr.name="type" attr.type="string"/>\n')
+        f.write('  <key id="weight" for="edge" attr.name="weight" attr.type="int"/>\n')
+        f.write('  <graph id="G" edgedefault="directed">\n')
+        for node, path in enumerate(paths):
+            attributes = core["node_attributes"].get(path, {})
+            f.write(f'    <node id="n{node}"><data key="path">{escape(path)}</data>'
+                    f'<data key="label">{escape(_node_label(core, path))}</data>')
+            if attributes.get("language"):
+                f.write(f'<data key="language">{escape(attributes["language"])}</data>')
+            f.write('</node>\n')
+        for edge, (source, target, edge_type, weight) in enumerate(iter_edge_rows(core, collapse)):
+            f.write(f'    <edge id="e{edge}" source="n{source}" target="n{target}">'
+                    f'<data key="type">{escape(edge_type)}</data><data key="weight">{weight}</data></edge>\n')
+        f.write('  </graph>\n')
+        f.write('</graphml>\n')
+
+def export_edge_list(core, output_file, collapse=False):
+    """
+    Stream a compact tab-separated edge list: a "# nodes" section of
+    id/path lines followed by an "# edges" section of source/target/type/weight lines
+    """
+    with open(output_file, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        f.write('# nodes\n')
+        for node, path in enumerate(core["paths"]):
+            f.write(f'{node}\t{path}\n')
+        f.write('# edges\n')
+        for source, target, edge_type, weight in iter_edge_rows(core, collapse):
+            f.write(f'{source}\t{target}\t{edge_type}\t{weight}\n')
+
+# Output format -> (file suffix, exporter)
+EXPORTERS = {
+    'dot': ('.dot', export_dot),
+    'graphml': ('.graphml', export_graphml),
+    'edgelist': ('.tsv', export_edge_list)
+}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+On-disk store of per-file analyses and resolved edges for dependency_graph.
+
+A single SQLite file holds, for every analyzed file, its size, mtime,
+content hash and analysis (imports, calls, definitions as JSON), the
+resolved outgoing edges, and the short names its imports refer to. The
+reference names let dependency_graph find which files may start or stop
+resolving to a module when that module is added or removed, without
+re-reading any other analysis.
+"""
+import json
+import sqlite3
+
+SCHEMA_VERSION = '1'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    language TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    content_hash TEXT,
+    analysis TEXT
+);
+CREATE TABLE IF NOT EXISTS edges (source TEXT, target TEXT, type TEXT, weight INTEGER);
+CREATE INDEX IF NOT EXISTS edges_source ON edges (source);
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target);
+CREATE TABLE IF NOT EXISTS refs (name TEXT, path TEXT);
+CREATE INDEX IF NOT EXISTS refs_name ON refs (name);
+CREATE INDEX IF NOT EXISTS refs_path ON refs (path);
+"""
+
+def open_store(store_file):
+    """
+    Open (creating if needed) a store. A store written by an incompatible
+    version is emptied so that everything is rebuilt.
+    """
+    connection = sqlite3.connect(store_file)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(_SCHEMA)
+    if get_meta(connection, 'version') != SCHEMA_VERSION:
+        clear_store(connection)
+        set_meta(connection, 'version', SCHEMA_VERSION)
+        connection.commit()
+    return connection
+
+def clear_store(connection):
+    for table in ('files', 'edges', 'refs', 'meta'):
+        connection.execute(f'DELETE FROM {table}')
+
+def get_meta(connection, key, default=None):
+    row = connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+def set_meta(connection, key, value):
+    connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+def load_signatures(connection):
+    """
+    Return {path: (size, mtime_ns, content_hash)} for every stored file
+    """
+    return {path: (size, mtime_ns, content_hash)
+            for path, size, mtime_ns, content_hash in connection.execute('SELECT path, size, mtime_ns, content_hash FROM files')}
+
+def load_languages(connection):
+    return dict(connection.execute('SELECT path, language FROM files'))
+
+def load_analyses(connection, paths=None):
+    """
+    Yield stored file analyses, for all files or only the given paths
+    """
+    if paths is None:
+        for (analysis,) in connection.execute('SELECT analysis FROM files ORDER BY path'):
+            yield json.loads(analysis)
+        return
+    for path in paths:
+        row = connection.execute('SELECT analysis FROM files WHERE path = ?', (path,)).fetchone()
+        if row:
+            yield json.loads(row[0])
+
+def save_file(connection, file_info, size, mtime_ns, content_hash, reference_names):
+    """
+    Store (or replace) the analysis of one file and the names its imports refer to
+    """
+    path = file_info["path"]
+    connection.execute('INSERT OR REPLACE INTO files (path, language, size, mtime_ns, content_hash, analysis) '
+                       'VALUES (?, ?, ?, ?, ?, ?)',
+                       (path, file_info.get("language"), size, mtime_ns, content_hash,
+                        json.dumps(file_info, separators=(',', ':'))))
+    connection.execute('DELETE FROM refs WHERE path = ?', (path,))
+    connection.executemany('INSERT INTO refs (name, path) VALUES (?, ?)', ((name, path) for name in reference_names))
+
+def touch_file(connection, path, size, mtime_ns):
+    """
+    Record a new mtime for a file whose content did not change
+    """
+    connection.execute('UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?', (size, mtime_ns, path))
+
+def delete_file(connection, path):
+    """
+    Forget a file, its outgoing edges and the edges pointing at it
+    """
+    connection.execute('DELETE FROM files WHERE path = ?', (path,))
+    connection.execute('DELETE FROM refs WHERE path = ?', (path,))
+    connection.execute('DELETE FROM edges WHERE source = ? OR target = ?', (path, path))
+
+def referencing_files(connection, names):
+    """
+    Return the set of files whose imports mention any of the given names
+    """
+    paths = set()
+    names = list(names)
+    # Stay below SQLite's bound parameter limit
+    for start in range(0, len(names), 500):
+        batch = names[start:start + 500]
+        placeholders = ','.join('?' * len(batch))
+        paths.update(path for (path,) in connection.execute(
+            f'SELECT DISTINCT path FROM refs WHERE name IN ({placeholders})', batch))
+    return paths
+
+def replace_edges(connection, source, edges):
+    """
+    Replace the outgoing edges of source with (target, type) pairs; repeats add up to the weight
+    """
+    weights = {}
+    for target, edge_type in edges:
+        weights[(target, edge_type)] = weights.get((target, edge_type), 0) + 1
+    connection.execute('DELETE FROM edges WHERE source = ?', (source,))
+    connection.executemany('INSERT INTO edges (source, target, type, weight) VALUES (?, ?, ?, ?)',
+                           ((source, target, edge_type, weight) for (target, edge_type), weight in weights.items()))
+
+def iter_edges(connection):
+    """
+    Yield (source, target, type, weight) for all stored edges
+    """
+    yield from connection.execute('SELECT source, target, type, weight FROM edges ORDER BY source, target, type')
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Shared language registry for the extraction tools.
+
+Maps file extensions, exact filenames, filename patterns and shebang
+interpreters to a canonical language name, and stores per-language handlers
+(definition extractors, dependency parsers, ...) keyed by a handler kind.
+
+Handlers may be registered either as callables or as "module:attribute"
+strings; string handlers are imported on first use so that heavy parsers
+only cost something when a file of that language is actually seen.
+"""
+import os
+import re
+import fnmatch
+import importlib
+
+# Extension (lowercase, with leading dot) -> language
+_EXTENSIONS = {}
+
+# Exact basename -> language (e.g. "SConstruct")
+_FILENAMES = {}
+
+# Compiled filename patterns -> language, checked only when nothing else matched
+_FILENAME_PATTERNS = []
+
+# Interpreter name from a shebang line -> language (e.g. "python3")
+_SHEBANGS = {}
+
+# (language, kind) -> callable or "module:attribute" string
+_HANDLERS = {}
+
+def register_language(language, extensions=(), filenames=(), patterns=(), shebangs=()):
+    """
+    Register a language and the file names that identify it.
+    Later registrations override earlier ones for the same key.
+    """
+    for ext in extensions:
+        ext = ext.lower()
+        if not ext.startswith('.'):
+            ext = '.' + ext
+        _EXTENSIONS[ext] = language
+    for filename in filenames:
+        _FILENAMES[filename] = language
+    for pattern in patterns:
+        _FILENAME_PATTERNS.append((re.compile(fnmatch.translate(pattern)), language))
+    for interpreter in shebangs:
+        _SHEBANGS[interpreter] = language
+
+def register_handler(language, kind, handler):
+    """
+    Register a handler of the given kind for a language.
+
+    `handler` is either a callable or a "module:attribute" string that is
+    imported lazily the first time the handler is requested. Handlers of a
+    module that may run as a script (the built-in ones) are registered as
+    callables, since a string would import a second copy of it.
+    """
+    _HANDLERS[(language, kind)] = handler
+
+def get_handler(language, kind):
+    """
+    Return the handler of the given kind for a language, or None
+    """
+    handler = _HANDLERS.get((language, kind))
+    if isinstance(handler, str):
+        module_name, _, attribute = handler.partition(':')
+        handler = getattr(importlib.import_module(module_name), attribute)
+        _HANDLERS[(language, kind)] = handler
+    return handler
+
+def languages_with_handler(kind):
+    """
+    Return the set of languages that have a handler of the given kind
+    """
+    return {language for language, handler_kind in _HANDLERS if handler_kind == kind}
+
+def _read_shebang_interpreter(file_path):
+    """
+    Return the interpreter named on the first line of a script, or None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            first_line = f.readline(256)
+    except OSError:
+        return None
+    if not first_line.startswith(b'#!'):
+        return None
+    parts = first_line[2:].decode('utf-8', errors='replace').split()
+    if not parts:
+        return None
+    interpreter = os.path.basename(parts[0])
+    if interpreter == 'env' and len(parts) > 1:
+        interpreter = parts[1]
+    return interpreter
+
+def detect_language(file_path, check_shebang=True):
+    """
+    Determine the language of a file.
+
+    The extension is resolved with a single dict lookup; exact filenames,
+    filename patterns and (for extensionless files) shebang lines are only
+    consulted when the extension is unknown.
+    """
+    name = os.path.basename(file_path)
+    ext = os.path.splitext(name)[1].lower()
+    language = _EXTENSIONS.get(ext)
+    if language is not None:
+        return language
+
+    language = _FILENAMES.get(name)
+    if language is not None:
+        return language
+
+    for pattern, pattern_language in _FILENAME_PATTERNS:
+        if pattern.match(name):
+            return pattern_language
+
+    if check_shebang and not ext:
+        interpreter = _read_shebang_interpreter(file_path)
+        if interpreter:
+            language = _SHEBANGS.get(interpreter)
+            if language is None:
+                # Versioned interpreters such as python3.11 or node18
+                language = _SHEBANGS.get(interpreter.rstrip('0123456789.'))
+            if language is not None:
+                return language
+
+    return 'unknown'
+
+# Built-in languages
+register_language('python', extensions=['.py', '.pyw', '.pyi'], filenames=['SConstruct', 'SConscript'],
+                  shebangs=['python', 'python2', 'python3', 'pypy', 'pypy3'])
+register_language('javascript', extensions=['.js', '.jsx', '.mjs', '.cjs'], shebangs=['node', 'nodejs'])
+register_language('typescript', extensions=['.ts', '.tsx', '.mts', '.cts'], shebangs=['ts-node', 'deno'])
+register_language('java', extensions=['.java'])
+register_language('csharp', extensions=['.cs'])
+register_language('c', extensions=['.c', '.h'])
+register_language('cpp', extensions=['.cpp', '.cc', '.cxx', '.hpp', '.hh', '.hxx', '.ipp'])
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Node.js / TypeScript module resolution for dependency_graph.
+
+Implements the parts of Node's algorithm that matter for a static graph:
+relative and absolute specifiers with extension and index.* probing,
+node_modules lookup with package.json "exports" and "main", and tsconfig /
+jsconfig "baseUrl" and "paths" mappings (following "extends").
+
+All filesystem access goes through a per-resolver cache: every directory is
+listed at most once and every package.json / tsconfig.json is parsed at most
+once, so resolving many specifiers costs dict lookups after the first few.
+"""
+import os
+import re
+import json
+
+# Extensions tried, in order, for specifiers without one; declaration files
+# only after every runtime extension, so './foo' prefers foo.js to foo.d.ts
+RESOLVE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.mts', '.cts', '.d.ts', '.json')
+
+# package.json "exports" conditions we accept, by preference: runtime files
+# first, so an import resolves to code rather than to its .d.ts declarations
+EXPORT_CONDITIONS = ('import', 'module', 'require', 'node', 'default', 'types')
+
+# package.json fields naming a package's main file, by the same preference
+MAIN_FIELDS = ('main', 'module', 'types')
+
+# Node built-in modules never resolve to project files
+BUILTIN_MODULES = {
+    'assert', 'buffer', 'child_process', 'cluster', 'crypto', 'dgram', 'dns', 'events', 'fs', 'http', 'http2',
+    'https', 'module', 'net', 'os', 'path', 'perf_hooks', 'process', 'querystring', 'readline', 'stream',
+    'string_decoder', 'timers', 'tls', 'tty', 'url', 'util', 'v8', 'vm', 'worker_threads', 'zlib'
+}
+
+CONFIG_FILES = ('tsconfig.json', 'jsconfig.json')
+
+_JSONC_PATTERN = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/|,(\s*[}\]])', re.DOTALL)
+
+def create_resolver():
+    """
+    Return a resolver state: filesystem caches plus memoized results
+    """
+    return {
+        "listings": {},   # directory -> {name: is_dir} (None if unreadable)
+        "json": {},       # path -> parsed JSON (None if missing or invalid)
+        "configs": {},    # directory -> nearest tsconfig/jsconfig options (None if none)
+        "results": {}     # (directory, specifier) -> resolved path or None
+    }
+
+def _listing(state, directory):
+    listings = state["listings"]
+    if directory not in listings:
+        try:
+            with os.scandir(directory) as entries:
+                listings[directory] = {entry.name: entry.is_dir() for entry in entries}
+        except OSError:
+            listings[directory] = None
+    return listings[directory]
+
+def _is_file(state, path):
+    listing = _listing(state, os.path.dirname(path))
+    return listing is not None and listing.get(os.path.basename(path)) is False
+
+def _is_dir(state, path):
+    listing = _listing(state, os.path.dirname(path))
+    return listing is not None and listing.get(os.path.basename(path)) is True
+
+def _load_json(state, path, comments=False):
+    cache = state["json"]
+    if path not in cache:
+        cache[path] = None
+        if _is_file(state, path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                if comments:
+                    # tsconfig allows comments and trailing commas
+                    text = _JSONC_PATTERN.sub(lambda m: m.group(1) or m.group(2) or '', text)
+                cache[path] = json.loads(text)
+            except (OSError, ValueError):
+                pass
+    return cache[path]
+
+def _load_config(state, config_file, seen=()):
+    """
+    Return {"baseUrl", "paths", "paths_base"} of a tsconfig, merged with what it extends
+    """
+    config = _load_json(state, config_file, comments=True)
+    if not isinstance(config, dict):
+        return None
+    directory = os.path.dirname(config_file)
+    options = {"baseUrl": None, "paths": None, "paths_base": directory}
+    extends = config.get("extends")
+    if isinstance(extends, str) and extends.startswith('.') and config_file not in seen:
+        parent_file = os.path.normpath(os.path.join(directory, extends))
+        if not parent_file.endswith('.json'):
+            parent_file += '.json'
+        parent = _load_config(state, parent_file, seen + (config_file,))
+        if parent:
+            options.update(parent)
+    compiler_options = config.get("compilerOptions") or {}
+    if isinstance(compiler_options.get("baseUrl"), str):
+        options["baseUrl"] = os.path.normpath(os.path.join(directory, compiler_options["baseUrl"]))
+    if isinstance(compiler_options.get("paths"), dict):
+        options["paths"] = compiler_options["paths"]
+        options["paths_base"] = options["baseUrl"] or directory
+    return options
+
+def _nearest_config(state, directory):
+    """
+    Return the options of the closest tsconfig.json / jsconfig.json at or above directory
+    """
+    configs = state["configs"]
+    visited = []
+    options = None
+    while directory not in configs:
+        visited.append(directory)
+        listing = _listing(state, directory) or {}
+        config_name = next((name for name in CONFIG_FILES if listing.get(name) is False), None)
+        if config_name is not None:
+            options = _load_config(state, os.path.join(directory, config_name))
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    else:
+        options = configs[directory]
+    for path in visited:
+        configs[path] = options
+    return options
+
+def _load_as_file(state, path):
+    if _is_file(state, path):
+        return path
+    for ext in RESOLVE_EXTENSIONS:
+        if _is_file(state, path + ext):
+            return path + ext
+    # TypeScript sources import their compiled names: './util.js' -> util.ts
+    stem, ext = os.path.splitext(path)
+    if ext in ('.js', '.jsx', '.mjs', '.cjs'):
+        for ts_ext in ('.ts', '.tsx', '.mts', '.cts'):
+            if _is_file(state, stem + ts_ext):
+                return stem + ts_ext
+    return None
+
+def _load_index(state, directory):
+    for ext in RESOLVE_EXTENSIONS:
+        path = os.path.join(directory, 'index' + ext)
+        if _is_file(state, path):
+            return path
+    return None
+
+def _load_as_directory(state, directory):
+    if not _is_dir(state, directory):
+        return None
+    package = _load_json(state, os.path.join(directory, 'package.json'))
+    if isinstance(package, dict):
+        for field in MAIN_FIELDS:
+            main = package.get(field)
+            if isinstance(main, str) and main:
+                target = os.path.normpath(os.path.join(directory, main))
+                resolved = _load_as_file(state, target) or _load_index(state, target)
+                if resolved:
+                    return resolved
+    return _load_index(state, directory)
+
+def _load_path(state, path):
+    return _load_as_file(state, path) or _load_as_directory(state, path)
+
+def _pick_condition(target):
+    """
+    Reduce an "exports" target (string, condition object or fallback list) to a string
+    """
+    if isinstance(target, str):
+        return target
+    if isinstance(target, list):
+        for item in target:
+            picked = _pick_condition(item)
+            if picked:
+                return picked
+    if isinstance(target, dict):
+        for condition in EXPORT_CONDITIONS:
+            if condition in target:
+                picked = _pick_condition(target[condition])
+                if picked:
+                    return picked
+    return None
+
+def _resolve_exports(exports, subpath):
+    """
+    Map a package subpath ("." or "./feature") through package.json "exports"
+    """
+    if not isinstance(exports, dict) or not any(key.startswith('.') for key in exports):
+        return _pick_condition(exports) if subpath == '.' else None
+    if subpath in exports:
+        return _pick_condition(exports[subpath])
+    # Longest matching "./prefix*suffix" pattern wins
+    best = None
+    for key in exports:
+        prefix, star, suffix = key.partition('*')
+        if star and subpath.startswith(prefix) and subpath.endswith(suffix) and len(subpath) >= len(prefix) + len(suffix):
+            if best is None or len(prefix) > len(best[0]):
+                best = (prefix, key, subpath[len(prefix):len(subpath) - len(suffix)])
+    if best is None:
+        return None
+    target = _pick_condition(exports[best[1]])
+    return target.replace('*', best[2]) if target else None
+
+def _load_node_modules(state, specifier, directory):
+    parts = specifier.split('/')
+    name_length = 2 if specifier.startswith('@') else 1
+    package_name = '/'.join(parts[:name_length])
+    subpath = '/'.join(parts[name_length:])
+    while True:
+        if os.path.basename(directory) != 'node_modules':
+            package_dir = os.path.join(directory, 'node_modules', package_name)
+            if _is_dir(state, package_dir) or (name_length == 2 and _is_dir(state, os.path.dirname(package_dir))):
+                package = _load_json(state, os.path.join(package_dir, 'package.json'))
+                if isinstance(package, dict) and 'exports' in package:
+                    target = _resolve_exports(package['exports'], './' + subpath if subpath else '.')
+                    if target:
+                        return _load_as_file(state, os.path.normpath(os.path.join(package_dir, target)))
+                resolved = _load_path(state, os.path.join(package_dir, subpath) if subpath else package_dir)
+                if resolved:
+                    return resolved
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+def _load_config_paths(state, specifier, options):
+    paths = options.get("paths")
+    if paths:
+        best = None
+        for pattern in paths:
+            prefix, star, suffix = pattern.partition('*')
+            if not star:
+                if pattern == specifier:
+                    best = (len(pattern) + 1, pattern, '')
+                    break
+            elif specifier.startswith(prefix) and specifier.endswith(suffix) and len(specifier) >= len(prefix) + len(suffix):
+                if best is None or len(prefix) > best[0]:
+                    best = (len(prefix), pattern, specifier[len(prefix):len(specifier) - len(suffix)])
+        if best is not None:
+            for substitution in paths[best[1]] or ():
+                if isinstance(substitution, str):
+                    target = os.path.normpath(os.path.join(options["paths_base"], substitution.replace('*', best[2])))
+                    resolved = _load_path(state, target)
+                    if resolved:
+                        return resolved
+    if options.get("baseUrl"):
+        return _load_path(state, os.path.join(options["baseUrl"], specifier))
+    return None
+
+def _resolve_uncached(state, specifier, directory):
+    if specifier.startswith(('./', '../', '/')) or specifier in ('.', '..'):
+        return _load_path(state, os.path.normpath(os.path.join(directory, specifier)))
+    if specifier.startswith('node:') or specifier.split('/')[0] in BUILTIN_MODULES:
+        return None
+    options = _nearest_config(state, directory)
+    if options:
+        resolved = _load_config_paths(state, specifier, options)
+        if resolved:
+            return resolved
+    resolved = _load_node_modules(state, specifier, directory)
+    if resolved and os.sep + 'node_modules' + os.sep in resolved:
+        # Workspace packages are symlinked into node_modules
+        resolved = os.path.realpath(resolved)
+    return resolved
+
+def resolve(state, specifier, source_file):
+    """
+    Resolve an import specifier written in source_file to an absolute file path, or None
+    """
+    specifier = specifier.split('?')[0]
+    if not specifier:
+        return None
+    directory = os.path.dirname(os.path.abspath(source_file))
+    key = (directory, specifier)
+    results = state["results"]
+    if key not in results:
+        results[key] = _resolve_uncached(state, specifier, directory)
+    return results[key]
+
+def _export_targets(exports):
+    """Yield every target string of a package.json "exports" value, under any condition"""
+    if isinstance(exports, str):
+        yield exports
+    elif isinstance(exports, list):
+        for item in exports:
+            yield from _export_targets(item)
+    elif isinstance(exports, dict):
+        for value in exports.values():
+            yield from _export_targets(value)
+
+def package_entry_points(state, package_dir):
+    """
+    Return the files a package exposes to its users: package.json "main",
+    "module", "types", "bin" and every "exports" target (patterns excluded),
+    falling back to index.* when none are declared
+    """
+    package = _load_json(state, os.path.join(package_dir, 'package.json'))
+    if not isinstance(package, dict):
+        return []
+    targets = [package.get(field) for field in MAIN_FIELDS]
+    bin_targets = package.get('bin')
+    targets.extend(bin_targets.values() if isinstance(bin_targets, dict) else [bin_targets])
+    targets.extend(_export_targets(package.get('exports')))
+    entry_points = []
+    for target in targets:
+        if isinstance(target, str) and target and '*' not in target:
+            resolved = _load_path(state, os.path.normpath(os.path.join(package_dir, target)))
+            if resolved and resolved not in entry_points:
+                entry_points.append(resolved)
+    if not entry_points:
+        index = _load_index(state, package_dir)
+        if index:
+            entry_points.append(index)
+    return entry_points
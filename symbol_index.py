@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Symbol index over function_extractor results.
+
+The index is a single binary image made of little-endian uint32 arrays and a
+UTF-8 string blob:
+
+  - symbol names sorted case-insensitively (binary search for prefix queries)
+  - postings per name: (file id, line, kind)
+  - a byte-trigram table mapping each trigram of the lowercased name to the
+    sorted ids of the names containing it (substring and fuzzy queries)
+
+Saved indexes are memory-mapped on load, so opening one costs a header read
+regardless of its size and queries touch only the pages they need.
+"""
+import os
+import re
+import sys
+import json
+import mmap
+import array
+import struct
+import fnmatch
+
+MAGIC = b'SYMIDX01'
+
+# magic, then counts: names, postings, files, trigrams, string blob size
+_HEADER = struct.Struct('<8s5I')
+
+KINDS = ["function", "class", "method"]
+
+def collect_symbols(structure, path=None):
+    """
+    Yield (name, kind, file_path, line) for every definition in a
+    function_extractor folder structure. Paths are relative to the root folder.
+    """
+    if structure is None:
+        return
+    if structure.get("type") == "directory":
+        for child in structure.get("children", []):
+            child_path = child["name"] if path is None else f"{path}/{child['name']}"
+            yield from collect_symbols(child, child_path)
+        return
+    definitions = structure.get("definitions") or {}
+    file_path = path if path is not None else structure.get("name", "")
+    for kind, key in (("function", "functions"), ("class", "classes"), ("method", "methods")):
+        for definition in definitions.get(key, []):
+            yield definition["name"], kind, file_path, definition.get("start_line", 0)
+
+def collect_symbols_ndjson(lines):
+    """
+    Yield (name, kind, file_path, line) from function_extractor --format=ndjson records
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        definitions = record.get("definitions") or {}
+        for kind, key in (("function", "functions"), ("class", "classes"), ("method", "methods")):
+            for definition in definitions.get(key, []):
+                yield definition["name"], kind, record["path"], definition.get("start_line", 0)
+
+def _trigrams(data):
+    """
+    Return the set of byte trigrams of data packed into integers
+    """
+    return {(data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)}
+
+def _uint32_array(values):
+    """
+    Return a uint32 array in little-endian byte order
+    """
+    result = array.array('I', values)
+    if sys.byteorder != 'little':
+        result.byteswap()
+    return result
+
+def build_symbol_index(symbols):
+    """
+    Build the binary image of a symbol index from (name, kind, file_path, line) tuples
+    """
+    files = {}
+    by_name = {}
+    for name, kind, file_path, line in symbols:
+        file_id = files.setdefault(file_path, len(files))
+        by_name.setdefault(name, []).append((file_id, line or 0, KINDS.index(kind)))
+
+    names = sorted(by_name, key=lambda name: (name.lower(), name))
+    blob = bytearray()
+    name_offsets = []
+    posting_starts = [0]
+    postings = []
+    trigram_postings = {}
+    for name_id, name in enumerate(names):
+        encoded = name.encode('utf-8')
+        name_offsets.append(len(blob))
+        blob += encoded
+        for posting in sorted(by_name[name]):
+            postings.extend(posting)
+        posting_starts.append(len(postings) // 3)
+        for trigram in _trigrams(name.lower().encode('utf-8')):
+            trigram_postings.setdefault(trigram, []).append(name_id)
+    name_offsets.append(len(blob))
+
+    file_offsets = []
+    for file_path in files:
+        file_offsets.append(len(blob))
+        blob += file_path.encode('utf-8')
+    file_offsets.append(len(blob))
+
+    trigram_keys = sorted(trigram_postings)
+    trigram_starts = [0]
+    trigram_ids = []
+    for trigram in trigram_keys:
+        trigram_ids.extend(trigram_postings[trigram])
+        trigram_starts.append(len(trigram_ids))
+
+    image = bytearray(_HEADER.pack(MAGIC, len(names), len(postings) // 3, len(files), len(trigram_keys), len(blob)))
+    for section in (name_offsets, posting_starts, postings, file_offsets, trigram_keys, trigram_starts, trigram_ids):
+        image += _uint32_array(section).tobytes()
+    image += blob
+    return bytes(image)
+
+def open_symbol_index(buffer):
+    """
+    Wrap a symbol index image (bytes, mmap, ...) for querying without copying it
+    """
+    magic, name_count, posting_count, file_count, trigram_count, blob_size = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a symbol index file")
+
+    view = memoryview(buffer)
+    offset = _HEADER.size
+    sections = []
+    for length in (name_count + 1, name_count + 1, posting_count * 3, file_count + 1,
+                   trigram_count, trigram_count + 1, None):
+        if length is None:
+            # Trigram postings fill the gap up to the string blob
+            length = (len(view) - blob_size - offset) // 4
+        raw = view[offset:offset + length * 4]
+        if sys.byteorder == 'little':
+            sections.append(raw.cast('I'))
+        else:
+            swapped = array.array('I', raw.tobytes())
+            swapped.byteswap()
+            sections.append(swapped)
+        offset += length * 4
+
+    return {
+        "name_count": name_count,
+        "file_count": file_count,
+        "name_offsets": sections[0],
+        "posting_starts": sections[1],
+        "postings": sections[2],
+        "file_offsets": sections[3],
+        "trigram_keys": sections[4],
+        "trigram_starts": sections[5],
+        "trigram_ids": sections[6],
+        "blob": view[offset:offset + blob_size],
+        "buffer": buffer
+    }
+
+def save_symbol_index(image, output_file):
+    """
+    Atomically write a symbol index image to disk
+    """
+    temp_file = output_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(image)
+    os.replace(temp_file, output_file)
+
+def load_symbol_index(index_file):
+    """
+    Memory-map a saved symbol index
+    """
+    with open(index_file, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return open_symbol_index(mapped)
+
+def _name(index, name_id):
+    offsets = index["name_offsets"]
+    return bytes(index["blob"][offsets[name_id]:offsets[name_id + 1]]).decode('utf-8')
+
+def _file(index, file_id):
+    offsets = index["file_offsets"]
+    return bytes(index["blob"][offsets[file_id]:offsets[file_id + 1]]).decode('utf-8')
+
+def _entries(index, name_id):
+    """
+    Return the definitions recorded under one name
+    """
+    name = _name(index, name_id)
+    postings = index["postings"]
+    entries = []
+    for posting in range(index["posting_starts"][name_id], index["posting_starts"][name_id + 1]):
+        entries.append({
+            "name": name,
+            "kind": KINDS[postings[posting * 3 + 2]],
+            "file": _file(index, postings[posting * 3]),
+            "line": postings[posting * 3 + 1]
+        })
+    return entries
+
+def _lower_bound(index, key):
+    """
+    Return the first name id whose lowercased name is >= key
+    """
+    low, high = 0, index["name_count"]
+    while low < high:
+        middle = (low + high) // 2
+        if _name(index, middle).lower() < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+def _trigram_candidates(index, trigram):
+    """
+    Return the ids of names containing a trigram
+    """
+    keys = index["trigram_keys"]
+    low, high = 0, len(keys)
+    while low < high:
+        middle = (low + high) // 2
+        if keys[middle] < trigram:
+            low = middle + 1
+        else:
+            high = middle
+    if low == len(keys) or keys[low] != trigram:
+        return []
+    starts = index["trigram_starts"]
+    return index["trigram_ids"][starts[low]:starts[low + 1]]
+
+def prefix_search(index, prefix, limit=None):
+    """
+    Find definitions whose name starts with prefix.
+    Matching is case-insensitive unless the prefix contains uppercase letters.
+    """
+    key = prefix.lower()
+    case_sensitive = key != prefix
+    results = []
+    name_id = _lower_bound(index, key)
+    while name_id < index["name_count"]:
+        name = _name(index, name_id)
+        if not name.lower().startswith(key):
+            break
+        if not case_sensitive or name.startswith(prefix):
+            results.extend(_entries(index, name_id))
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        name_id += 1
+    return results
+
+def _substring_name_ids(index, text):
+    """
+    Return ids of names containing text (case-insensitive), using the trigram table
+    """
+    key = text.lower()
+    trigrams = _trigrams(key.encode('utf-8'))
+    if not trigrams:
+        # Too short for trigrams: fall back to a scan over the names
+        return [name_id for name_id in range(index["name_count"]) if key in _name(index, name_id).lower()]
+
+    candidate_lists = sorted((_trigram_candidates(index, trigram) for trigram in trigrams), key=len)
+    candidates = set(candidate_lists[0])
+    for other in candidate_lists[1:]:
+        if not candidates:
+            break
+        candidates.intersection_update(other)
+    return sorted(name_id for name_id in candidates if key in _name(index, name_id).lower())
+
+def substring_search(index, text, limit=None):
+    """
+    Find definitions whose name contains text (case-insensitive)
+    """
+    results = []
+    for name_id in _substring_name_ids(index, text):
+        results.extend(_entries(index, name_id))
+        if limit is not None and len(results) >= limit:
+            return results[:limit]
+    return results
+
+# Wildcards and whole character classes ("[]...]" and "[!...]" included) of a glob pattern
+_GLOB_SPECIAL_PATTERN = re.compile(r'\[!?\]?[^\]]*\]|[*?]')
+
+def glob_search(index, pattern, limit=None):
+    """
+    Find definitions whose name matches a shell-style pattern such as parse_*.
+    Matching is case-insensitive unless the pattern contains uppercase letters.
+    """
+    case_sensitive = pattern != pattern.lower()
+    if not any(ch in pattern for ch in '*?['):
+        matches = [entry for entry in prefix_search(index, pattern)
+                   if (entry["name"] if case_sensitive else entry["name"].lower()) == pattern]
+        return matches[:limit]
+    if pattern.endswith('*') and not any(ch in pattern[:-1] for ch in '*?['):
+        return prefix_search(index, pattern[:-1], limit)
+
+    # Use the longest literal run of the pattern (outside wildcards and [...] classes) to narrow candidates
+    literals = [part for part in _GLOB_SPECIAL_PATTERN.split(pattern) if part]
+    longest = max(literals, key=len, default='')
+    name_ids = _substring_name_ids(index, longest) if longest else range(index["name_count"])
+    results = []
+    for name_id in name_ids:
+        name = _name(index, name_id)
+        if fnmatch.fnmatchcase(name if case_sensitive else name.lower(), pattern):
+            results.extend(_entries(index, name_id))
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+    return results
+
+def fuzzy_search(index, query, limit=20, min_score=0.3):
+    """
+    Rank names by trigram similarity (Jaccard) to query and return the best definitions
+    """
+    query_trigrams = _trigrams(query.lower().encode('utf-8'))
+    if not query_trigrams:
+        return substring_search(index, query, limit)
+
+    hits = {}
+    for trigram in query_trigrams:
+        for name_id in _trigram_candidates(index, trigram):
+            hits[name_id] = hits.get(name_id, 0) + 1
+
+    offsets = index["name_offsets"]
+    scored = []
+    for name_id, shared in hits.items():
+        # Trigram count of a name is bounded by its byte length; avoids decoding every candidate
+        name_trigrams = max(offsets[name_id + 1] - offsets[name_id] - 2, shared)
+        score = shared / (len(query_trigrams) + name_trigrams - shared)
+        if score >= min_score:
+            scored.append((-score, name_id))
+    scored.sort()
+
+    results = []
+    for negative_score, name_id in scored:
+        for entry in _entries(index, name_id):
+            entry["score"] = round(-negative_score, 3)
+            results.append(entry)
+        if len(results) >= limit:
+            break
+    return results[:limit]
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('build', 'query'):
+        print("Usage: python symbol_index.py build <definitions.json|definitions.ndjson> [--output=<index_file>]")
+        print("       python symbol_index.py query <index_file> <pattern> [options]")
+        print("Query options:")
+        print("  --substring               Match names containing the pattern")
+        print("  --fuzzy                   Rank names by similarity to the pattern")
+        print("  --limit=<n>               Maximum number of results (default: 50)")
+        print("Patterns may use shell wildcards, e.g. 'parse_*'")
+        sys.exit(1)
+
+    if sys.argv[1] == 'build':
+        definitions_file = sys.argv[2]
+        output_file = os.path.splitext(definitions_file)[0] + '.symidx'
+        for arg in sys.argv[3:]:
+            if arg.startswith('--output='):
+                output_file = arg[9:]
+
+        with open(definitions_file, 'r', encoding='utf-8') as f:
+            if definitions_file.endswith('.ndjson'):
+                image = build_symbol_index(collect_symbols_ndjson(f))
+            else:
+                image = build_symbol_index(collect_symbols(json.load(f)))
+        save_symbol_index(image, output_file)
+        index = open_symbol_index(image)
+        print(f"Indexed {index['name_count']} names across {index['file_count']} files into {output_file}")
+        return
+
+    if len(sys.argv) < 4:
+        print("Error: query requires an index file and a pattern")
+        sys.exit(1)
+
+    index_file, pattern = sys.argv[2], sys.argv[3]
+    mode = 'glob'
+    limit = 50
+    for arg in sys.argv[4:]:
+        if arg == '--substring':
+            mode = 'substring'
+        elif arg == '--fuzzy':
+            mode = 'fuzzy'
+        elif arg.startswith('--limit='):
+            limit = int(arg[8:])
+
+    index = load_symbol_index(index_file)
+    if mode == 'substring':
+        results = substring_search(index, pattern, limit)
+    elif mode == 'fuzzy':
+        results = fuzzy_search(index, pattern, limit)
+    else:
+        results = glob_search(index, pattern, limit)
+
+    for entry in results:
+        score = f"  ({entry['score']})" if "score" in entry else ""
+        print(f"{entry['file']}:{entry['line']}: {entry['kind']} {entry['name']}{score}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import json
+
+import function_extractor
+
+
+def _watch_state(root_path):
+    structure = function_extractor.generate_folder_structure(root_path, [])
+    nodes, cache = {}, {}
+    function_extractor._index_structure(structure, root_path, nodes)
+    function_extractor._serialize_structure(structure, root_path, 0, cache)
+    return structure, nodes, cache
+
+
+def test_apply_changes_with_relative_root(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("def a():\n    pass\n")
+    monkeypatch.chdir(tmp_path)
+    structure, nodes, cache = _watch_state(".")
+
+    (tmp_path / "x.py").write_text("def x():\n    pass\n")
+    (tmp_path / "pkg" / "a.py").write_text("def b():\n    pass\n")
+    (tmp_path / "new").mkdir()
+    (tmp_path / "new" / "c.py").write_text("class C:\n    pass\n")
+    changed = ["./x.py", "./pkg/a.py", "./new/c.py"]
+    assert function_extractor.apply_changes(".", changed, [], nodes, cache) == 3
+
+    expected = function_extractor.generate_folder_structure(".", [])
+    text = function_extractor._serialize_structure(structure, ".", 0, cache)
+    assert text == json.dumps(expected, indent=2, ensure_ascii=False)
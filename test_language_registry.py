@@ -0,0 +1,20 @@
+import sys
+
+import language_registry
+
+
+def test_string_handlers_are_imported_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "lazy_ruby_support.py").write_text("def extract(content):\n    return {'content': content}\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_ruby_support", raising=False)
+
+    language_registry.register_handler("lazy-ruby", "definitions", "lazy_ruby_support:extract")
+    assert "lazy-ruby" in language_registry.languages_with_handler("definitions")
+    assert "lazy_ruby_support" not in sys.modules
+
+    handler = language_registry.get_handler("lazy-ruby", "definitions")
+    assert handler("x") == {"content": "x"}
+    assert "lazy_ruby_support" in sys.modules
+    # Resolved once, then cached
+    assert language_registry.get_handler("lazy-ruby", "definitions") is handler
+    monkeypatch.delitem(language_registry._HANDLERS, ("lazy-ruby", "definitions"))
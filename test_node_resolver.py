@@ -0,0 +1,18 @@
+import node_resolver
+
+
+def test_relative_import_prefers_runtime_file_to_declarations(tmp_path):
+    (tmp_path / "foo.js").write_text("module.exports = 1;\n")
+    (tmp_path / "foo.d.ts").write_text("declare const foo: number;\n")
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "index.js").write_text("")
+    (tmp_path / "lib" / "index.d.ts").write_text("")
+    (tmp_path / "types").mkdir()
+    (tmp_path / "types" / "only.d.ts").write_text("")
+    main = str(tmp_path / "main.js")
+
+    state = node_resolver.create_resolver()
+    assert node_resolver.resolve(state, "./foo", main) == str(tmp_path / "foo.js")
+    assert node_resolver.resolve(state, "./lib", main) == str(tmp_path / "lib" / "index.js")
+    # Declarations still resolve when there is no runtime file
+    assert node_resolver.resolve(state, "./types/only", main) == str(tmp_path / "types" / "only.d.ts")
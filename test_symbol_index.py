@@ -0,0 +1,21 @@
+import symbol_index
+
+
+def _index(names):
+    symbols = [(name, "function", "module.py", line) for line, name in enumerate(names, 1)]
+    return symbol_index.open_symbol_index(symbol_index.build_symbol_index(symbols))
+
+
+def _names(entries):
+    return sorted(entry["name"] for entry in entries)
+
+
+def test_glob_search_wildcards_and_classes():
+    index = _index(["abcdef", "xbcdef", "ybcdef", "abcxyz", "parse_file", "parse_line"])
+
+    assert _names(symbol_index.glob_search(index, "?bcdef")) == ["abcdef", "xbcdef", "ybcdef"]
+    assert _names(symbol_index.glob_search(index, "parse_*")) == ["parse_file", "parse_line"]
+    assert _names(symbol_index.glob_search(index, "*bc*f")) == ["abcdef", "xbcdef", "ybcdef"]
+    assert _names(symbol_index.glob_search(index, "[ax]bcdef")) == ["abcdef", "xbcdef"]
+    assert _names(symbol_index.glob_search(index, "[!ax]bcdef")) == ["ybcdef"]
+    assert _names(symbol_index.glob_search(index, "abc[xd]*")) == ["abcdef", "abcxyz"]